@@ -0,0 +1,75 @@
+"""
+Benchmark: bootstrap confidence intervals for SoV / SoPV (`sov_intervals`) on the
+processed corpus replicated to --rows, at growing numbers of groups. Reports the cost per
+1k resamples of the vectorized version and of a per-resample loop that redraws each
+group's rows and reruns `pivot_sov` (on --loop-resamples resamples, scaled up to 1k).
+
+Usage (from the repo root):
+    python benchmarks/bench_bootstrap_ci.py --rows 1000000 --groups 3,300,3000
+"""
+import argparse
+import importlib
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+pa = importlib.import_module("03_process_and_analyze")
+from run_suite import parse_size  # noqa: E402
+from schema import read_processed  # noqa: E402
+
+
+def loop_intervals(df, level_cols, resamples, level=pa.CI_LEVEL, seed=0):
+    """One `pivot_sov` per resample, over each group's rows drawn with replacement."""
+    rng = np.random.default_rng(seed)
+    group = df.groupby(level_cols, sort=True, observed=True).ngroup().to_numpy()
+    order = np.argsort(group, kind="stable")
+    sizes = np.bincount(group)
+    starts = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    n = np.repeat(sizes, sizes)
+    mentions, sopv = [], []
+    for _ in range(resamples):
+        idx = order[starts + (rng.random(len(order)) * n).astype(np.int64)]
+        shares = pa.pivot_sov(df.iloc[idx], level_cols)
+        mentions.append(shares["sov_mentions_pct"].to_numpy())
+        sopv.append(shares["sopv_pct"].to_numpy())
+    q = [(1 - level) / 2, (1 + level) / 2]
+    return np.quantile(mentions, q, axis=0), np.quantile(sopv, q, axis=0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", default="1M")
+    ap.add_argument("--groups", default="3,300,3000", help="distinct synthetic query values per run")
+    ap.add_argument("--resamples", type=int, default=2000)
+    ap.add_argument("--loop-resamples", type=int, default=20)
+    args = ap.parse_args()
+
+    rows = parse_size(args.rows)
+    base = read_processed("data/processed/combined_processed.parquet")
+    reps = -(-rows // len(base))
+    base = pd.concat([base] * reps, ignore_index=True).iloc[:rows]
+
+    for groups in map(int, args.groups.split(",")):
+        df = base.copy()
+        df["query"] = df["query"].astype(str) + " #" + (df.index % groups).astype(str)
+        for level_cols in (["query"], ["query", "platform"]):
+            t0 = time.perf_counter()
+            ci = pa.sov_intervals(df, level_cols, args.resamples)
+            t_vec = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            loop_intervals(df, level_cols, args.loop_resamples)
+            t_loop = time.perf_counter() - t0
+            per_k_vec = t_vec / args.resamples * 1000
+            per_k_loop = t_loop / args.loop_resamples * 1000
+            print(f"{level_cols}: rows={rows:,} groups={len(ci) // len(pa.CANONICAL_BRANDS)}  "
+                  f"vectorized={per_k_vec:8.3f}s/1k resamples  loop={per_k_loop:8.1f}s/1k resamples  "
+                  f"speedup={per_k_loop / per_k_vec:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark: per-row `brand_flags` apply path vs the single-pass `brand_flag_frame`.
+
+Usage (from the repo root):
+    python benchmarks/bench_brand_flags.py --rows 200000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+from utils import brand_flags, brand_flag_frame  # noqa: E402
+
+
+def corpus(n_rows: int) -> pd.Series:
+    df = pd.read_parquet("data/processed/combined_processed.parquet", columns=["title", "description"])
+    txt = (df["title"].fillna("") + " " + df["description"].fillna("")).astype(str)
+    reps = -(-n_rows // len(txt))
+    return pd.concat([txt] * reps, ignore_index=True).iloc[:n_rows]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    args = ap.parse_args()
+
+    txt = corpus(args.rows)
+
+    t0 = time.perf_counter()
+    old = txt.apply(brand_flags).apply(pd.Series)
+    t_old = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    new = brand_flag_frame(txt)
+    t_new = time.perf_counter() - t0
+
+    pd.testing.assert_frame_equal(old, new)
+    print(f"rows={len(txt)}")
+    print(f"apply(brand_flags).apply(pd.Series): {t_old:8.3f}s  ({len(txt)/t_old:,.0f} rows/s)")
+    print(f"brand_flag_frame:                    {t_new:8.3f}s  ({len(txt)/t_new:,.0f} rows/s)")
+    print(f"speedup: {t_old/t_new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Scaling benchmark for the Google driver pool (`collect_google_multi(..., workers=N)`)
+against the local SERP fixture server, so no request reaches Google. Needs Chrome.
+Checks that every worker count yields the same rows (and rank_abs order) as workers=1.
+
+Usage (from the repo root):
+    python benchmarks/bench_google_pool.py --queries 12 --results 30 --max-workers 4
+"""
+import argparse
+import importlib
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+gc = importlib.import_module("01_collect_google_data")
+from pacing import fixed  # noqa: E402
+from serp_fixture import serve  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--queries", type=int, default=8)
+    ap.add_argument("--results", type=int, default=20)
+    ap.add_argument("--max-workers", type=int, default=4)
+    args = ap.parse_args()
+
+    server, base = serve(total=10 * (args.results // 10 + 2))
+    queries = [f"fixture query {i}" for i in range(args.queries)]
+    try:
+        base_rows, base_time = None, None
+        workers = 1
+        while workers <= args.max_workers:
+            t0 = time.perf_counter()
+            rows = pd.DataFrame(gc._collect_pool(queries, args.results, workers,
+                                                 base_url=base + "/search", pacer=fixed(0.0))[0])
+            dt = time.perf_counter() - t0
+            if base_rows is None:
+                base_rows, base_time = rows, dt
+            else:
+                pd.testing.assert_frame_equal(base_rows, rows)
+            print(f"workers={workers:<3d} {dt:8.2f}s  rows={len(rows)}  speedup={base_time / dt:5.2f}x")
+            workers *= 2
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: near-duplicate clustering (`near_dup.near_duplicate_clusters`) at growing sizes.
+Generates random documents plus lightly edited copies of a share of them (a site suffix,
+one word swapped, case and punctuation changes), then reports time per stage, rows/s and
+pair-level precision / recall against the copies that were inserted.
+
+Usage (from the repo root):
+    python benchmarks/bench_near_dup.py --sizes 10k,100k,1M
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import metrics  # noqa: E402
+from near_dup import near_duplicate_clusters  # noqa: E402
+from run_suite import parse_size  # noqa: E402
+
+SITES = [" - Amazon.in", " | Flipkart", " - Times of India", " (2024)", " | Smart Home Hindi"]
+
+
+def corpus(n: int, dup_rate: float = 0.2, vocab: int = 20_000, seed: int = 0):
+    """(texts, truth): `truth` is the index of the original every copy was made from."""
+    rng = np.random.default_rng(seed)
+    words = np.array(["".join(chr(97 + c) for c in rng.integers(0, 26, rng.integers(3, 9))) for _ in range(vocab)],
+                     dtype=object)
+    n_orig = int(n * (1 - dup_rate))
+    lengths = rng.integers(12, 30, n_orig)
+    ids = rng.zipf(1.3, lengths.sum()) % vocab
+    orig = pd.Series(words[ids]).groupby(np.repeat(np.arange(n_orig), lengths)).agg(" ".join)
+
+    src = rng.integers(0, n_orig, n - n_orig)
+    copies = orig.iloc[src].reset_index(drop=True)
+    edit = rng.integers(0, 3, len(src))
+    suffix = edit == 0
+    copies[suffix] = copies[suffix] + np.asarray(SITES, dtype=object)[rng.integers(0, len(SITES), suffix.sum())]
+    swap = edit == 1
+    copies[swap] = copies[swap].str.replace(r"\s\S+$", " " + words[0], regex=True)
+    caps = edit == 2
+    copies[caps] = copies[caps].str.title() + "!!"
+
+    texts = pd.concat([orig.reset_index(drop=True), copies], ignore_index=True)
+    truth = np.concatenate([np.arange(n_orig), src])
+    perm = rng.permutation(n)
+    return texts.iloc[perm].reset_index(drop=True), truth[perm]
+
+def _pairs(sizes: np.ndarray) -> int:
+    return int((sizes * (sizes - 1) // 2).sum())
+
+def pair_scores(pred: np.ndarray, truth: np.ndarray):
+    both = pd.DataFrame({"p": pred, "t": truth})
+    tp = _pairs(both.groupby(["p", "t"]).size().to_numpy())
+    predicted = _pairs(both.groupby("p").size().to_numpy())
+    actual = _pairs(both.groupby("t").size().to_numpy())
+    return (tp / predicted if predicted else 1.0), (tp / actual if actual else 1.0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="10k,100k,1M")
+    ap.add_argument("--dup-rate", type=float, default=0.2)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    for size in map(parse_size, args.sizes.split(",")):
+        texts, truth = corpus(size, args.dup_rate, seed=args.seed)
+        metrics.reset()
+        metrics.enable()
+        t0 = time.perf_counter()
+        pred = near_duplicate_clusters(texts)
+        dt = time.perf_counter() - t0
+        timers = metrics.snapshot()["timers"]
+        metrics.disable()
+        precision, recall = pair_scores(pred, truth)
+        stages = "  ".join(f"{k.split('.')[1]}={v['seconds']:.2f}s" for k, v in timers.items())
+        print(f"rows={size:>10,}  {dt:7.2f}s  {size / dt:9,.0f} rows/s  clusters={len(np.unique(pred)):,}  "
+              f"precision={precision:.3f}  recall={recall:.3f}\n    {stages}")
+
+
+if __name__ == "__main__":
+    main()
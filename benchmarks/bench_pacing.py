@@ -0,0 +1,114 @@
+"""
+Simulated comparison of the Google collector's pacing: the old fixed random sleeps against
+`AdaptivePacer`, on a simulated clock (no Chrome, no network, runs in well under a second).
+
+The simulated Google serves a CAPTCHA to any request beyond `--limit` in the trailing
+minute and keeps blocking for `--penalty` seconds after that. Each page load takes
+`--load` seconds. Reports pages collected, blocked loads and pages per hour for each policy.
+
+Usage (from the repo root):
+    python benchmarks/bench_pacing.py --queries 30 --pages 5 --limits 4,8,15,30,1000
+"""
+import argparse
+import random
+import sys
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+from pacing import AdaptivePacer  # noqa: E402
+
+
+class SimClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self, seconds):
+        self.t += seconds
+
+
+class SimGoogle:
+    def __init__(self, clock, limit, penalty):
+        self.clock, self.limit, self.penalty = clock, limit, penalty
+        self.recent = deque()
+        self.blocked_until = -1.0
+
+    def load(self, load_seconds) -> bool:
+        """One page load; True when it came back clean."""
+        now = self.clock()
+        self.clock.sleep(load_seconds)
+        while self.recent and self.recent[0] <= now - 60.0:
+            self.recent.popleft()
+        self.recent.append(now)
+        if now < self.blocked_until or len(self.recent) > self.limit:
+            self.blocked_until = max(self.blocked_until, now + self.penalty)
+            return False
+        return True
+
+
+def run_fixed(queries, pages, google, clock, load):
+    """The previous schedule: 3-6s after every page, 5-10s more after paginating, 2-4s between queries."""
+    got = blocks = 0
+    for _ in range(queries):
+        for page in range(pages):
+            if not google.load(load):
+                blocks += 1
+                break   # the collector gave up on the query at a missing #search
+            got += 1
+            if page < pages - 1:
+                clock.sleep(random.uniform(5.0, 10.0))
+                clock.sleep(random.uniform(3.0, 6.0))
+        clock.sleep(random.uniform(2.0, 4.0))
+    return got, blocks
+
+def run_adaptive(queries, pages, google, clock, load, pacer):
+    """The collector's loop: every load in the pacer's slot, blocked pages retried after the back-off."""
+    got = blocks = 0
+    for q in range(queries):
+        for page in range(pages):
+            ok = False
+            for _ in range(pacer.block_retries + 1):
+                pacer.wait()
+                ok = google.load(load)
+                pacer.record(f"q{q}", 10 * page, None if ok else "captcha")
+                if ok:
+                    break
+                blocks += 1
+            if not ok:
+                break
+            got += 1
+    return got, blocks
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--queries", type=int, default=30)
+    ap.add_argument("--pages", type=int, default=5, help="result pages per query")
+    ap.add_argument("--limits", default="4,8,15,30,1000", help="comma-separated simulated requests/minute limits")
+    ap.add_argument("--penalty", type=float, default=120.0, help="seconds a block lasts")
+    ap.add_argument("--load", type=float, default=1.5, help="seconds per page load")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    total = args.queries * args.pages
+    print(f"{total} pages per run; {args.load:.1f}s per load; blocks last {args.penalty:.0f}s")
+    print(f"{'limit/min':>9s}  {'policy':8s} {'pages':>6s} {'blocked':>8s} {'hours':>7s} {'pages/h':>8s}")
+    for limit in (int(x) for x in args.limits.split(",")):
+        for policy in ("fixed", "adaptive"):
+            random.seed(args.seed)
+            clock = SimClock()
+            google = SimGoogle(clock, limit, args.penalty)
+            if policy == "fixed":
+                got, blocks = run_fixed(args.queries, args.pages, google, clock, args.load)
+            else:
+                pacer = AdaptivePacer(clock=clock, sleep=clock.sleep)
+                got, blocks = run_adaptive(args.queries, args.pages, google, clock, args.load, pacer)
+            hours = clock.t / 3600
+            print(f"{limit:9d}  {policy:8s} {got:6d} {blocks:8d} {hours:7.2f} {got / hours:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: the previous per-group Python loop in `pivot_sov` vs the grouped-reduction
+version (`sov_aggregates` + `sov_shares`), on the processed corpus replicated to --rows.
+
+Usage (from the repo root):
+    python benchmarks/bench_pivot_sov.py --rows 1000000
+"""
+import argparse
+import importlib
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+pa = importlib.import_module("03_process_and_analyze")
+from schema import read_processed  # noqa: E402
+
+
+def pivot_sov_loop(df, level_cols):
+    rows = []
+    for keys, grp in df.groupby(level_cols):
+        m = {b: int(grp[f"mention_{b.lower()}"].sum()) for b in pa.CANONICAL_BRANDS}
+        total_mentions = sum(m.values()) or 1
+        grp_e = grp[grp["engagement_score"] > 0]
+        e = {b: float(grp_e.loc[grp_e[f"mention_{b.lower()}"] == True, "engagement_score"].sum())
+             for b in pa.CANONICAL_BRANDS}
+        total_eng = sum(e.values()) or 1.0
+        grp_pos = grp[grp["sentiment_label"] == "positive"]
+        p = {b: int(grp_pos[f"mention_{b.lower()}"].sum()) for b in pa.CANONICAL_BRANDS}
+        total_pos = sum(p.values()) or 1
+        if not isinstance(keys, tuple):
+            keys = (keys,)
+        base = {level_cols[i]: keys[i] for i in range(len(level_cols))}
+        for b in pa.CANONICAL_BRANDS:
+            rows.append({
+                **base, "brand": b,
+                "mentions": m[b], "sov_mentions_pct": 100.0 * m[b] / total_mentions,
+                "engagement": e[b], "sov_engagement_pct": 100.0 * (e[b] / total_eng),
+                "positive_mentions": p[b], "sopv_pct": 100.0 * p[b] / total_pos,
+            })
+    return pd.DataFrame(rows)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--queries", type=int, default=300, help="distinct synthetic query values")
+    args = ap.parse_args()
+
+    base = read_processed("data/processed/combined_processed.parquet")
+    reps = -(-args.rows // len(base))
+    df = pd.concat([base] * reps, ignore_index=True).iloc[:args.rows].copy()
+    df["query"] = df["query"].astype(str) + " #" + (df.index % args.queries).astype(str)
+
+    for level_cols in (["query"], ["query", "platform"]):
+        t0 = time.perf_counter()
+        old = pivot_sov_loop(df, level_cols)
+        t_old = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        new = pa.pivot_sov(df, level_cols)
+        t_new = time.perf_counter() - t0
+        pd.testing.assert_frame_equal(old, new, check_exact=True)
+        print(f"{level_cols}: rows={len(df)} groups={len(new) // len(pa.CANONICAL_BRANDS)} "
+              f"loop={t_old:.3f}s vectorized={t_new:.3f}s speedup={t_old / t_new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: the batch sentiment backend (sentiment_batch.py) against stock VADER.
+
+Agreement: compound scores and labels of both backends on our corpus (raw Google and
+YouTube title + description) plus a synthetic corpus of --rows rows, reported as the share
+of exactly equal scores, label agreement and the largest absolute score difference, with
+the first disagreeing texts printed. Throughput: texts/s of both backends on the same
+texts (stock VADER on at most --row-cap of them; its cost is linear).
+
+Usage (from the repo root):
+    python benchmarks/bench_sentiment_batch.py --rows 100k
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+import synthetic  # noqa: E402
+from run_suite import parse_size  # noqa: E402
+from utils import sentiment_labels_and_scores  # noqa: E402
+
+
+def corpus_texts():
+    texts = []
+    for stem in ("google_sov_india", "youtube_sov_india"):
+        path = ROOT / "data" / "raw" / f"{stem}.parquet"
+        if path.exists():
+            df = pd.read_parquet(path)
+            texts += (df["title"].fillna("") + " " + df["description"].fillna("")).astype(str).tolist()
+    return texts
+
+def _timed(texts, backend):
+    t0 = time.perf_counter()
+    labels, scores = sentiment_labels_and_scores(texts, backend=backend)
+    return labels, scores, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", default="100k", help="synthetic rows added to the corpus")
+    ap.add_argument("--row-cap", default="20k", help="most texts scored by stock VADER for throughput")
+    ap.add_argument("--show", type=int, default=5, help="disagreeing texts to print")
+    args = ap.parse_args()
+
+    corpus = corpus_texts()
+    df = synthetic.processed_rows(parse_size(args.rows))
+    synth = (df["title"] + " " + df["description"]).astype(str).tolist()
+
+    print("agreement with stock VADER")
+    for name, texts in (("corpus", corpus), ("synthetic", synth)):
+        if not texts:
+            continue
+        ref_labels, ref_scores, _ = _timed(texts, "vader")
+        labels, scores, _ = _timed(texts, "batch")
+        diff = np.abs(scores - ref_scores)
+        print(f"  {name:10s} texts={len(texts):>9,}  exact={np.mean(diff == 0):8.4%}  "
+              f"labels={np.mean(labels == ref_labels):8.4%}  max|diff|={diff.max():.4f}")
+        for i in np.flatnonzero(diff > 0)[:args.show]:
+            print(f"    {ref_scores[i]:+.4f} vs {scores[i]:+.4f}  {texts[i][:100]!r}")
+
+    print("throughput")
+    texts = corpus + synth
+    cap = min(len(texts), parse_size(args.row_cap))
+    _, _, dt_vader = _timed(texts[:cap], "vader")
+    _, _, dt_batch = _timed(texts, "batch")
+    vader_rate, batch_rate = cap / dt_vader, len(texts) / dt_batch
+    print(f"  vader  texts={cap:>9,}  {dt_vader:8.2f}s  {vader_rate:10,.0f} texts/s")
+    print(f"  batch  texts={len(texts):>9,}  {dt_batch:8.2f}s  {batch_rate:10,.0f} texts/s  "
+          f"speedup={batch_rate / vader_rate:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Scaling benchmark for `sentiment_labels_and_scores`: 1..N worker processes on the
+processed corpus replicated to --rows. Every parallel result is checked against the
+serial one.
+
+Usage (from the repo root):
+    python benchmarks/bench_sentiment_parallel.py --rows 50000 --max-workers 8
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+from utils import sentiment_labels_and_scores  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=20_000)
+    ap.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--chunk-size", type=int, default=1000)
+    args = ap.parse_args()
+
+    df = pd.read_parquet("data/processed/combined_processed.parquet", columns=["title", "description"])
+    txt = (df["title"].fillna("") + " " + df["description"].fillna("")).astype(str).tolist()
+    texts = (txt * (-(-args.rows // len(txt))))[:args.rows]
+
+    base = None
+    workers = 1
+    while workers <= args.max_workers:
+        t0 = time.perf_counter()
+        labels, scores = sentiment_labels_and_scores(texts, workers=workers, chunk_size=args.chunk_size)
+        dt = time.perf_counter() - t0
+        if base is None:
+            base = (labels, scores, dt)
+        else:
+            assert np.array_equal(labels, base[0]) and np.array_equal(scores, base[1])
+        print(f"workers={workers:3d}  {dt:8.3f}s  {len(texts)/dt:10,.0f} rows/s  speedup={base[2]/dt:5.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: per-element WebDriver lookups vs the single `execute_script` card extraction
+in 01_collect_google_data.py, on pages from the local SERP fixture. Needs Chrome.
+
+Usage (from the repo root):
+    python benchmarks/bench_serp_extraction.py --pages 20
+"""
+import argparse
+import importlib
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+gc = importlib.import_module("01_collect_google_data")
+from serp_fixture import serve  # noqa: E402
+
+
+def count_commands(driver):
+    counter = {"n": 0}
+    execute = driver.execute
+
+    def counted(*args, **kwargs):
+        counter["n"] += 1
+        return execute(*args, **kwargs)
+
+    driver.execute = counted
+    return counter
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=10)
+    args = ap.parse_args()
+
+    server, base = serve(total=10 * args.pages)
+    driver, _ = gc._setup_driver()
+    counter = count_commands(driver)
+    try:
+        results = {}
+        for name, extract in (("per-element", gc._extract_cards_elements), ("batched", gc._extract_cards_js)):
+            elapsed, calls, cards = 0.0, 0, []
+            for page in range(args.pages):
+                driver.get(f"{base}/search?q=smart+fan&start={page * 10}")
+                counter["n"] = 0
+                t0 = time.perf_counter()
+                cards.extend(extract(driver))
+                elapsed += time.perf_counter() - t0
+                calls += counter["n"]
+            results[name] = cards
+            print(f"{name:12s} {elapsed / args.pages * 1000:8.1f} ms/page  {calls / args.pages:6.1f} WebDriver calls/page")
+        strip = lambda cs: [(c["title"], c["href"], c["description"]) for c in cs]
+        assert strip(results["per-element"]) == strip(results["batched"]), "extractors disagree"
+    finally:
+        driver.quit()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: offline re-parse of archived SERP pages (`collect_google_offline`) with 1..N
+parser processes. The archive is built from the local SERP fixture, and the rows are checked
+against what the fixture pages contain (ranks, canonical URLs, mention flags). No network or Chrome.
+
+Usage (from the repo root):
+    python benchmarks/bench_serp_reparse.py --queries 50 --pages 10 --max-workers 4
+"""
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+gc = importlib.import_module("01_collect_google_data")
+from schema import read_processed  # noqa: E402
+from serp_archive import SerpArchive  # noqa: E402
+from serp_fixture import BRANDS, render_serp  # noqa: E402
+
+
+def expected_rows(queries, n_results):
+    rows = []
+    for q in queries:
+        for i in range(n_results):
+            brand = BRANDS[i % len(BRANDS)]
+            rows.append({"query": q, "page": i // 10 + 1, "rank_page": i % 10 + 1, "rank_abs": i + 1,
+                         "title": f"{brand} {q} review #{i}",
+                         "url": f"https://example-{i}.in/{q.replace(' ', '-')}",
+                         **{f"mention_{b.lower()}": b == brand for b in BRANDS}})
+    return pd.DataFrame(rows)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--queries", type=int, default=50)
+    ap.add_argument("--pages", type=int, default=10, help="archived pages per query")
+    ap.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    queries = [f"fixture query {i}" for i in range(args.queries)]
+    n_results = 10 * args.pages
+    out = tempfile.mkdtemp()
+    archive_path = Path(out) / "serp_archive.sqlite"
+    archive = SerpArchive(archive_path)
+    for q in queries:
+        for start in range(0, n_results, 10):
+            archive.put(q, start, f"https://www.google.com/search?q={q.replace(' ', '+')}&start={start}",
+                        render_serp(q, start, total=n_results))
+    archive.close()
+    print(f"archive: {len(queries) * args.pages} pages, {archive_path.stat().st_size / 2**20:.1f} MB")
+
+    want = expected_rows(queries, n_results)
+    workers, base = 1, None
+    while workers <= args.max_workers:
+        t0 = time.perf_counter()
+        df = read_processed(gc.collect_google_offline(queries, n_results, out_dir=out, out_name=f"offline_{workers}",
+                                                      archive_path=archive_path, workers=workers))
+        dt = time.perf_counter() - t0
+        got = df[want.columns].reset_index(drop=True).astype(want.dtypes.to_dict())
+        pd.testing.assert_frame_equal(got, want, check_dtype=False)
+        base = base or dt
+        pages = len(queries) * args.pages
+        print(f"workers={workers:<3d} {dt:7.2f}s  {pages / dt:8.0f} pages/s  rows={len(df)}  speedup={base / dt:5.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
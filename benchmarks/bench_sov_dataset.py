@@ -0,0 +1,90 @@
+"""
+Benchmark: out-of-core SoV (`scan_sov_aggregates`, Arrow dataset scan in record batches)
+against loading the whole partitioned dataset into pandas, at growing row counts.
+
+Writes synthetic processed rows as a dataset of `--part-rows`-row parts, one collection
+date per part, then runs each mode in a fresh subprocess and reports its wall time and
+peak RSS growth over the process after imports (sampled). Out-of-core memory should stay flat as
+rows grow; it depends on the part size (a parquet row group is decoded at a time). The tables of both modes
+are checked for equality.
+
+Usage (from the repo root):
+    python benchmarks/bench_sov_dataset.py --sizes 1M,4M,8M
+"""
+import argparse
+import importlib
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+pa = importlib.import_module("03_process_and_analyze")
+import synthetic  # noqa: E402
+from run_suite import _PeakRSS, parse_size  # noqa: E402
+from schema import read_processed, write_parquet  # noqa: E402
+
+
+def write_dataset(root: Path, rows: int, part_rows: int):
+    for i, lo in enumerate(range(0, rows, part_rows)):
+        part = synthetic.processed_rows(min(part_rows, rows - lo), seed=i)
+        out = root / f"date=2026-01-{1 + i % 28:02d}" / f"batch=b{i:04d}"
+        out.mkdir(parents=True, exist_ok=True)
+        write_parquet(part.drop(columns=["title", "description", "url"]), out / "part-0.parquet")
+
+def run_mode(mode: str, root: str, out: str, batch_size: int):
+    """Child process: computes the (query, platform) tables one way and reports time and peak RSS growth."""
+    with _PeakRSS() as mem:
+        t0 = time.perf_counter()
+        if mode == "out-of-core":
+            aggregates, _ = pa.scan_sov_aggregates(root, ["query", "platform"], batch_size)
+            table = pa.sov_shares(aggregates, ["query", "platform"])
+        else:
+            df = pd.concat([read_processed(p) for p in sorted(Path(root).rglob("*.parquet"))], ignore_index=True)
+            table = pa.pivot_sov(df, ["query", "platform"])
+        seconds = time.perf_counter() - t0
+    table.astype({"query": str, "platform": str}).sort_values(["query", "platform", "brand"]).to_csv(out, index=False)
+    print(json.dumps({"seconds": seconds, "peak_rss_mb": mem.peak / 2**20}))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1M,4M")
+    ap.add_argument("--part-rows", default="250k")
+    ap.add_argument("--batch-size", type=int, default=262_144)
+    ap.add_argument("--modes", default="out-of-core,in-memory")
+    ap.add_argument("--run-mode", nargs=3, metavar=("MODE", "DATASET", "OUT"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.run_mode:
+        return run_mode(*args.run_mode, args.batch_size)
+
+    for size in map(parse_size, args.sizes.split(",")):
+        root = Path(tempfile.mkdtemp())
+        try:
+            write_dataset(root / "combined", size, parse_size(args.part_rows))
+            tables = {}
+            for mode in args.modes.split(","):
+                out = root / f"{mode}.csv"
+                res = subprocess.run([sys.executable, __file__, "--batch-size", str(args.batch_size),
+                                      "--run-mode", mode, str(root / "combined"), str(out)],
+                                     check=True, capture_output=True, text=True)
+                r = json.loads(res.stdout.strip().splitlines()[-1])
+                tables[mode] = pd.read_csv(out)
+                print(f"rows={size:>11,}  {mode:12s} {r['seconds']:8.2f}s  {size / r['seconds']:12,.0f} rows/s  "
+                      f"peak RSS +{r['peak_rss_mb']:8.1f} MB")
+            if len(tables) == 2:
+                a, b = tables.values()
+                pd.testing.assert_frame_equal(a, b)
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
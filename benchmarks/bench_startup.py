@@ -0,0 +1,58 @@
+"""
+Start-up budget check: wall time of fresh interpreters that import `utils`, import the
+processing stage, and do what a sentiment worker does on start (import + first score).
+Each case is the median of --repeat runs; exits non-zero if any case is over budget.
+
+Usage (from the repo root):
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# (name, code run in a fresh interpreter, budget in seconds over a bare `python -c pass`)
+CASES = [
+    ("import utils", "import utils", 0.30),
+    ("import processing stage",
+     "import importlib; importlib.import_module('03_process_and_analyze')", 1.50),
+    ("worker start-up + first score",
+     "import utils; utils.sentiment_labels_and_scores(['Atomberg fans are great'])", 0.80),
+]
+
+
+def _run(code: str) -> float:
+    t0 = time.perf_counter()
+    # From the repo root, like the pipeline scripts (importing the processing stage creates data/ dirs).
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"))
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True)
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    # Warm-up: builds the lexicon snapshot (first run only) and the bytecode caches.
+    for _, code, _ in CASES:
+        _run(code)
+
+    bare = statistics.median(_run("pass") for _ in range(args.repeat))
+    print(f"interpreter baseline  {bare:6.3f}s")
+    over = 0
+    for name, code, budget in CASES:
+        dt = statistics.median(_run(code) for _ in range(args.repeat)) - bare
+        ok = dt <= budget
+        over += not ok
+        print(f"{name:32s} {dt:6.3f}s  budget {budget:5.2f}s  {'ok' if ok else 'OVER BUDGET'}")
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: streaming comment ingestion (`collect_youtube_comments`) against the local
+YouTube API stub at growing comment volumes. Reports comments/s and the peak memory growth
+of each run, which should stay flat as the volume grows (one batch is in memory at a time),
+and checks that every comment of every video with comments enabled was written once.
+
+Usage (from the repo root):
+    python benchmarks/bench_youtube_comments.py --videos 100 --per-video 1000,5000,20000
+"""
+import argparse
+import importlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+yc = importlib.import_module("02_collect_youtube_data")
+import metrics  # noqa: E402
+from run_suite import _PeakRSS, parse_size  # noqa: E402
+from youtube_stub import DISABLED_EVERY, serve  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--videos", type=int, default=100)
+    ap.add_argument("--per-video", default="1000,5000,20000", help="comma-separated comment threads per video")
+    ap.add_argument("--batch-size", type=int, default=5000)
+    ap.add_argument("--fail-every", type=int, default=0)
+    args = ap.parse_args()
+
+    video_ids = [f"vid{i:05d}" for i in range(1, args.videos + 1)]
+    enabled = sum(1 for v in video_ids if int(v[3:]) % DISABLED_EVERY)
+    for per_video in map(parse_size, args.per_video.split(",")):
+        server, base = serve(fail_every=args.fail_every, comments_per_video=per_video)
+        out = tempfile.mkdtemp()
+        budget = yc.QuotaBudget(total=10**9, burst=10**6, refill_per_sec=10**6)
+        metrics.reset()
+        metrics.enable()
+        try:
+            with _PeakRSS() as mem:
+                t0 = time.perf_counter()
+                stats = yc.collect_youtube_comments(video_ids, api_key="stub", out_dir=out, batch_size=args.batch_size,
+                                                    budget=budget, base_url=base + "/youtube/v3")
+                dt = time.perf_counter() - t0
+        finally:
+            server.shutdown()
+            metrics.disable()
+        parts = sorted(Path(stats["path"]).glob("part-*.parquet"))
+        written = sum(pq.ParquetFile(p).metadata.num_rows for p in parts)
+        assert written == stats["comments"] == enabled * per_video, (written, stats["comments"], enabled * per_video)
+        timers = metrics.snapshot()["timers"]
+        stages = "  ".join(f"{k.split('.', 1)[1]}={v['seconds']:.1f}s" for k, v in timers.items()
+                           if k.startswith(("comments.", "youtube.api.")))
+        print(f"comments={written:>10,}  {dt:7.1f}s  {written / dt:8,.0f} comments/s  parts={len(parts):4d}  "
+              f"peak +{mem.peak / 2**20:6.1f} MB  with_brand={stats['with_brand']:,}\n    {stages}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Benchmark suite over synthetic corpora (see synthetic.py): wall time and peak memory of
+every pipeline stage at each size, written as JSON so runs on different commits can be
+compared. Runs fully offline.
+
+Stages: per-row `brand_flags` and `sentiment_label_and_score` (on at most --row-cap rows;
+their cost is linear), the vectorized `brand_flag_frame` and batched
+`sentiment_labels_and_scores` (stock VADER per text, on the capped sample, and the batch
+backend on every row), brand-scoped sentiment (batch backend), near-duplicate clustering, `pivot_sov` (per row and per
+unique item), bootstrap SoV intervals (`sov_intervals`), parquet save/load in the compact schema, and
+rendering the charts from the resulting tables. Memory is the peak resident-set growth
+sampled while the stage runs.
+
+Usage (from the repo root):
+    python benchmarks/run_suite.py --sizes 10k,100k,1M
+    python benchmarks/run_suite.py --sizes 10k,100k --compare benchmarks/results/<old>.json
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+pa = importlib.import_module("03_process_and_analyze")
+viz = importlib.import_module("04_visualize_results")
+import synthetic  # noqa: E402
+from schema import compact, read_processed, write_parquet  # noqa: E402
+from utils import (brand_flag_frame, brand_flags, sentiment_label_and_score,  # noqa: E402
+                   sentiment_labels_and_scores)
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _rss() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE
+    except OSError:
+        # No procfs: fall back to the lifetime peak, which only ever grows.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class _PeakRSS:
+    """Samples RSS on a background thread; `peak` is the growth over the starting RSS."""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.peak = 0
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _rss() - self.start)
+
+    def __enter__(self):
+        self.start = _rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss() - self.start)
+
+
+def measure(stage: str, size: int, rows: int, fn):
+    with _PeakRSS() as mem:
+        t0 = time.perf_counter()
+        out = fn()
+        seconds = time.perf_counter() - t0
+    record = {"stage": stage, "size": size, "rows": rows, "seconds": round(seconds, 6),
+              "rows_per_s": round(rows / seconds, 1) if seconds else None,
+              "peak_rss_mb": round(mem.peak / 2**20, 2)}
+    print(f"  {stage:28s} rows={rows:>10,}  {seconds:9.3f}s  peak +{record['peak_rss_mb']:8.1f} MB")
+    return record, out
+
+def run_size(size: int, mention_rate: float, row_cap: int, seed: int, workdir: Path):
+    print(f"size={size:,}")
+    df = synthetic.processed_rows(size, mention_rate, seed)
+    txt = (df["title"] + " " + df["description"]).astype(str)
+    sample = txt.iloc[:min(size, row_cap)].tolist()
+    records = []
+
+    def add(stage, rows, fn):
+        rec, out = measure(stage, size, rows, fn)
+        records.append(rec)
+        return out
+
+    add("brand_flags", len(sample), lambda: [brand_flags(t) for t in sample])
+    add("brand_flag_frame", size, lambda: brand_flag_frame(txt))
+    add("sentiment_label_and_score", len(sample), lambda: [sentiment_label_and_score(t) for t in sample])
+    add("sentiment_labels_and_scores", len(sample), lambda: sentiment_labels_and_scores(sample))
+    add("sentiment_batch", size, lambda: sentiment_labels_and_scores(txt, backend="batch"))
+    add("sentiment_brand_scope", size, lambda: pa.brand_scoped_sentiment(
+        df.copy(), txt, scorer=lambda t: sentiment_labels_and_scores(t, backend="batch")))
+
+    by_query = add("pivot_sov[query]", size, lambda: pa.pivot_sov(df, ["query"]))
+    by_qp = add("pivot_sov[query,platform]", size, lambda: pa.pivot_sov(df, ["query", "platform"]))
+    add("near_dup_clusters", size, lambda: pa.add_dup_clusters(df))
+    add("pivot_sov[query,unique]", size, lambda: pa.pivot_sov(df, ["query"], unique=True))
+    add("bootstrap_ci[query,platform]", size, lambda: pa.sov_intervals(df, ["query", "platform"]))
+
+    path = workdir / f"processed_{size}.parquet"
+    add("parquet_save", size, lambda: write_parquet(compact(df), path, compacted=True))
+    records[-1]["bytes"] = path.stat().st_size
+    add("parquet_load", size, lambda: read_processed(path))
+
+    results = workdir / f"results_{size}"
+    results.mkdir()
+    by_query.to_csv(results / "sov_by_query.csv", index=False)
+    by_qp.to_csv(results / "sov_by_query_platform.csv", index=False)
+    pa.sentiment_counts(df).to_csv(results / "sentiment_distribution.csv", index=False)
+    add("render_charts", size, lambda: viz.render_all(results, workers=1, force=True))
+    return records
+
+
+def parse_size(s: str) -> int:
+    s = s.strip().lower()
+    mult = {"k": 10**3, "m": 10**6}.get(s[-1:], 1)
+    return int(float(s[:-1] if mult > 1 else s) * mult)
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(current, baseline_path, tolerance: float) -> int:
+    """
+    Prints per-row time ratios against a previous run (so a different --row-cap still
+    compares); returns the number of stages slower than `tolerance` allows.
+    """
+    with open(baseline_path) as f:
+        baseline = {(r["stage"], r["size"]): r for r in json.load(f)["results"]}
+    print(f"\nvs {baseline_path} (regression: > {1 + tolerance:.2f}x)")
+    regressions = 0
+    for r in current:
+        old = baseline.get((r["stage"], r["size"]))
+        if old is None or not old["seconds"]:
+            continue
+        ratio = (r["seconds"] / r["rows"]) / (old["seconds"] / old["rows"])
+        slow = ratio > 1 + tolerance
+        regressions += slow
+        print(f"  {r['stage']:28s} size={r['size']:>10,}  {ratio:6.2f}x  {'REGRESSION' if slow else ''}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="10k,100k,1M", help="comma-separated row counts, e.g. 10k,100k,1M,10M")
+    ap.add_argument("--mention-rate", type=float, default=0.3)
+    ap.add_argument("--row-cap", type=int, default=100_000,
+                    help="max rows for the per-row brand_flags / sentiment stages")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default=None, help="JSON output (default: benchmarks/results/<commit>.json)")
+    ap.add_argument("--compare", default=None, help="previous JSON output to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    args = ap.parse_args()
+
+    commit = _git_commit()
+    sentiment_label_and_score("warm-up")  # builds the analyzer outside the timed stages
+    records = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in map(parse_size, args.sizes.split(",")):
+            records += run_size(size, args.mention_rate, args.row_cap, args.seed, Path(tmp))
+
+    report = {
+        "meta": {
+            "commit": commit,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pa.pd.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "mention_rate": args.mention_rate,
+            "row_cap": args.row_cap,
+            "seed": args.seed,
+        },
+        "results": records,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {out}")
+
+    if args.compare:
+        sys.exit(1 if compare(records, args.compare, args.tolerance) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Local stand-in for Google search result pages, for collector benchmarks and dry runs.
+
+`render_serp` builds a page with the same structure the collector reads
+(`#search div.MjjYud` cards with h3, anchor and `div.VwiC3b` description, plus `#pnnext`).
+`serve()` answers `/search?q=...&start=...` with those pages on a background thread, or
+replays the pages of a SERP archive (src/serp_archive.py) recorded by the collector.
+With `max_per_minute`, requests over that rate get a CAPTCHA interstitial instead, to
+exercise the collector's adaptive pacing (src/pacing.py).
+"""
+import threading
+import time
+import zlib
+from collections import deque
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BRANDS = ["Atomberg", "Orient", "Havells", "Crompton", "Polycab"]
+
+
+def render_serp(query: str, start: int = 0, per_page: int = 10, total: int = 50) -> str:
+    cards = []
+    for i in range(start, min(start + per_page, total)):
+        brand = BRANDS[i % len(BRANDS)]
+        cards.append(
+            '<div class="MjjYud"><div><a href="https://example-{i}.in/{slug}?utm_source=x">'
+            '<h3>{brand} {q} review #{i}</h3></a></div>'
+            '<div class="VwiC3b">Best {q} from {brand}: energy saving, remote control, result {i}.</div></div>'
+            .format(i=i, slug=escape(query.replace(" ", "-")), brand=brand, q=escape(query))
+        )
+    nxt = ""
+    if start + per_page < total:
+        nxt = f'<a id="pnnext" href="/search?q={escape(query)}&start={start + per_page}">Next</a>'
+    # The hidden "Accept all" text satisfies the collector's consent wait immediately
+    # instead of letting it time out on every fixture page; it is never clicked.
+    return (
+        "<!doctype html><html><head><title>{q} - Search</title></head><body>"
+        '<p style="display:none">Accept all</p>'
+        '<div id="search">{cards}</div>{nxt}</body></html>'
+    ).format(q=escape(query), cards="".join(cards), nxt=nxt)
+
+
+CAPTCHA_PAGE = (
+    "<!doctype html><html><head><title>Sorry...</title></head><body>"
+    "<p>Our systems have detected unusual traffic from your computer network.</p>"
+    '<div class="g-recaptcha"></div></body></html>'
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    total = 50
+    pages = None    # {(query, start): (url, compressed html, fetched_at)} when replaying an archive
+    max_per_minute = None
+    recent = None   # deque of recent request times, shared by the server's handlers
+    lock = None
+
+    def _over_rate(self) -> bool:
+        if self.max_per_minute is None:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            while self.recent and self.recent[0] <= now - 60.0:
+                self.recent.popleft()
+            self.recent.append(now)
+            return len(self.recent) > self.max_per_minute
+
+    def do_GET(self):
+        u = urlparse(self.path)
+        qs = parse_qs(u.query)
+        query, start = qs.get("q", [""])[0], int(qs.get("start", ["0"])[0])
+        if self._over_rate():
+            body = CAPTCHA_PAGE.encode("utf-8")
+        elif self.pages is None:
+            body = render_serp(query, start, total=self.total).encode("utf-8")
+        elif (query, start) in self.pages:
+            body = zlib.decompress(self.pages[(query, start)][1])
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port: int = 0, total: int = 50, archive_path=None, max_per_minute=None):
+    """
+    Starts the fixture server; returns (server, base_url). Call server.shutdown() when done.
+    With `archive_path`, serves each query's newest archived run instead (`SerpArchive.latest`).
+    With `max_per_minute`, requests beyond that many in the trailing minute get CAPTCHA_PAGE.
+    """
+    pages = None
+    if archive_path is not None:
+        from serp_archive import SerpArchive
+        archive = SerpArchive(archive_path)
+        pages = archive.latest()
+        archive.close()
+    handler = type("Handler", (_Handler,), {"total": total, "pages": pages, "max_per_minute": max_per_minute,
+                                            "recent": deque(), "lock": threading.Lock()})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
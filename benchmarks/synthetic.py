@@ -0,0 +1,151 @@
+"""
+Synthetic Google / YouTube rows with the same columns as the collectors' raw files, for
+benchmarking at sizes the checked-in `data/raw` samples can't reach. Fully offline and
+deterministic for a given seed.
+
+`mention_rate` is the share of rows whose title names a brand; descriptions name a second
+brand at a third of that rate. The `mention_*` columns are the ground truth of what was
+inserted, and agree with `brand_flag_frame` on the generated text.
+
+Usage (from the repo root) -- write raw files the pipeline can read:
+    python benchmarks/synthetic.py --rows 1000000 --out /tmp/synthetic_raw
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+QUERIES = ["smart fan", "energy efficient fan", "BLDC fan"]
+BRANDS = ["Atomberg", "Orient", "Havells", "Crompton", "Polycab"]
+# Relative frequency of each brand among mentions, roughly as in the collected data.
+BRAND_WEIGHTS = [0.40, 0.15, 0.20, 0.15, 0.10]
+SURFACE_FORMS = {
+    "Atomberg": ["Atomberg", "atomberg", "ATOMBERG"],
+    "Orient": ["Orient Electric", "Orient", "orient"],
+    "Havells": ["Havells", "havells", "Havell's"],
+    "Crompton": ["Crompton", "crompton"],
+    "Polycab": ["Polycab", "polycab"],
+}
+PREFIXES = ["Best", "Buy", "Review:", "Top 10", "Unboxing", "Honest review of", "Compare", "New", "Why I bought"]
+PRODUCTS = ["BLDC ceiling fan", "smart fan with remote", "energy saving fan", "1200 mm ceiling fan",
+            "wifi smart fan", "table fan", "ceiling fan for bedroom", "5 star rated fan"]
+# (phrase, label the analysis stage would roughly assign)
+TONES = [("", "neutral"), ("- worth every rupee, excellent", "positive"), ("love it, great value", "positive"),
+         ("- terrible noise, worst purchase", "negative"), ("disappointed, poor quality", "negative"),
+         ("| specs and price", "neutral")]
+DESCRIPTIONS = ["Shop the latest collection online with free delivery.",
+                "In this video we test power consumption, noise and air delivery.",
+                "Compare features, price and warranty before you buy.",
+                "A smart fan offers features like app based control and scheduling.",
+                "Installation guide, remote pairing and first impressions."]
+CHANNELS = ["Tech Burner", "Home Gadgets India", "Fan Reviews", "Gadgets To Use", "Smart Home Hindi"]
+
+
+def _pick(rng, options, n, p=None):
+    return np.asarray(options, dtype=object)[rng.choice(len(options), size=n, p=p)]
+
+def _brand_phrases(rng, n, rate):
+    """(phrase per row, brand index per row or -1)."""
+    brand = np.where(rng.random(n) < rate, rng.choice(len(BRANDS), size=n, p=BRAND_WEIGHTS), -1)
+    phrase = np.full(n, "", dtype=object)
+    for i, b in enumerate(BRANDS):
+        sel = brand == i
+        phrase[sel] = _pick(rng, SURFACE_FORMS[b], int(sel.sum()))
+    return phrase, brand
+
+def _text(rng, n, mention_rate):
+    title_phrase, title_brand = _brand_phrases(rng, n, mention_rate)
+    desc_phrase, desc_brand = _brand_phrases(rng, n, mention_rate / 3)
+    tone = rng.choice(len(TONES), size=n)
+    title = (pd.Series(_pick(rng, PREFIXES, n)) + " " + title_phrase + " "
+             + _pick(rng, PRODUCTS, n) + " " + np.asarray([t for t, _ in TONES], dtype=object)[tone])
+    title = title.str.replace(r"\s+", " ", regex=True).str.strip()
+    desc = pd.Series(_pick(rng, DESCRIPTIONS, n)) + np.where(desc_phrase != "", " Also see " + desc_phrase + ".", "")
+    flags = {f"mention_{b.lower()}": (title_brand == i) | (desc_brand == i) for i, b in enumerate(BRANDS)}
+    labels = np.asarray([l for _, l in TONES], dtype=object)[tone]
+    return title, desc, flags, labels
+
+def google_rows(n: int, mention_rate: float = 0.3, seed: int = 0) -> pd.DataFrame:
+    """`n` rows shaped like data/raw/google_sov_india.*."""
+    rng = np.random.default_rng(seed)
+    title, desc, flags, _ = _text(rng, n, mention_rate)
+    rank_abs = np.arange(n) % 50 + 1
+    df = pd.DataFrame({
+        "query": _pick(rng, QUERIES, n),
+        "page": (rank_abs - 1) // 10 + 1,
+        "rank_page": (rank_abs - 1) % 10 + 1,
+        "rank_abs": rank_abs,
+        "title": title,
+        "url": "https://example.com/p/" + pd.Series(np.arange(n)).astype(str),
+        "description": desc,
+        "platform": "google",
+        "result_type": "organic",
+        "engagement": 0,
+    })
+    return df.assign(**flags)
+
+def youtube_rows(n: int, mention_rate: float = 0.3, seed: int = 0) -> pd.DataFrame:
+    """`n` rows shaped like data/raw/youtube_sov_india.*."""
+    rng = np.random.default_rng(seed + 1)
+    title, desc, flags, _ = _text(rng, n, mention_rate)
+    views = rng.lognormal(9, 2, n).astype(np.int64)
+    likes = (views * rng.uniform(0.001, 0.03, n)).astype(np.int64)
+    comments = (likes * rng.uniform(0.005, 0.05, n)).astype(np.int64)
+    # Hour-granular upload times; formatting a small pool is far cheaper than n timestamps.
+    hours = (pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(365 * 24), unit="h")).strftime("%Y-%m-%dT%H:%M:%SZ")
+    df = pd.DataFrame({
+        "query": _pick(rng, QUERIES, n),
+        "platform": "youtube",
+        "video_id": "v" + pd.Series(np.arange(n)).astype(str).str.zfill(10),
+        "title": title,
+        "description": desc,
+        "channel_title": _pick(rng, CHANNELS, n),
+        "published_at": _pick(rng, hours, n),
+        "tags": "fan|bldc fan|smart fan",
+        "views": views,
+        "likes": likes,
+        "comments": comments,
+        "engagement_score": views + 5 * likes + 10 * comments,
+    })
+    return df.assign(**flags)
+
+def processed_rows(n: int, mention_rate: float = 0.3, seed: int = 0) -> pd.DataFrame:
+    """
+    `n` rows shaped like the processing stage's combined frame (half Google, half YouTube),
+    with the tone picked by the generator standing in for the VADER label.
+    """
+    frames = []
+    for platform, k in (("google", n // 2), ("youtube", n - n // 2)):
+        rng = np.random.default_rng(seed + (platform == "youtube"))
+        title, desc, flags, labels = _text(rng, k, mention_rate)
+        eng = np.zeros(k) if platform == "google" else rng.lognormal(9, 2, k).round()
+        frames.append(pd.DataFrame({
+            "query": _pick(rng, QUERIES, k),
+            "title": title,
+            "description": desc,
+            "url": f"{platform}:" + pd.Series(np.arange(k)).astype(str),
+            "platform": platform,
+            "engagement_score": eng,
+            "sentiment_label": labels,
+            "sentiment_score": np.where(labels == "positive", 0.8, np.where(labels == "negative", -0.7, 0.0)),
+        }).assign(**flags))
+    return pd.concat(frames, ignore_index=True)
+
+def write_raw(out_dir, n: int, mention_rate: float = 0.3, seed: int = 0):
+    """Writes `n` Google and `n` YouTube rows as google_sov_india / youtube_sov_india parquet files."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    google_rows(n, mention_rate, seed).to_parquet(out_dir / "google_sov_india.parquet", index=False)
+    youtube_rows(n, mention_rate, seed).to_parquet(out_dir / "youtube_sov_india.parquet", index=False)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000, help="rows per platform")
+    ap.add_argument("--mention-rate", type=float, default=0.3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", required=True, help="directory for the raw parquet files")
+    args = ap.parse_args()
+    write_raw(args.out, args.rows, args.mention_rate, args.seed)
+    print(f"Wrote {args.rows} Google and {args.rows} YouTube rows to {args.out}")
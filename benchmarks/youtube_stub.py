@@ -0,0 +1,154 @@
+"""
+Local stand-in for the YouTube Data API v3 `search`, `videos` and `commentThreads` endpoints.
+
+Responses follow the shape of recorded API responses (snippet/statistics, nextPageToken)
+and are generated deterministically from the query, so every run sees the same videos.
+Queries overlap: each query draws from a shared pool of video ids, like real fan reviews
+showing up for "smart fan" and "BLDC fan" alike. Serves both `/youtube/v3/<endpoint>`
+(googleapiclient with api_endpoint) and `/<endpoint>` (the REST collector).
+
+`serve(latency=..., fail_every=...)` adds per-request latency and injects a 429 on every
+n-th request, to exercise retries. Every video has `commentCount` comment threads, or
+`serve(comments_per_video=...)` of them, except every DISABLED_EVERY-th video, which
+answers 403 commentsDisabled. `server.counts` tallies requests per endpoint.
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BRANDS = ["Atomberg", "Orient", "Havells", "Crompton", "Polycab"]
+POOL_SIZE = 400
+PAGE_LIMIT = 200
+DISABLED_EVERY = 29
+COMMENT_TEMPLATES = [
+    "{brand} fan is amazing, super silent and saves power!",
+    "Worst purchase ever, {brand} service is terrible and the fan is noisy.",
+    "Which is better, {brand} or {other}?",
+    "Nice video bro, very helpful",
+    "I have the {brand} one for 2 years, no issues. {other} was not good at all.",
+    "Bought it after this review. Good product",
+    "Please review the {other} BLDC fan next",
+]
+
+
+def _h(s: str) -> int:
+    return int(hashlib.md5(s.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def video_ids_for(query: str):
+    start = _h(query) % POOL_SIZE
+    return [f"vid{(start + 7 * i) % POOL_SIZE:05d}" for i in range(PAGE_LIMIT)]
+
+
+def video_resource(vid: str, parts=("snippet", "statistics")):
+    n = int(vid[3:])
+    brand = BRANDS[n % len(BRANDS)]
+    out = {"kind": "youtube#video", "id": vid}
+    if "snippet" in parts:
+        out["snippet"] = {
+            "title": f"{brand} BLDC fan review {n}",
+            "description": f"Honest review of the {brand} fan, energy saving and remote. #{n}",
+            "channelTitle": f"channel {n % 37}",
+            "publishedAt": f"2024-{1 + n % 12:02d}-{1 + n % 28:02d}T10:00:00Z",
+            "tags": [brand.lower(), "fan", "review"],
+        }
+    if "statistics" in parts:
+        out["statistics"] = {"viewCount": str(1000 + 37 * n), "likeCount": str(10 + n), "commentCount": str(n % 50)}
+    return out
+
+
+def search_response(query: str, page_token: str, max_results: int):
+    ids = video_ids_for(query)
+    start = int(page_token or 0)
+    page = ids[start:start + max_results]
+    resp = {
+        "kind": "youtube#searchListResponse",
+        "items": [{"kind": "youtube#searchResult", "id": {"kind": "youtube#video", "videoId": v},
+                   "snippet": video_resource(v, ("snippet",))["snippet"]} for v in page],
+    }
+    if start + max_results < len(ids):
+        resp["nextPageToken"] = str(start + max_results)
+    return resp
+
+
+def comment_threads_response(vid: str, page_token: str, max_results: int, total: int = None):
+    n = int(vid[3:])
+    total = int(video_resource(vid, ("statistics",))["statistics"]["commentCount"]) if total is None else total
+    start = int(page_token or 0)
+    items = []
+    for i in range(start, min(start + max_results, total)):
+        h = _h(f"{vid}:{i}")
+        text = COMMENT_TEMPLATES[h % len(COMMENT_TEMPLATES)].format(
+            brand=BRANDS[n % len(BRANDS)], other=BRANDS[(h >> 8) % len(BRANDS)])
+        cid = f"c{vid}x{i}"
+        items.append({"kind": "youtube#commentThread", "id": cid, "snippet": {
+            "videoId": vid, "totalReplyCount": h % 4,
+            "topLevelComment": {"kind": "youtube#comment", "id": cid, "snippet": {
+                "textDisplay": text, "textOriginal": text, "likeCount": h % 100,
+                "publishedAt": f"2024-{1 + h % 12:02d}-{1 + h % 28:02d}T12:00:00Z"}}}})
+    resp = {"kind": "youtube#commentThreadListResponse", "items": items}
+    if start + max_results < total:
+        resp["nextPageToken"] = str(start + max_results)
+    return resp
+
+
+class _Handler(BaseHTTPRequestHandler):
+    latency = 0.0
+    fail_every = 0
+    comments_per_video = None
+
+    def do_GET(self):
+        server = self.server
+        u = urlparse(self.path)
+        qs = {k: v[0] for k, v in parse_qs(u.query).items()}
+        endpoint = u.path.rstrip("/").rsplit("/", 1)[-1]
+        with server.lock:
+            server.counts[endpoint] = server.counts.get(endpoint, 0) + 1
+            server.n_requests += 1
+            n = server.n_requests
+        time.sleep(self.latency)
+
+        if self.fail_every and n % self.fail_every == 0:
+            return self._send(429, {"error": {"code": 429, "message": "rateLimitExceeded"}})
+        if endpoint == "search":
+            body = search_response(qs.get("q", ""), qs.get("pageToken"), int(qs.get("maxResults", 5)))
+        elif endpoint == "videos":
+            parts = qs.get("part", "snippet,statistics").split(",")
+            body = {"kind": "youtube#videoListResponse",
+                    "items": [video_resource(v, parts) for v in qs.get("id", "").split(",") if v]}
+        elif endpoint == "commentThreads":
+            vid = qs.get("videoId", "vid00000")
+            if int(vid[3:]) % DISABLED_EVERY == 0:
+                return self._send(403, {"error": {"code": 403, "message": "The video has disabled comments.",
+                                                  "errors": [{"reason": "commentsDisabled"}]}})
+            body = comment_threads_response(vid, qs.get("pageToken"), int(qs.get("maxResults", 20)),
+                                            self.comments_per_video)
+        else:
+            return self._send(404, {"error": {"code": 404, "message": "not found"}})
+        self._send(200, body)
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port: int = 0, latency: float = 0.0, fail_every: int = 0, comments_per_video: int = None):
+    """Starts the stub; returns (server, base_url). Call server.shutdown() when done."""
+    handler = type("Handler", (_Handler,), {"latency": latency, "fail_every": fail_every,
+                                            "comments_per_video": comments_per_video})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.lock = threading.Lock()
+    server.counts = {}
+    server.n_requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
@@ -1,4 +1,5 @@
-import os, time, random, logging
+import argparse, os, logging, math, queue, threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse, urlunparse
 
@@ -11,7 +12,14 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 
+import metrics
+from collection_sink import PageSink
+from pacing import AdaptivePacer
+from schema import write_parquet
+from serp_archive import DEFAULT_ARCHIVE_PATH, SerpArchive, parse_archived
+
 BRANDS = ["atomberg","orient","havells","crompton","polycab"]
+SEARCH_URL = "https://www.google.com/search"
 
 def canonicalize_url(u):
     try:
@@ -20,7 +28,7 @@ def canonicalize_url(u):
     except Exception:
         return u
 
-def _setup_driver():
+def _setup_driver(driver_path=None):
     chrome_options = Options()
     chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--window-size=1920,1080")
@@ -31,141 +39,526 @@ def _setup_driver():
         "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
     )
-    service = ChromeService(ChromeDriverManager().install())
+    service = ChromeService(driver_path or ChromeDriverManager().install())
     driver = webdriver.Chrome(service=service, options=chrome_options)
     wait = WebDriverWait(driver, 10)
     return driver, wait
 
-def _collect_one_query(driver, wait, query, n_results):
-    collected = []
-    start = 0
-    abs_rank = 0
+# Pulls every result card of the page in a single WebDriver round trip; mirrors the
+# per-element lookups in _extract_cards_elements.
+_EXTRACT_CARDS_JS = """
+const cards = document.querySelectorAll('#search div.MjjYud');
+const out = [];
+cards.forEach((c, i) => {
+  const h = c.querySelector('h3');
+  if (!h) return;
+  const a = h.closest('a') || c.querySelector('a');
+  if (!a) return;
+  let desc = '';
+  for (const sel of ['div.VwiC3b', 'div.yXK7lf']) {
+    const d = c.querySelector(sel);
+    if (d) { desc = d.innerText.trim(); if (desc) break; }
+  }
+  out.push({title: h.innerText.trim(), href: a.getAttribute('href') ? a.href : null,
+            description: desc, position: i});
+});
+return out;
+"""
 
-    while len(collected) < n_results:
-        url = f"https://www.google.com/search?q={query.replace(' ','+')}&hl=en&gl=IN&pws=0&num=10&start={start}"
-        logging.info(f"[{query}] Loading: {url}")
-        driver.get(url)
+def _extract_cards_js(driver):
+    cards = driver.execute_script(_EXTRACT_CARDS_JS)
+    if not isinstance(cards, list):
+        raise ValueError("unexpected card extraction result")
+    return cards
 
+def _extract_cards_elements(driver):
+    cards = []
+    for i, c in enumerate(driver.find_elements(By.CSS_SELECTOR, "#search div.MjjYud")):
         try:
-            consent = wait.until(EC.presence_of_all_elements_located(
-                (By.XPATH, "//*[contains(., 'I agree') or contains(., 'Accept all')]")
-            ))
-            for el in consent:
-                try:
-                    if el.is_displayed() and el.tag_name.lower() in ("button","div","span"):
-                        el.click()
-                        break
-                except Exception:
-                    pass
+            h = c.find_element(By.CSS_SELECTOR, "h3")
         except Exception:
-            pass
+            continue
 
+        a = None
         try:
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#search")))
+            a = h.find_element(By.XPATH, "./ancestor::a[1]")
         except Exception:
-            logging.warning(f"[{query}] #search not found; breaking.")
-            break
-
-        cards = driver.find_elements(By.CSS_SELECTOR, "#search div.MjjYud")
-        page_rank = 0
+            try:
+                a = c.find_element(By.CSS_SELECTOR, "a")
+            except Exception:
+                pass
+        if not a:
+            continue
 
-        for c in cards:
+        desc = ""
+        for sel in ["div.VwiC3b", "div.yXK7lf"]:
             try:
-                h = c.find_element(By.CSS_SELECTOR, "h3")
+                desc = c.find_element(By.CSS_SELECTOR, sel).text.strip()
+                if desc:
+                    break
             except Exception:
-                continue
+                pass
 
-            a = None
+        cards.append({"title": h.text.strip(), "href": a.get_attribute("href"),
+                      "description": desc, "position": i})
+    return cards
+
+def _extract_cards(driver, batched_dom=True):
+    with metrics.timer("google.extract_cards", latency=True):
+        if batched_dom:
             try:
-                a = h.find_element(By.XPATH, "./ancestor::a[1]")
+                return _extract_cards_js(driver)
+            except Exception as e:
+                logging.warning(f"Batched DOM extraction failed ({e}); falling back to per-element lookups.")
+        return _extract_cards_elements(driver)
+
+def _search_url(query, start, base_url=SEARCH_URL):
+    return f"{base_url}?q={query.replace(' ','+')}&hl=en&gl=IN&pws=0&num=10&start={start}"
+
+def _load_page(driver, wait, query, start, base_url=SEARCH_URL):
+    """
+    Opens one results page and dismisses a consent dialog if shown. Returns None when
+    #search appears, else the block signal: "captcha", "consent" (the dialog came back
+    after the click) or "no_search".
+    """
+    url = _search_url(query, start, base_url)
+    logging.info(f"[{query}] Loading: {url}")
+    with metrics.timer("google.driver_get", latency=True):
+        driver.get(url)
+    metrics.count("google.pages")
+
+    clicked = False
+    try:
+        consent = wait.until(EC.presence_of_all_elements_located(
+            (By.XPATH, "//*[contains(., 'I agree') or contains(., 'Accept all')]")
+        ))
+        for el in consent:
+            try:
+                if el.is_displayed() and el.tag_name.lower() in ("button","div","span"):
+                    el.click()
+                    clicked = True
+                    break
             except Exception:
-                try:
-                    a = c.find_element(By.CSS_SELECTOR, "a")
-                except Exception:
-                    pass
-            if not a:
-                continue
+                pass
+    except Exception:
+        pass
 
-            href = a.get_attribute("href")
-            if not href or not href.startswith("http"):
-                continue
-            if "/aclk?" in href or "google.com/aclk" in href:
-                continue
+    try:
+        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#search")))
+    except Exception:
+        signal = _block_signal(driver, clicked)
+        logging.warning(f"[{query}] #search not found ({signal}).")
+        return signal
+    return None
 
-            title = h.text.strip()
-            desc = ""
-            for sel in ["div.VwiC3b", "div.yXK7lf"]:
-                try:
-                    desc = c.find_element(By.CSS_SELECTOR, sel).text.strip()
-                    if desc:
-                        break
-                except Exception:
-                    pass
+def _block_signal(driver, consent_clicked):
+    """Classifies a page without #search: CAPTCHA interstitial, consent loop or plain missing results."""
+    try:
+        url = driver.current_url
+        if "/sorry/" in url or "recaptcha" in url:
+            return "captcha"
+        if urlparse(url).netloc.startswith("consent."):
+            return "consent"
+        source = driver.page_source.lower()
+    except Exception:
+        return "no_search"
+    if "g-recaptcha" in source or "unusual traffic" in source:
+        return "captcha"
+    if consent_clicked:
+        return "consent"
+    return "no_search"
+
+def _paced_load(driver, wait, query, start, base_url, pacer):
+    """
+    `_load_page` in the pacer's next request slot, reporting the outcome back to it. A
+    blocked page is retried (after the pacer's back-off) up to `pacer.block_retries` times;
+    returns the last block signal, or None once the page loaded.
+    """
+    for _ in range(pacer.block_retries + 1):
+        pacer.wait()
+        signal = _load_page(driver, wait, query, start, base_url)
+        pacer.record(query, start, signal)
+        if signal is None:
+            return None
+    return signal
+
+def _archive_page(archive, driver, query, start):
+    """Stores the loaded page's HTML in `archive` (if any); never fails the collection."""
+    if archive is None:
+        return
+    try:
+        archive.put(query, start, driver.current_url, driver.page_source)
+        metrics.count("google.archived_pages")
+    except Exception as e:
+        logging.warning(f"[{query}] start={start}: could not archive page ({e})")
+
+def _is_organic(card):
+    href = card["href"]
+    if not href or not href.startswith("http"):
+        return False
+    if "/aclk?" in href or "google.com/aclk" in href:
+        return False
+    return True
+
+def _build_row(query, start, page_rank, abs_rank, card):
+    title = card["title"]
+    desc = card["description"]
+    text = f"{title} {desc}".lower()
+    mentions = {f"mention_{b}": (b in text) for b in BRANDS}
+    return {
+        "query": query,
+        "page": start//10 + 1,
+        "rank_page": page_rank,
+        "rank_abs": abs_rank,
+        "title": title,
+        "url": canonicalize_url(card["href"]),
+        "description": desc,
+        "platform": "google",
+        "result_type": "organic",
+        "engagement": 0,  
+        **mentions
+    }
+
+def _iter_query_pages(driver, wait, query, n_results, batched_dom=True, base_url=SEARCH_URL, state=None,
+                      archive=None, pacer=None):
+    """
+    Yields (page rows, state) per results page. `state` (start offset, abs_rank, rows collected,
+    done) is what a checkpoint needs to continue the query later; pass it back in to resume.
+    Each loaded page's HTML goes to `archive` when given. Page loads are spaced by `pacer`.
+    """
+    pacer = pacer or AdaptivePacer()
+    state = state or {}
+    start = state.get("start", 0)
+    abs_rank = state.get("abs_rank", 0)
+    collected = state.get("collected", 0)
+
+    while collected < n_results:
+        if _paced_load(driver, wait, query, start, base_url, pacer) is not None:
+            break
+        _archive_page(archive, driver, query, start)
+
+        cards = _extract_cards(driver, batched_dom)
+        page_rank = 0
+        page_start = start
+        rows = []
+
+        for card in cards:
+            if not _is_organic(card):
+                continue
 
             page_rank += 1
             abs_rank += 1
-            text = f"{title} {desc}".lower()
-            mentions = {f"mention_{b}": (b in text) for b in BRANDS}
-
-            collected.append({
-                "query": query,
-                "page": start//10 + 1,
-                "rank_page": page_rank,
-                "rank_abs": abs_rank,
-                "title": title,
-                "url": canonicalize_url(href),
-                "description": desc,
-                "platform": "google",
-                "result_type": "organic",
-                "engagement": 0,  
-                **mentions
-            })
-
-            if len(collected) >= n_results:
+            rows.append(_build_row(query, page_start, page_rank, abs_rank, card))
+            collected += 1
+
+            if collected >= n_results:
                 break
 
-        if len(collected) < n_results:
-            # Next page or stop
-            try:
-                next_btn = driver.find_element(By.ID, "pnnext")
-                next_btn.click()
+        done = collected >= n_results
+        if not done:
+            # Next page or stop; the next page is opened by URL in the pacer's next slot.
+            if driver.find_elements(By.ID, "pnnext"):
                 start += 10
-                time.sleep(random.uniform(5.0, 10.0))
-            except Exception:
+            else:
                 logging.info(f"[{query}] No next page; stopping.")
+                done = True
+
+        yield rows, {"start": start, "abs_rank": abs_rank, "collected": collected, "done": done}
+        if done and collected < n_results:
+            break
+
+def _collect_one_query(driver, wait, query, n_results, batched_dom=True, base_url=SEARCH_URL, pacer=None):
+    return [r for rows, _ in _iter_query_pages(driver, wait, query, n_results, batched_dom, base_url, pacer=pacer)
+            for r in rows]
+
+class _PoolWorker(threading.Thread):
+    """
+    One headless Chrome serving (query index, query, start) tasks from a shared queue.
+    A task whose driver raises (crash, lost session) gets the driver restarted and is retried up to
+    `max_retries` times; the outcome (cards, has_next) or None is stored in `results`.
+    All workers take their page loads from one shared `pacer`.
+    """
+
+    def __init__(self, tasks, results, lock, driver_path, batched_dom, base_url, pacer, max_retries,
+                 archive=None):
+        super().__init__(daemon=True)
+        self.tasks, self.results, self.lock, self.archive = tasks, results, lock, archive
+        self.driver_path, self.batched_dom, self.base_url = driver_path, batched_dom, base_url
+        self.pacer, self.max_retries = pacer, max_retries
+        self.driver = self.wait = None
+
+    def _restart(self):
+        self._quit()
+        self.driver, self.wait = _setup_driver(self.driver_path)
+
+    def _quit(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+        self.driver = self.wait = None
+
+    def _fetch(self, query, start):
+        if _paced_load(self.driver, self.wait, query, start, self.base_url, self.pacer) is not None:
+            return None
+        _archive_page(self.archive, self.driver, query, start)
+        cards = _extract_cards(self.driver, self.batched_dom)
+        has_next = bool(self.driver.find_elements(By.ID, "pnnext"))
+        return cards, has_next
+
+    def run(self):
+        try:
+            while True:
+                task = self.tasks.get()
+                if task is None:
+                    self.tasks.task_done()
+                    return
+                qi, query, start = task
+                outcome = None
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        if self.driver is None:
+                            self._restart()
+                        outcome = self._fetch(query, start)
+                        break
+                    except Exception as e:
+                        metrics.count("google.driver_restarts")
+                        logging.warning(f"[{query}] start={start}: driver error ({e.__class__.__name__}); "
+                                        f"restarting driver (attempt {attempt + 1}).")
+                        self._quit()
+                with self.lock:
+                    self.results[(qi, start)] = outcome
+                self.tasks.task_done()
+        finally:
+            self._quit()
+
+def _merge_pool_results(queries, results, n_results, states=None):
+    """
+    Rebuilds rows query by query, pages in order, assigning rank_page/rank_abs like the
+    sequential path, continuing from each query's checkpoint in `states`. Returns (rows,
+    {query: checkpoint state}); a query whose pages stopped at a failed load is left not
+    done, at that page, so `resume` continues it there.
+    """
+    states = states or {}
+    rows, out = [], {}
+    for qi, query in enumerate(queries):
+        state = states.get(query, {})
+        start = state.get("start", 0)
+        abs_rank = state.get("abs_rank", 0)
+        done = abs_rank >= n_results
+        for start in sorted(s for (i, s) in results if i == qi):
+            outcome = results[(qi, start)]
+            if outcome is None:
+                break
+            page_rank = 0
+            for card in outcome[0]:
+                if abs_rank >= n_results:
+                    break
+                if not _is_organic(card):
+                    continue
+                page_rank += 1
+                abs_rank += 1
+                rows.append(_build_row(query, start, page_rank, abs_rank, card))
+            done = abs_rank >= n_results or not outcome[1]
+            if done:
                 break
+            start += 10
+        out[query] = {"start": start, "abs_rank": abs_rank, "collected": abs_rank, "done": done}
+    return rows, out
 
-        time.sleep(random.uniform(3.0, 6.0))
+def _collect_pool(queries, n_results, workers, batched_dom=True, base_url=SEARCH_URL,
+                  pacer=None, max_retries=2, archive=None, states=None):
+    """
+    Collects all queries with `workers` Chrome instances sharing a queue of (query, page)
+    tasks. The first ceil(n_results/10) pages of every query are queued up front; queries
+    still short of n_results after a round get their next page queued, as long as the last
+    page had a next link. Rows come back in the same order and ranks as sequential collection.
+    Queries with a checkpoint in `states` continue from its page. Returns (rows, {query:
+    checkpoint state}).
+    """
+    states = states or {}
+    pacer = pacer or AdaptivePacer()
+    driver_path = ChromeDriverManager().install()
+    tasks = queue.Queue()
+    results = {}
+    lock = threading.Lock()
+    pool = [_PoolWorker(tasks, results, lock, driver_path, batched_dom, base_url, pacer, max_retries, archive)
+            for _ in range(workers)]
+    for w in pool:
+        w.start()
 
-    return collected
+    try:
+        first = {q: states.get(q, {}).get("start", 0) for q in queries}
+        have = {q: states.get(q, {}).get("collected", 0) for q in queries}
+        pending = [(qi, q, start) for qi, q in enumerate(queries)
+                   for start in range(first[q], first[q] + 10 * math.ceil((n_results - have[q]) / 10), 10)]
+        while pending:
+            for t in pending:
+                tasks.put(t)
+            tasks.join()
 
-def collect_google_multi(queries, n_results_per_query=20, out_dir="data/raw", out_name="google_multi_queries"):
+            pending = []
+            for qi, q in enumerate(queries):
+                starts = sorted(s for (i, s) in results if i == qi)
+                outcomes = [results[(qi, s)] for s in starts]
+                if not outcomes or any(o is None for o in outcomes):
+                    continue
+                got = have[q] + sum(1 for o in outcomes for c in o[0] if _is_organic(c))
+                if got < n_results and outcomes[-1][1]:
+                    pending.append((qi, q, starts[-1] + 10))
+    finally:
+        for _ in pool:
+            tasks.put(None)
+        for w in pool:
+            w.join()
+
+    rows, states = _merge_pool_results(queries, results, n_results, states)
+    for q in queries:
+        logging.info(f"[{q}] Collected {states[q]['collected']} results"
+                     + ("." if states[q]["done"] else "; blocked, left for --resume."))
+    return rows, states
+
+def collect_google_multi(queries, n_results_per_query=20, out_dir="data/raw", out_name="google_multi_queries",
+                         batched_dom=True, workers=1, base_url=SEARCH_URL, resume=False, write_csv=False,
+                         archive_path=DEFAULT_ARCHIVE_PATH, pacer=None):
+    """
+    Collects every query, streaming each page (or, with workers > 1, each finished query)
+    to a PageSink with a checkpoint, then streams the parts into `<out_name>.parquet`
+    (and `<out_name>.csv` with write_csv=True) and returns the parquet path (None when
+    nothing was collected).
+    `resume=True` skips finished queries and continues a partial one from its last page.
+    Every fetched page's HTML is archived in `archive_path` (None to skip), tagged with
+    this collection run, for `collect_google_offline`. Page loads are paced by `pacer` (default: `AdaptivePacer()`),
+    shared across queries and workers so what it learns carries over.
+    """
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
     Path(out_dir).mkdir(parents=True, exist_ok=True)
+    sink = PageSink(out_dir, out_name, resume=resume)
+    todo = [q for q in queries if not sink.state(q).get("done")]
+    archive = SerpArchive(archive_path, run=sink.started.timestamp()) if archive_path and todo else None
+    pacer = pacer or AdaptivePacer()
 
-    driver, wait = _setup_driver()
-    all_rows = []
     try:
-        for q in queries:
-            rows = _collect_one_query(driver, wait, q, n_results_per_query)
-            logging.info(f"[{q}] Collected {len(rows)} results.")
-            all_rows.extend(rows)
-            time.sleep(random.uniform(2.0, 4.0))
+        if workers > 1:
+            # Bounded groups of queries keep pooled rows in memory only until their group is written.
+            group = 2 * workers
+            for i in range(0, len(todo), group):
+                qs = todo[i:i + group]
+                rows, states = _collect_pool(qs, n_results_per_query, workers, batched_dom=batched_dom,
+                                             base_url=base_url, pacer=pacer, archive=archive,
+                                             states={q: sink.state(q) for q in qs})
+                for q in qs:
+                    sink.write_page([r for r in rows if r["query"] == q], q, states[q])
+        elif todo:
+            driver, wait = _setup_driver()
+            try:
+                for q in todo:
+                    state = sink.state(q)
+                    for rows, state in _iter_query_pages(driver, wait, q, n_results_per_query, batched_dom=batched_dom,
+                                                         base_url=base_url, state=state, archive=archive,
+                                                         pacer=pacer):
+                        sink.write_page(rows, q, state)
+                    logging.info(f"[{q}] Collected {state.get('collected', 0)} results.")
+            finally:
+                driver.quit()
+        if archive is not None:
+            for q in todo:
+                if sink.state(q).get("done"):
+                    archive.finish(q)
     finally:
-        driver.quit()
+        if archive is not None:
+            archive.close()
+    stats = pacer.stats()
+    logging.info(f"Pacing: {stats['pages']} page loads, {stats['blocks']} blocked, final delay {stats['delay']:.2f}s")
 
-    if not all_rows:
+    saved, n = sink.write_output(sink.iter_parts(queries), out_dir, out_name, dedup=["url","title","query"],
+                                 write_csv=write_csv)
+    if not saved:
         logging.warning("No results collected for any query.")
         return None
+    for path in saved:
+        metrics.bytes_written("google", path)
+    metrics.count("google.rows", n)
+    logging.info(f"Saved {n} rows to:\n  " + "\n  ".join(map(str, saved)))
+    if all(sink.state(q).get("done") for q in queries):
+        sink.cleanup()
+    else:
+        logging.warning("Some queries were blocked before finishing; rerun with --resume to continue them.")
+    return str(saved[0])
 
-    df = pd.DataFrame(all_rows).drop_duplicates(subset=["url","title","query"])
-    csv_path = os.path.join(out_dir, f"{out_name}.csv")
+def collect_google_offline(queries, n_results_per_query=20, out_dir="data/raw", out_name="google_multi_queries",
+                           archive_path=DEFAULT_ARCHIVE_PATH, as_of=None, workers=1, write_csv=False):
+    """
+    Rebuilds the collector's output from archived pages instead of the live site: every
+    query's newest complete archived run (up to `as_of`, a Unix time) is re-parsed with
+    `serp_archive.parse_serp` (in `workers` processes) and ranked exactly like a live run.
+    The output is stamped with the earliest fetch time of those pages, not the re-parse
+    time. Returns the parquet path, as `collect_google_multi` does (None without results).
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    archive = SerpArchive(archive_path)
+    try:
+        pages = archive.latest(queries, as_of)
+    finally:
+        archive.close()
+
+    keys = sorted(pages, key=lambda k: (queries.index(k[0]), k[1]))
+    with metrics.timer("google.offline_parse", rows=len(keys)):
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parsed = list(pool.map(parse_archived, (pages[k] for k in keys), chunksize=16))
+        else:
+            parsed = [parse_archived(pages[k]) for k in keys]
+    results = {(queries.index(q), start): outcome for (q, start), outcome in zip(keys, parsed)}
+    logging.info(f"Re-parsed {len(keys)} archived pages for {len(queries)} queries.")
+
+    rows, _ = _merge_pool_results(queries, results, n_results_per_query)
+    if not rows:
+        logging.warning("No archived results for any query.")
+        return None
+    fetched_at = min(pages[k][2] for k in keys)
+    return _save(pd.DataFrame(rows), out_dir, out_name, write_csv,
+                 collected_at=pd.Timestamp(fetched_at, unit="s", tz="UTC"))
+
+def _save(df, out_dir, out_name, write_csv=False, collected_at=None):
+    df = df.drop_duplicates(subset=["url","title","query"])
     parquet_path = os.path.join(out_dir, f"{out_name}.parquet")
-    df.to_csv(csv_path, index=False)
-    df.to_parquet(parquet_path, index=False)
-    logging.info(f"Saved {len(df)} rows to:\n  {csv_path}\n  {parquet_path}")
-    return df
+    write_parquet(df, parquet_path, collected_at=collected_at)
+    saved = [parquet_path]
+    if write_csv:
+        saved.append(os.path.join(out_dir, f"{out_name}.csv"))
+        df.to_csv(saved[-1], index=False)
+    for path in saved:
+        metrics.bytes_written("google", path)
+    metrics.count("google.rows", len(df))
+    logging.info(f"Saved {len(df)} rows to:\n  " + "\n  ".join(saved))
+    return parquet_path
 
 if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=1,
+                    help="parallel headless Chrome instances (with --offline: parser processes)")
+    ap.add_argument("--resume", action="store_true", help="continue an interrupted run from its checkpoint")
+    ap.add_argument("--csv", action="store_true", help="also export a CSV copy")
+    ap.add_argument("--offline", action="store_true", help="re-parse the SERP archive instead of scraping")
+    ap.add_argument("--no-archive", action="store_true", help="don't archive fetched pages")
+    ap.add_argument("--min-delay", type=float, default=2.0, help="floor of the adaptive delay between page loads (s)")
+    ap.add_argument("--max-delay", type=float, default=120.0, help="ceiling of the back-off delay (s)")
+    ap.add_argument("--pacing-log", default="data/raw/google_pacing.jsonl",
+                    help="JSON-lines log of every pacing decision ('' to disable)")
+    metrics.add_arguments(ap)
+    args = ap.parse_args()
+
     QUERIES = ["smart fan", "energy efficient fan", "BLDC fan"]
-    collect_google_multi(QUERIES, n_results_per_query=20, out_dir="data/raw", out_name="google_sov_india")
+    with metrics.session_from_args(args):
+        if args.offline:
+            collect_google_offline(QUERIES, n_results_per_query=20, out_dir="data/raw", out_name="google_sov_india",
+                                   workers=args.workers, write_csv=args.csv)
+        else:
+            collect_google_multi(QUERIES, n_results_per_query=20, out_dir="data/raw", out_name="google_sov_india",
+                                 workers=args.workers, resume=args.resume, write_csv=args.csv,
+                                 archive_path=None if args.no_archive else DEFAULT_ARCHIVE_PATH,
+                                 pacer=AdaptivePacer(min_delay=args.min_delay, max_delay=args.max_delay,
+                                                     log_path=args.pacing_log or None))
@@ -1,13 +1,22 @@
-import os, time, logging, math
+import argparse, os, time, logging, math, random, threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterable, List, Optional
 
 import pandas as pd
+import requests
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from dotenv import load_dotenv
 
+import metrics
+from collection_sink import PageSink, rebatch
+from comment_stream import MAX_RESULTS as COMMENT_PAGE_SIZE, stream_comments
+from video_store import VideoStore
+
 BRANDS = ["atomberg","orient","havells","crompton","polycab"]
+# Search results turned into output rows (video ids refreshed, rows built and written) at a time.
+ROWS_PER_BATCH = 5000
 
 def mention_flags(text: str) -> Dict[str, bool]:
     t = (text or "").lower()
@@ -19,126 +28,386 @@ def to_int(x):
     except Exception:
         return 0
 
+def _search_meta(q: str, it: Dict) -> Dict:
+    sn = it.get("snippet", {})
+    return {
+        "query": q,
+        "platform": "youtube",
+        "video_id": it["id"]["videoId"],
+        "title": sn.get("title",""),
+        "description": sn.get("description",""),
+        "channel_title": sn.get("channelTitle",""),
+        "published_at": sn.get("publishedAt",""),
+    }
+
+def _build_row(meta: Dict, v: Dict) -> Dict:
+    sn = v.get("snippet", {}) or {}
+    st = v.get("statistics", {}) or {}
+    tags = sn.get("tags", [])
+    views = to_int(st.get("viewCount"))
+    likes = to_int(st.get("likeCount"))
+    comments = to_int(st.get("commentCount"))
+    txt = f"{meta['title']} {meta['description']} {' '.join(tags)}"
+    flags = mention_flags(txt)
+    engagement_score = views + 5*likes + 10*comments
+
+    return {
+        **meta,
+        "tags": "|".join(tags) if isinstance(tags, list) else "",
+        "views": views,
+        "likes": likes,
+        "comments": comments,
+        "engagement_score": engagement_score,
+        **flags
+    }
+
+def _save(frames: Iterable[pd.DataFrame], sink: PageSink, out_dir: str, out_name: str,
+          write_csv: bool = False) -> Optional[str]:
+    saved, n = sink.write_output(frames, out_dir, out_name, dedup=["video_id","query"], write_csv=write_csv)
+    if not saved:
+        logging.warning("No YouTube rows collected.")
+        return None
+    for path in saved:
+        metrics.bytes_written("youtube", path)
+    metrics.count("youtube.rows", n)
+    logging.info(f"Saved {n} YouTube rows to:\n  " + "\n  ".join(map(str, saved)))
+    return str(saved[0])
+
 def collect_youtube_multi(
     queries: List[str],
     api_key: str,
     n_per_query: int = 30,
     out_dir: str = "data/raw",
     out_name: str = "youtube_sov_india",
-    sleep_between_pages: float = 0.8
-) -> pd.DataFrame:
+    sleep_between_pages: float = 0.8,
+    api_endpoint: str = None,
+    store: VideoStore = None,
+    resume: bool = False,
+    write_csv: bool = False
+) -> Optional[str]:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
     Path(out_dir).mkdir(parents=True, exist_ok=True)
 
-    yt = build("youtube", "v3", developerKey=api_key)
-    all_rows = []
-
-    for q in queries:
-        logging.info(f"[YouTube] Query: {q}")
-        got = 0
-        page_token = None
-        seen_ids = set()
+    client_options = {"api_endpoint": api_endpoint} if api_endpoint else None
+    yt = build("youtube", "v3", developerKey=api_key, client_options=client_options)
+    sink = PageSink(out_dir, out_name, resume=resume)
 
-        while got < n_per_query:
-            try:
-                srch = yt.search().list(
+    def search(q, page_token, max_results):
+        try:
+            with metrics.timer("youtube.api.search", latency=True):
+                return yt.search().list(
                     q=q,
                     part="snippet",
                     type="video",
-                    maxResults=min(50, n_per_query - got),
+                    maxResults=max_results,
                     regionCode="IN",
                     relevanceLanguage="en",
                     order="relevance",
                     pageToken=page_token
                 ).execute()
-            except HttpError as e:
-                logging.error(f"Search error for '{q}': {e}")
-                break
-
-            items = srch.get("items", [])
-            if not items:
-                break
-
-            ids = []
-            meta = {}
-            for it in items:
-                if it.get("id", {}).get("kind") != "youtube#video":
-                    continue
-                vid = it["id"]["videoId"]
-                if vid in seen_ids:
-                    continue
-                seen_ids.add(vid)
-                sn = it.get("snippet", {})
-                meta[vid] = {
-                    "query": q,
-                    "platform": "youtube",
-                    "video_id": vid,
-                    "title": sn.get("title",""),
-                    "description": sn.get("description",""),
-                    "channel_title": sn.get("channelTitle",""),
-                    "published_at": sn.get("publishedAt",""),
-                }
-                ids.append(vid)
-
-            if not ids:
-                break
-
-            try:
-                vresp = yt.videos().list(
-                    id=",".join(ids),
-                    part="snippet,statistics"
-                ).execute()
-            except HttpError as e:
-                logging.error(f"Videos error for '{q}': {e}")
-                break
-
-            for v in vresp.get("items", []):
-                vid = v["id"]
-                sn = v.get("snippet", {}) or {}
-                st = v.get("statistics", {}) or {}
-                tags = sn.get("tags", [])
-                views = to_int(st.get("viewCount"))
-                likes = to_int(st.get("likeCount"))
-                comments = to_int(st.get("commentCount"))
-                txt = f"{meta[vid]['title']} {meta[vid]['description']} {' '.join(tags)}"
-                flags = mention_flags(txt)
-                engagement_score = views + 5*likes + 10*comments
-
-                row = {
-                    **meta[vid],
-                    "tags": "|".join(tags) if isinstance(tags, list) else "",
-                    "views": views,
-                    "likes": likes,
-                    "comments": comments,
-                    "engagement_score": engagement_score,
-                    **flags
-                }
-                all_rows.append(row)
-                got += 1
-                if got >= n_per_query:
-                    break
-
-            page_token = srch.get("nextPageToken")
-            if not page_token:
-                break
-            time.sleep(sleep_between_pages)
-
-    if not all_rows:
-        logging.warning("No YouTube rows collected.")
-        return pd.DataFrame()
+        except HttpError as e:
+            logging.error(f"Search error for '{q}': {e}")
+            return None
+
+    for q in queries:
+        logging.info(f"[YouTube] Query: {q}")
+        _search_query(search, q, n_per_query, sink, sleep_between_pages)
+
+    def fetch(ids, part):
+        try:
+            with metrics.timer("youtube.api.videos", rows=len(ids), latency=True):
+                return yt.videos().list(id=",".join(ids), part=part).execute().get("items", [])
+        except HttpError as e:
+            logging.error(f"Videos error for {len(ids)} ids: {e}")
+            return []
+
+    return _rows_from_store(sink, queries, fetch, store, out_dir, out_name, write_csv=write_csv)
+
+def _search_query(search, q: str, n_per_query: int, sink: PageSink, sleep_between_pages: float = 0.0):
+    """
+    Paginates search results for `q`, writing each page's search metadata to `sink` with a
+    checkpoint (results so far, nextPageToken). `search(q, page_token, max_results)` returns
+    the search.list response, or None on error, which leaves the query resumable.
+    """
+    state = sink.state(q)
+    if state.get("done"):
+        return
+    got = state.get("got", 0)
+    page_token = state.get("page_token")
+    seen_ids = sink.values("video_id", q) if got else set()
+
+    while got < n_per_query:
+        srch = search(q, page_token, min(50, n_per_query - got))
+        if srch is None:
+            return
+
+        page = []
+        for it in srch.get("items", []):
+            if it.get("id", {}).get("kind") != "youtube#video":
+                continue
+            vid = it["id"]["videoId"]
+            if vid in seen_ids or got >= n_per_query:
+                continue
+            seen_ids.add(vid)
+            page.append(_search_meta(q, it))
+            got += 1
+
+        page_token = srch.get("nextPageToken")
+        done = not page or not page_token or got >= n_per_query
+        sink.write_page(page, q, {"got": got, "page_token": page_token, "done": done})
+        if done:
+            break
+        metrics.sleep(sleep_between_pages, "youtube.sleep")
+
+def _rows_from_store(sink: PageSink, queries: List[str], fetch, store: VideoStore, out_dir: str, out_name: str,
+                     map_fn=map, write_csv: bool = False) -> Optional[str]:
+    """
+    Streams the search results written to `sink` (in `queries` order, pages in order within
+    a query) through the video store in batches of ROWS_PER_BATCH: each batch's video ids
+    are refreshed (fetching only unknown or stale ones), one row is built per search result
+    and the batch is appended to the output, so memory stays flat however many results
+    there are. Returns the parquet path. The parts are kept for a `resume` run if any query's
+    search is unfinished or any video could not be fetched.
+    """
+    own_store = store is None
+    store = store or VideoStore()
+    missing = set()
+
+    def frames():
+        for metas in rebatch(sink.iter_parts(queries), ROWS_PER_BATCH):
+            ids = metas["video_id"].tolist()
+            store.refresh(ids, fetch, map_fn=map_fn)
+            videos = store.get_many(ids)
+            missing.update(set(ids) - set(videos))
+            rows = [_build_row(m, videos[m["video_id"]]) for m in metas.to_dict("records") if m["video_id"] in videos]
+            if rows:
+                yield pd.DataFrame(rows)
+
+    try:
+        path = _save(frames(), sink, out_dir, out_name, write_csv=write_csv)
+        logging.info(f"[YouTube] Video metadata: {store.fetched} fetched, {store.reused} reused from store")
+    finally:
+        if own_store:
+            store.close()
+    unfinished = [q for q in queries if not sink.state(q).get("done")]
+    if unfinished:
+        logging.warning(f"[YouTube] Search unfinished for {len(unfinished)} queries; rerun with resume to continue them.")
+    if missing:
+        logging.warning(f"[YouTube] {len(missing)} videos without metadata; rerun with resume to fetch them.")
+    if not unfinished and not missing:
+        sink.cleanup()
+    return path
+
+class QuotaExhausted(Exception):
+    pass
+
+class QuotaBudget:
+    """
+    Token bucket over YouTube Data API quota units (search.list = 100, videos.list = 1).
+    `acquire(cost)` blocks until `cost` units have accumulated at `refill_per_sec`
+    (bucket size `burst`) and raises QuotaExhausted once `total` units would be exceeded.
+    """
+
+    def __init__(self, total: int = 10_000, burst: int = 1_000, refill_per_sec: float = 100.0):
+        self.total = total
+        self.burst = burst
+        self.refill_per_sec = refill_per_sec
+        self.tokens = float(burst)
+        self.spent = 0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
 
-    df = pd.DataFrame(all_rows).drop_duplicates(subset=["video_id","query"])
-    csv_path = os.path.join(out_dir, f"{out_name}.csv")
-    parquet_path = os.path.join(out_dir, f"{out_name}.parquet")
-    df.to_csv(csv_path, index=False)
-    df.to_parquet(parquet_path, index=False)
-    logging.info(f"Saved {len(df)} YouTube rows to:\n  {csv_path}\n  {parquet_path}")
-    return df
+    def acquire(self, cost: int):
+        while True:
+            with self.lock:
+                if self.spent + cost > self.total:
+                    raise QuotaExhausted(f"quota budget of {self.total} units exhausted ({self.spent} spent)")
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.refill_per_sec)
+                self.updated = now
+                if self.tokens >= cost:
+                    self.tokens -= cost
+                    self.spent += cost
+                    return
+                wait = (cost - self.tokens) / self.refill_per_sec
+            metrics.sleep(wait, "youtube.quota_wait")
+
+QUOTA_COST = {"search": 100, "videos": 1, "commentThreads": 1}
+API_URL = "https://www.googleapis.com/youtube/v3"
+
+class YouTubeClient:
+    """
+    Thread-safe REST client for search.list / videos.list / commentThreads.list over a pooled
+    requests.Session. Every call is charged against `budget` and retried with exponential
+    backoff on 403 (rate/quota limits), 429 and 5xx responses; a 403 for a video with
+    comments disabled is raised at once.
+    """
+
+    def __init__(self, api_key: str, budget: QuotaBudget, base_url: str = API_URL,
+                 pool_size: int = 16, max_retries: int = 5, backoff: float = 1.0, timeout: float = 30.0):
+        self.api_key = api_key
+        self.budget = budget
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def call(self, endpoint: str, **params) -> Dict:
+        params = {k: v for k, v in params.items() if v is not None}
+        params["key"] = self.api_key
+        for attempt in range(self.max_retries + 1):
+            self.budget.acquire(QUOTA_COST[endpoint])
+            with metrics.timer(f"youtube.api.{endpoint}", latency=True):
+                resp = self.session.get(f"{self.base_url}/{endpoint}", params=params, timeout=self.timeout)
+            metrics.count(f"youtube.http_{resp.status_code}")
+            if resp.status_code == 200:
+                return resp.json()
+            retryable = resp.status_code in (403, 429) or resp.status_code >= 500
+            if resp.status_code == 403 and "quotaExceeded" in resp.text:
+                raise QuotaExhausted(f"{endpoint}: daily quota exceeded")
+            if resp.status_code == 403 and "commentsDisabled" in resp.text:
+                retryable = False
+            if not retryable or attempt == self.max_retries:
+                resp.raise_for_status()
+            delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+            logging.warning(f"[YouTube] {endpoint} HTTP {resp.status_code}; retrying in {delay:.1f}s")
+            metrics.sleep(delay, "youtube.backoff")
+        raise RuntimeError("unreachable")
+
+    def close(self):
+        self.session.close()
+
+def collect_youtube_concurrent(
+    queries: List[str],
+    api_key: str,
+    n_per_query: int = 30,
+    out_dir: str = "data/raw",
+    out_name: str = "youtube_sov_india",
+    max_workers: int = 8,
+    budget: QuotaBudget = None,
+    base_url: str = API_URL,
+    store: VideoStore = None,
+    resume: bool = False,
+    write_csv: bool = False,
+) -> Optional[str]:
+    """
+    Concurrent counterpart of `collect_youtube_multi`: up to `max_workers` queries are
+    paginated at once, then stale video ids are refreshed in concurrent 50-id videos.list
+    batches, all over one pooled HTTP session and a shared quota budget. Writes the same schema.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+
+    client = YouTubeClient(api_key, budget or QuotaBudget(), base_url=base_url, pool_size=max_workers)
+    sink = PageSink(out_dir, out_name, resume=resume)
+
+    def search(q, page_token, max_results):
+        try:
+            return client.call("search", q=q, part="snippet", type="video", maxResults=max_results,
+                               regionCode="IN", relevanceLanguage="en", order="relevance", pageToken=page_token)
+        except (requests.RequestException, QuotaExhausted) as e:
+            logging.error(f"Search error for '{q}': {e}")
+            return None
+
+    def fetch(ids, part):
+        try:
+            return client.call("videos", id=",".join(ids), part=part).get("items", [])
+        except (requests.RequestException, QuotaExhausted) as e:
+            logging.error(f"Videos error for {len(ids)} ids: {e}")
+            return []
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(lambda q: _search_query(search, q, n_per_query, sink), queries))
+            path = _rows_from_store(sink, queries, fetch, store, out_dir, out_name, map_fn=pool.map,
+                                    write_csv=write_csv)
+    finally:
+        client.close()
+    logging.info(f"[YouTube] Quota units spent: {client.budget.spent}")
+    return path
+
+def collect_youtube_comments(
+    video_ids: List[str],
+    api_key: str,
+    out_dir: str = "data/raw",
+    out_name: str = "youtube_comments",
+    batch_size: int = 5000,
+    max_pages_per_video: int = None,
+    budget: QuotaBudget = None,
+    base_url: str = API_URL,
+    sentiment_backend: str = "batch",
+    collection_date=None,
+) -> Dict:
+    """
+    Streams the comment threads of `video_ids` into the `<out_dir>/<out_name>` dataset
+    (see comment_stream.py): brand flags and sentiment per `batch_size` comments, one
+    parquet part per batch, memory bounded by the batch whatever the comment volume.
+    Videos with comments disabled or failing requests are skipped; once the quota budget
+    is exhausted the remaining videos are skipped and what was fetched is kept.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    client = YouTubeClient(api_key, budget or QuotaBudget(), base_url=base_url, pool_size=1)
+    exhausted = []
+
+    def fetch_page(video_id, page_token):
+        if exhausted:
+            return None
+        try:
+            return client.call("commentThreads", part="snippet", videoId=video_id, maxResults=COMMENT_PAGE_SIZE,
+                               textFormat="plainText", order="time", pageToken=page_token)
+        except QuotaExhausted as e:
+            logging.error(f"[YouTube] Stopping comment collection: {e}")
+            exhausted.append(video_id)
+        except requests.HTTPError as e:
+            if "commentsDisabled" in e.response.text:
+                metrics.count("youtube.comments_disabled")
+            else:
+                logging.error(f"commentThreads error for {video_id}: {e}")
+        except requests.RequestException as e:
+            logging.error(f"commentThreads error for {video_id}: {e}")
+        return None
+
+    try:
+        stats = stream_comments(video_ids, fetch_page, Path(out_dir) / out_name, batch_size=batch_size,
+                                max_pages=max_pages_per_video, backend=sentiment_backend,
+                                collection_date=collection_date)
+    finally:
+        client.close()
+    logging.info(f"[YouTube] {stats['comments']} comments ({stats['with_brand']} mentioning a brand) in "
+                 f"{stats['parts']} parts at {stats['path']}; quota units spent: {client.budget.spent}")
+    return stats
 
 if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--concurrent", action="store_true", help="use the concurrent, quota-aware collector")
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--resume", action="store_true", help="continue an interrupted run from its checkpoint")
+    ap.add_argument("--csv", action="store_true", help="also export a CSV copy")
+    ap.add_argument("--comments", action="store_true",
+                    help="stream the comments of the collected videos into data/raw/youtube_comments/")
+    ap.add_argument("--comment-batch-size", type=int, default=5000, help="comments enriched and written per part")
+    ap.add_argument("--max-comment-pages", type=int, default=None, help="comment pages (100 each) per video")
+    metrics.add_arguments(ap)
+    args = ap.parse_args()
+
     load_dotenv()
     YT_KEY = os.getenv("YOUTUBE_API_KEY")
 
     QUERIES = ["smart fan", "energy efficient fan", "BLDC fan"]
-    collect_youtube_multi(QUERIES, api_key=YT_KEY, n_per_query=30,
-                          out_dir="data/raw", out_name="youtube_sov_india")
+    with metrics.session_from_args(args):
+        if args.comments:
+            videos = pd.read_parquet("data/raw/youtube_sov_india.parquet", columns=["video_id"])
+            collect_youtube_comments(videos["video_id"].drop_duplicates().tolist(), api_key=YT_KEY,
+                                     batch_size=args.comment_batch_size, max_pages_per_video=args.max_comment_pages)
+        elif args.concurrent:
+            collect_youtube_concurrent(QUERIES, api_key=YT_KEY, n_per_query=30, out_dir="data/raw",
+                                       out_name="youtube_sov_india", max_workers=args.workers, resume=args.resume,
+                                       write_csv=args.csv)
+        else:
+            collect_youtube_multi(QUERIES, api_key=YT_KEY, n_per_query=30,
+                                  out_dir="data/raw", out_name="youtube_sov_india", resume=args.resume,
+                                  write_csv=args.csv)
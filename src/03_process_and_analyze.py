@@ -1,17 +1,46 @@
+import argparse
+import hashlib
 import os
+import shutil
+from functools import partial
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
-from utils import brand_flags, sentiment_label_and_score
+import metrics
+from utils import (POSITIVE_THRESHOLD, SENTIMENT_BACKENDS, brand_flag_frame, brand_snippets, sentiment_labels,
+                   sentiment_labels_and_scores)
+from sentiment_cache import SentimentCache, score_texts
+from near_dup import near_duplicate_clusters
+from schema import (BRAND_SENTIMENT_COLS, MENTION_COLS, MENTIONS_COL, collected_at, compact, mention_matrix,
+                    read_columns, unpack_mentions, write_parquet)
+from sov_cube import update_cube
+from sov_dataset import scan_frames
+from sov_bootstrap import LEVEL as CI_LEVEL, RESAMPLES as BOOTSTRAP_RESAMPLES, share_intervals
 
 RAW_DIR = Path("data/raw")
 PROCESSED_DIR = Path("data/processed")
 RESULTS_DIR = Path("results")
+SENTIMENT_CACHE_PATH = PROCESSED_DIR / "sentiment_cache.sqlite"
+PROCESSED_DATASET_DIR = PROCESSED_DIR / "combined"
+# Incremental state: one directory per committed generation, named by its run stamp, plus a
+# CURRENT file naming the live one. The flat files are the layout before generations.
+INCREMENTAL_STATE_DIR = PROCESSED_DIR / "incremental_state"
+STATE_FILES = ("manifest.parquet", "sov_partials.parquet", "sentiment_partials.parquet", "parts.parquet")
+MANIFEST_PATH = PROCESSED_DIR / "manifest.parquet"
+SOV_PARTIALS_PATH = PROCESSED_DIR / "sov_partials.parquet"
+SENTIMENT_PARTIALS_PATH = PROCESSED_DIR / "sentiment_partials.parquet"
+MANIFEST_KEY = ["platform", "url", "query", "batch"]
 PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 RESULTS_DIR.mkdir(parents=True, exist_ok=True)
 
 QUERIES = ["smart fan", "energy efficient fan", "BLDC fan"]
+GOOGLE_COLUMNS = ["query","page","rank_page","rank_abs","title","url","description","result_type","engagement"]
+YOUTUBE_COLUMNS = ["query","video_id","title","description","engagement_score"]
 CANONICAL_BRANDS = ["Atomberg","Orient","Havells","Crompton","Polycab"]
+# "row": one sentiment per row from its whole title + description; "brand": per-brand
+# sentiment from the sentences mentioning each brand only.
+SENTIMENT_SCOPES = ["row", "brand"]
 
 
 def compute_engagement(row):
@@ -21,16 +50,49 @@ def compute_engagement(row):
 
     return 0.0
 
-def load_google():
-
+def _find_raw(stem: str):
     paths = [
-        RAW_DIR / "google_sov_india.parquet",
-        RAW_DIR / "google_sov_india.csv",
+        RAW_DIR / f"{stem}.parquet",
+        RAW_DIR / f"{stem}.csv",
     ]
-    p = next((x for x in paths if x.exists()), None)
+    return next((x for x in paths if x.exists()), None)
+
+def raw_batch_id(path) -> str:
+    """Collection batch of a raw file: the collectors rewrite the file on every run, so its content hash."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:12]
+
+def raw_collection_date(path) -> pd.Timestamp:
+    """
+    UTC day a raw file was collected: the collectors' `collected_at` stamp, or for CSVs and
+    files written before the stamp existed, the day the file was last modified.
+    """
+    stamp = collected_at(path) if Path(path).suffix == ".parquet" else None
+    if stamp is None:
+        stamp = pd.Timestamp(os.path.getmtime(path), unit="s", tz="UTC")
+    return pd.Timestamp(stamp.tz_convert("UTC").date())
+
+def collection_dates(override=None) -> dict:
+    """{platform: collection date} of the raw files present; `override` (--date) replaces them all."""
+    dates = {}
+    for stem, platform in (("google_sov_india", "google"), ("youtube_sov_india", "youtube")):
+        p = _find_raw(stem)
+        if p:
+            dates[platform] = pd.Timestamp(override).normalize() if override is not None else raw_collection_date(p)
+    return dates
+
+def _dated(aggregates: pd.DataFrame, dates: dict) -> pd.DataFrame:
+    return aggregates.assign(date=aggregates["platform"].astype(str).map(dates))
+
+def load_google():
+
+    p = _find_raw("google_sov_india")
     if not p:
         return pd.DataFrame()
-    df = pd.read_parquet(p) if p.suffix == ".parquet" else pd.read_csv(p)
+    df = read_columns(p, GOOGLE_COLUMNS)
 
     keep = {
         "query":"query",
@@ -45,25 +107,28 @@ def load_google():
     return out
 
 def load_youtube():
-    paths = [
-        RAW_DIR / "youtube_sov_india.parquet",
-        RAW_DIR / "youtube_sov_india.csv",
-    ]
-    p = next((x for x in paths if x.exists()), None)
+    p = _find_raw("youtube_sov_india")
     if not p:
         return pd.DataFrame()
-    df = pd.read_parquet(p) if p.suffix == ".parquet" else pd.read_csv(p)
+    df = read_columns(p, YOUTUBE_COLUMNS)
 
     df["platform"] = "youtube"
     df["url"] = df.get("video_id", "")
     return df[["query","title","description","url","platform","engagement_score"]].copy()
 
-def enrich_flags_and_sentiment(df: pd.DataFrame) -> pd.DataFrame:
+def enrich_flags_and_sentiment(df: pd.DataFrame, cache: SentimentCache = None,
+                               workers: int = 1, chunk_size: int = 2000, backend: str = "vader",
+                               scope: str = "row") -> pd.DataFrame:
     txt = (df.get("title","").fillna("") + " " + df.get("description","").fillna("")).astype(str)
 
-    sent = txt.apply(sentiment_label_and_score)
-    df["sentiment_label"] = sent.apply(lambda x: x[0])
-    df["sentiment_score"] = sent.apply(lambda x: x[1])
+    scorer = partial(sentiment_labels_and_scores, workers=workers, chunk_size=chunk_size, backend=backend)
+    if scope == "brand":
+        df = brand_scoped_sentiment(df, txt, cache, scorer)
+    else:
+        with metrics.timer("process.sentiment", rows=len(txt)):
+            labels, scores = score_texts(txt, cache=cache, scorer=scorer)
+        df["sentiment_label"] = labels
+        df["sentiment_score"] = scores
 
 
     for b in CANONICAL_BRANDS:
@@ -71,72 +136,181 @@ def enrich_flags_and_sentiment(df: pd.DataFrame) -> pd.DataFrame:
         if col in df.columns:
             df = df.drop(columns=[col])
 
-    flags_df = txt.apply(brand_flags).apply(pd.Series)
+    with metrics.timer("process.brand_flags", rows=len(txt)):
+        if scope == "brand":
+            # The snippet scan already found every mention: a brand has a score exactly where it's mentioned.
+            flags_df = pd.DataFrame(df[BRAND_SENTIMENT_COLS].notna().to_numpy(), columns=MENTION_COLS, index=df.index)
+        else:
+            flags_df = brand_flag_frame(txt)
     df = pd.concat([df, flags_df], axis=1)
 
     return df
 
+def brand_scoped_sentiment(df: pd.DataFrame, txt: pd.Series, cache: SentimentCache = None,
+                           scorer=None) -> pd.DataFrame:
+    """
+    Brand-scoped sentiment: only the sentences around each brand mention are scored
+    (`utils.brand_snippets`), one text per (row, brand), into the `sentiment_score_<brand>`
+    columns; rows without a mention aren't scored at all. The row's `sentiment_score` is
+    the mean of its brand scores (0 without a mention) and `sentiment_label` its label.
+    """
+    with metrics.timer("process.brand_snippets", rows=len(txt)):
+        rows, cols, snippets = brand_snippets(txt)
+    with metrics.timer("process.sentiment", rows=len(snippets)):
+        _, scores = score_texts(snippets, cache=cache, scorer=scorer)
+    metrics.count("process.sentiment_skipped_rows", len(txt) - len(np.unique(rows)))
+
+    per_brand = np.full((len(txt), len(BRAND_SENTIMENT_COLS)), np.nan)
+    per_brand[rows, cols] = scores
+    mentioned = ~np.isnan(per_brand)
+    row_score = np.where(mentioned, per_brand, 0.0).sum(axis=1) / np.maximum(mentioned.sum(axis=1), 1)
+    df = df.drop(columns=[c for c in BRAND_SENTIMENT_COLS if c in df.columns])
+    df = pd.concat([df, pd.DataFrame(per_brand, columns=BRAND_SENTIMENT_COLS, index=df.index)], axis=1)
+    df["sentiment_label"] = sentiment_labels(row_score)
+    df["sentiment_score"] = row_score
+    return df
 
-def pivot_sov(df: pd.DataFrame, level_cols):
+def add_dup_clusters(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Computes SoV by Mentions, SoV by Engagement, and SoPV (Share of Positive Voice)
-    grouped by `level_cols` (e.g., ['query'] or ['query','platform']).
-    """
-    rows = []
-    for keys, grp in df.groupby(level_cols):
-
-        m = {}
-        for b in CANONICAL_BRANDS:
-            col = f"mention_{b.lower()}"
-            if col in grp.columns:
-                m[b] = int(grp[col].sum())
-            else:
-                m[b] = 0
-        total_mentions = sum(m.values()) or 1
-
-
-        e = {}
-
-        grp_e = grp[grp["engagement_score"] > 0]
-        for b in CANONICAL_BRANDS:
-            col = f"mention_{b.lower()}"
-            e[b] = float(grp_e.loc[grp_e[col] == True, "engagement_score"].sum())
-        total_eng = sum(e.values()) or 1.0
-
-        p = {}
-        grp_pos = grp[grp["sentiment_label"] == "positive"]
-        for b in CANONICAL_BRANDS:
-            col = f"mention_{b.lower()}"
-            p[b] = int(grp_pos[col].sum()) if col in grp_pos.columns else 0
-        total_pos = sum(p.values()) or 1
-
-        if not isinstance(keys, tuple):
-            keys = (keys,)
-        base = {level_cols[i]: keys[i] for i in range(len(level_cols))}
-        for b in CANONICAL_BRANDS:
-            rows.append({
-                **base,
-                "brand": b,
-                "mentions": m[b],
-                "sov_mentions_pct": 100.0 * m[b] / total_mentions,
-                "engagement": e[b],
-                "sov_engagement_pct": 100.0 * (e[b] / total_eng) if total_eng > 0 else 0.0,
-                "positive_mentions": p[b],
-                "sopv_pct": 100.0 * p[b] / total_pos
-            })
-    return pd.DataFrame(rows)
-
-def process_and_analyze():
-    print("Starting data processing and analysis...")
+    Adds `dup_cluster`, the position of the first row of each row's near-duplicate cluster
+    (syndicated copies, re-uploads; see near_dup.py), across platforms.
+    """
+    txt = (df.get("title","").fillna("") + " " + df.get("description","").fillna("")).astype(str)
+    with metrics.timer("process.near_dup", rows=len(txt)):
+        df["dup_cluster"] = near_duplicate_clusters(txt)
+    return df
 
 
-    google_df = load_google()
-    youtube_df = load_youtube()
-    if google_df.empty and youtube_df.empty:
-        print("Error: No raw data found. Run collectors first.")
-        return
-    print(f"Loaded: google={len(google_df)}, youtube={len(youtube_df)}")
+def positive_matrix(df: pd.DataFrame) -> np.ndarray:
+    """
+    (rows x brands) bool matrix of positive sentiment: the row's label for every brand, or
+    each brand's own score where the row has brand-scoped sentiment.
+    """
+    pos = np.repeat((df["sentiment_label"] == "positive").to_numpy()[:, None], len(CANONICAL_BRANDS), axis=1)
+    if all(c in df.columns for c in BRAND_SENTIMENT_COLS):
+        scores = df[BRAND_SENTIMENT_COLS].to_numpy(dtype=float)
+        scoped = ~np.isnan(scores).all(axis=1)
+        pos[scoped] = scores[scoped] > POSITIVE_THRESHOLD
+    return pos
+
+def sov_aggregates(df: pd.DataFrame, level_cols, unique: bool = False) -> pd.DataFrame:
+    """
+    Additive per-(group, brand) totals behind the SoV tables: `mentions`, `engagement`
+    (engagement_score summed over rows with a positive score) and `positive_mentions`.
+    One grouped reduction over a (rows x 3*brands) block; rows with a NaN key are dropped
+    like `df.groupby(level_cols)` does. Output is long-form, groups sorted, brands in
+    CANONICAL_BRANDS order. `unique=True` counts every near-duplicate cluster once per
+    group, by its first row (needs `add_dup_clusters`). In rows with brand-scoped sentiment
+    (`sentiment_score_<brand>`) a mention counts as positive by its own brand's score.
+    """
+    level_cols = list(level_cols)
+    nb = len(CANONICAL_BRANDS)
+    if unique:
+        df = df.drop_duplicates(level_cols + ["dup_cluster"])
+
+    flags = mention_matrix(df)
+    eng = pd.to_numeric(df["engagement_score"], errors="coerce").to_numpy(dtype=float)
+    eng = np.where(eng > 0, eng, 0.0)
+    pos = positive_matrix(df)
+
+    block = pd.concat([
+        pd.DataFrame(flags.astype(np.int64), columns=[f"m{i}" for i in range(nb)]),
+        pd.DataFrame(flags * eng[:, None], columns=[f"e{i}" for i in range(nb)]),
+        pd.DataFrame((flags & pos).astype(np.int64), columns=[f"p{i}" for i in range(nb)]),
+    ], axis=1)
+    keys = [df[c].reset_index(drop=True) for c in level_cols]
+    sums = block.groupby(keys, sort=True, observed=True).sum()
+
+    out = sums.index.to_frame(index=False).loc[np.repeat(np.arange(len(sums)), nb)].reset_index(drop=True)
+    out["brand"] = np.tile(CANONICAL_BRANDS, len(sums))
+    out["mentions"] = sums[[f"m{i}" for i in range(nb)]].to_numpy().ravel()
+    out["engagement"] = sums[[f"e{i}" for i in range(nb)]].to_numpy().ravel()
+    out["positive_mentions"] = sums[[f"p{i}" for i in range(nb)]].to_numpy().ravel()
+    return out
+
+def sov_shares(agg: pd.DataFrame, level_cols) -> pd.DataFrame:
+    """
+    Derives the SoV percentages from `sov_aggregates` output (or any frame of summed
+    aggregates with one row per group and brand, brands in CANONICAL_BRANDS order).
+    """
+    level_cols = list(level_cols)
+    nb = len(CANONICAL_BRANDS)
+    order = {b: i for i, b in enumerate(CANONICAL_BRANDS)}
+    agg = (agg.assign(_brand_order=agg["brand"].map(order))
+              .sort_values(level_cols + ["_brand_order"], kind="stable")
+              .drop(columns="_brand_order")
+              .reset_index(drop=True))
+    if len(agg) % nb:
+        raise ValueError("Aggregates must hold one row per brand for every group.")
+
+    m = agg["mentions"].to_numpy().reshape(-1, nb)
+    e = agg["engagement"].to_numpy(dtype=float).reshape(-1, nb)
+    p = agg["positive_mentions"].to_numpy().reshape(-1, nb)
+    total_m = m.sum(axis=1, keepdims=True)
+    total_e = e.sum(axis=1, keepdims=True)
+    total_p = p.sum(axis=1, keepdims=True)
+    total_m[total_m == 0] = 1
+    total_e[total_e == 0] = 1.0
+    total_p[total_p == 0] = 1
+
+    out = agg[level_cols + ["brand", "mentions"]].copy()
+    out["sov_mentions_pct"] = (100.0 * m / total_m).ravel()
+    out["engagement"] = e.ravel()
+    out["sov_engagement_pct"] = (100.0 * (e / total_e)).ravel()
+    out["positive_mentions"] = agg["positive_mentions"].to_numpy()
+    out["sopv_pct"] = (100.0 * p / total_p).ravel()
+    return out
 
+def sov_intervals(df: pd.DataFrame, level_cols, resamples: int = BOOTSTRAP_RESAMPLES, level: float = CI_LEVEL,
+                  seed: int = 0) -> pd.DataFrame:
+    """
+    Bootstrap `level` confidence intervals of `sov_mentions_pct` and `sopv_pct` per group of
+    `level_cols` and brand (`*_lo`/`*_hi` columns), from `resamples` resamples of each
+    group's rows (see sov_bootstrap.py). Groups and brands come in `sov_aggregates` order.
+    """
+    level_cols = list(level_cols)
+    nb = len(CANONICAL_BRANDS)
+    grouped = df.groupby(level_cols, sort=True, observed=True)
+    group = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    keys = grouped.size().index.to_frame(index=False)
+    mentions = mention_matrix(df)
+    flags = np.stack([mentions, mentions & positive_matrix(df)], axis=1)
+    with metrics.timer("process.bootstrap", rows=len(df)):
+        low, high = share_intervals(flags, group, len(keys), resamples, level, seed)
+
+    out = keys.loc[np.repeat(np.arange(len(keys)), nb)].reset_index(drop=True)
+    out["brand"] = np.tile(CANONICAL_BRANDS, len(keys))
+    out["sov_mentions_pct_lo"] = low[:, 0].ravel()
+    out["sov_mentions_pct_hi"] = high[:, 0].ravel()
+    out["sopv_pct_lo"] = low[:, 1].ravel()
+    out["sopv_pct_hi"] = high[:, 1].ravel()
+    return out
+
+def add_sov_intervals(table: pd.DataFrame, df: pd.DataFrame, level_cols, resamples: int = BOOTSTRAP_RESAMPLES,
+                      level: float = CI_LEVEL, seed: int = 0) -> pd.DataFrame:
+    """`table` (`sov_shares` output for `level_cols`) with the `sov_intervals` bounds next to each share."""
+    if resamples <= 0 or table.empty:
+        return table
+    level_cols = list(level_cols)
+    ci = sov_intervals(df, level_cols, resamples, level, seed)
+    out = table.merge(ci, on=level_cols + ["brand"], how="left")
+    out.index = table.index
+    cols = list(table.columns)
+    cols[cols.index("sov_mentions_pct") + 1:cols.index("sov_mentions_pct") + 1] = ["sov_mentions_pct_lo",
+                                                                                   "sov_mentions_pct_hi"]
+    cols[cols.index("sopv_pct") + 1:cols.index("sopv_pct") + 1] = ["sopv_pct_lo", "sopv_pct_hi"]
+    return out[cols]
+
+def pivot_sov(df: pd.DataFrame, level_cols, unique: bool = False):
+    """
+    Computes SoV by Mentions, SoV by Engagement, and SoPV (Share of Positive Voice)
+    grouped by `level_cols` (e.g., ['query'], ['query','platform'] or any other columns
+    such as channel or date), per raw row or, with `unique=True`, per unique item.
+    """
+    with metrics.timer("process.pivot_sov", rows=len(df)):
+        return sov_shares(sov_aggregates(df, level_cols, unique), level_cols)
+
+def _combine(google_df: pd.DataFrame, youtube_df: pd.DataFrame) -> pd.DataFrame:
     combined = pd.concat([google_df, youtube_df], ignore_index=True, sort=False)
     if "query" not in combined.columns:
 
@@ -148,15 +322,84 @@ def process_and_analyze():
         combined = combined.rename(columns={"engagement": "engagement_score"})
     elif "engagement" in combined.columns and "engagement_score" in combined.columns:
         combined = combined.drop(columns=["engagement"])
+    return combined
+
+def _enrich(combined: pd.DataFrame, use_sentiment_cache: bool, workers: int, chunk_size: int,
+            backend: str = "vader", scope: str = "row"):
+    cache = SentimentCache(SENTIMENT_CACHE_PATH) if use_sentiment_cache else None
+    try:
+        combined = enrich_flags_and_sentiment(combined, cache=cache, workers=workers, chunk_size=chunk_size,
+                                              backend=backend, scope=scope)
+        if cache is not None:
+            cache.evict()
+    finally:
+        if cache is not None:
+            cache.close()
+    return combined.loc[:, ~combined.columns.duplicated()], cache
+
+def sentiment_counts(df: pd.DataFrame) -> pd.DataFrame:
+    """Rows mentioning any brand, counted per (query, sentiment_label)."""
+    return (
+        df.assign(any_brand=mention_matrix(df).any(axis=1))
+          .loc[lambda d: d["any_brand"]]
+          .groupby(["query","sentiment_label"], observed=True)
+          .size()
+          .reset_index(name="count")
+    )
+
+def _write_results(sov_by_query: pd.DataFrame, sov_by_query_platform: pd.DataFrame, sent_dist: pd.DataFrame,
+                   sov_by_query_unique: pd.DataFrame = None, out_dir=RESULTS_DIR):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tables = [("sov_by_query", sov_by_query), ("sov_by_query_platform", sov_by_query_platform),
+              ("sentiment_distribution", sent_dist)]
+    if sov_by_query_unique is not None:
+        tables.append(("sov_by_query_unique", sov_by_query_unique))
+    elif (out_dir / "sov_by_query_unique.csv").exists():
+        # Only full runs cluster near-duplicates; an earlier run's table would not match these.
+        (out_dir / "sov_by_query_unique.csv").unlink()
+        print(f"Removed outdated {out_dir / 'sov_by_query_unique.csv'}")
+    for name, table in tables:
+        table.to_csv(out_dir / f"{name}.csv", index=False)
+        metrics.bytes_written("results", out_dir / f"{name}.csv")
+
+    print("Data processing and analysis complete.")
+    print("Saved: \n  " + "\n  ".join(str(out_dir / f"{name}.csv") for name, _ in tables))
+
+def process_and_analyze(use_sentiment_cache: bool = True, sentiment_workers: int = 1,
+                        sentiment_chunk_size: int = 2000, write_csv: bool = False, collection_date=None,
+                        sentiment_backend: str = "vader", sentiment_scope: str = "row",
+                        bootstrap_resamples: int = BOOTSTRAP_RESAMPLES, ci_level: float = CI_LEVEL):
+    print("Starting data processing and analysis...")
+
+
+    with metrics.timer("process.load"):
+        google_df = load_google()
+        youtube_df = load_youtube()
+    if google_df.empty and youtube_df.empty:
+        print("Error: No raw data found. Run collectors first.")
+        return
+    print(f"Loaded: google={len(google_df)}, youtube={len(youtube_df)}")
+
+    combined = _combine(google_df, youtube_df)
 
 
     print("Enriching brand flags and sentiment...")
-    combined = enrich_flags_and_sentiment(combined)
+    combined, cache = _enrich(combined, use_sentiment_cache, sentiment_workers, sentiment_chunk_size,
+                              sentiment_backend, sentiment_scope)
 
-    combined = combined.loc[:, ~combined.columns.duplicated()]
+    print("Clustering near-duplicates...")
+    combined = add_dup_clusters(combined)
+    print(f"Near-duplicates: {len(combined)} rows, {combined['dup_cluster'].nunique()} unique items")
+
+    combined = compact(combined)
     processed_path = PROCESSED_DIR / "combined_processed.parquet"
-    combined.to_parquet(processed_path, index=False)
-    combined.to_csv(PROCESSED_DIR / "combined_processed.csv", index=False)
+    with metrics.timer("process.write_parquet", rows=len(combined)):
+        write_parquet(combined, processed_path, compacted=True)
+    metrics.bytes_written("processed", processed_path)
+    if write_csv:
+        unpack_mentions(combined).to_csv(PROCESSED_DIR / "combined_processed.csv", index=False)
+        metrics.bytes_written("processed", PROCESSED_DIR / "combined_processed.csv")
 
     print(f"Processed data saved to {processed_path}")
 
@@ -164,23 +407,240 @@ def process_and_analyze():
     print("Computing SoV tables...")
     
     sov_by_query = pivot_sov(combined, ["query"]).sort_values(["query","brand"])
+    sov_by_query = add_sov_intervals(sov_by_query, combined, ["query"], bootstrap_resamples, ci_level)
     
-    sov_by_query_platform = pivot_sov(combined, ["query","platform"]).sort_values(["query","platform","brand"])
-
-    sov_by_query.to_csv(RESULTS_DIR / "sov_by_query.csv", index=False)
-    sov_by_query_platform.to_csv(RESULTS_DIR / "sov_by_query_platform.csv", index=False)
+    aggregates = sov_aggregates(combined, ["query","platform"])
+    sov_by_query_platform = sov_shares(aggregates, ["query","platform"]).sort_values(["query","platform","brand"])
+    sov_by_query_platform = add_sov_intervals(sov_by_query_platform, combined, ["query","platform"],
+                                              bootstrap_resamples, ci_level)
+
+    sov_by_query_unique = pivot_sov(combined, ["query"], unique=True).sort_values(["query","brand"])
+
+    _write_results(sov_by_query, sov_by_query_platform, sentiment_counts(combined), sov_by_query_unique)
+    update_cube(_dated(aggregates, collection_dates(collection_date)))
+    if cache is not None:
+        print(f"Sentiment cache: {cache.hits} hits, {cache.misses} misses ({SENTIMENT_CACHE_PATH})")
+
+def _current_generation():
+    pointer = INCREMENTAL_STATE_DIR / "CURRENT"
+    return pointer.read_text().strip() if pointer.exists() else None
+
+def _load_state():
+    """(manifest, SoV partials, sentiment partials, dataset parts) of the committed generation, None where missing."""
+    generation = _current_generation()
+    if generation is not None:
+        paths = [INCREMENTAL_STATE_DIR / generation / name for name in STATE_FILES]
+    else:
+        paths = [MANIFEST_PATH, SOV_PARTIALS_PATH, SENTIMENT_PARTIALS_PATH, None]
+    return tuple(pd.read_parquet(p) if p is not None and p.exists() else None for p in paths)
+
+def _commit_state(generation: str, manifest: pd.DataFrame, sov_partials: pd.DataFrame,
+                  sent_partials: pd.DataFrame, parts: pd.DataFrame):
+    """Writes the state as generation `generation` and switches the CURRENT pointer to it in one rename."""
+    staging = INCREMENTAL_STATE_DIR / f".{generation}.inprogress"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    for df, name in zip((manifest, sov_partials, sent_partials, parts), STATE_FILES):
+        df.to_parquet(staging / name, index=False)
+    os.replace(staging, INCREMENTAL_STATE_DIR / generation)
+    pointer = INCREMENTAL_STATE_DIR / "CURRENT"
+    tmp = pointer.with_suffix(".tmp")
+    tmp.write_text(generation)
+    os.replace(tmp, pointer)
+
+    for old in INCREMENTAL_STATE_DIR.iterdir():
+        if old.is_dir() and old.name != generation:
+            shutil.rmtree(old, ignore_errors=True)
+    for legacy in (MANIFEST_PATH, SOV_PARTIALS_PATH, SENTIMENT_PARTIALS_PATH):
+        legacy.unlink(missing_ok=True)
+
+def _drop_uncommitted_parts(parts: pd.DataFrame):
+    """Deletes dataset parts a crashed run wrote but never committed: all those not in `parts` (None: all)."""
+    committed = set() if parts is None else set(parts["part"])
+    if not PROCESSED_DATASET_DIR.exists():
+        return
+    for part in PROCESSED_DATASET_DIR.rglob("part-*.parquet"):
+        if part.relative_to(PROCESSED_DATASET_DIR).as_posix() not in committed:
+            part.unlink()
 
-    sent_dist = (
-        combined.assign(any_brand=combined[[f"mention_{b.lower()}" for b in CANONICAL_BRANDS]].any(axis=1))
-                .loc[lambda d: d["any_brand"]]
-                .groupby(["query","sentiment_label"])
-                .size()
-                .reset_index(name="count")
-    )
-    sent_dist.to_csv(RESULTS_DIR / "sentiment_distribution.csv", index=False)
+def process_incremental(use_sentiment_cache: bool = True, sentiment_workers: int = 1,
+                        sentiment_chunk_size: int = 2000, collection_date=None, sentiment_backend: str = "vader",
+                        sentiment_scope: str = "row"):
+    """
+    Incremental variant of `process_and_analyze`: only raw rows missing from the manifest are
+    enriched, appended to the partitioned dataset and folded into the stored aggregates.
+    Delete `INCREMENTAL_STATE_DIR` and the dataset directory to start over.
+    """
+    print("Starting incremental processing...")
+
+    frames = []
+    for stem, loader in (("google_sov_india", load_google), ("youtube_sov_india", load_youtube)):
+        df = loader()
+        if not df.empty:
+            frames.append(df.assign(batch=raw_batch_id(_find_raw(stem))))
+    if not frames:
+        print("Error: No raw data found. Run collectors first.")
+        return
+    combined = _combine(*frames) if len(frames) == 2 else _combine(frames[0], pd.DataFrame())
+    dates = collection_dates(collection_date)
+
+    seen, sov_partials, sent_partials, parts = _load_state()
+    # State from before committed parts were listed keeps its parts.
+    if parts is not None or seen is None:
+        _drop_uncommitted_parts(parts)
+    keys = combined[MANIFEST_KEY].astype(str).reset_index(drop=True)
+    if seen is not None:
+        seen = seen.drop_duplicates()
+        is_new = keys.merge(seen, on=MANIFEST_KEY, how="left", indicator=True)["_merge"].eq("left_only").to_numpy()
+    else:
+        is_new = np.ones(len(keys), dtype=bool)
+    new = combined[is_new]
+    print(f"Raw rows: {len(combined)}, new: {len(new)}")
+    cache = None
+
+    if len(new):
+        print("Enriching brand flags and sentiment...")
+        new, cache = _enrich(new.copy(), use_sentiment_cache, sentiment_workers, sentiment_chunk_size,
+                             sentiment_backend, sentiment_scope)
+        new = compact(new)
+
+        stamp = pd.Timestamp.now(tz="UTC").strftime("%Y%m%dT%H%M%S%f")
+        written = []
+        for batch, part in new.groupby("batch"):
+            platform = str(part["platform"].iloc[0])
+            day = dates[platform]
+            out_dir = PROCESSED_DATASET_DIR / f"date={day:%Y-%m-%d}" / f"batch={batch}"
+            out_dir.mkdir(parents=True, exist_ok=True)
+            write_parquet(part.drop(columns=["batch"]), out_dir / f"part-{stamp}.parquet", compacted=True)
+            metrics.bytes_written("processed", out_dir / f"part-{stamp}.parquet")
+            written.append({"part": (out_dir / f"part-{stamp}.parquet").relative_to(PROCESSED_DATASET_DIR).as_posix(),
+                            "date": f"{day:%Y-%m-%d}", "platform": platform, "generation": stamp})
+
+        sov_partials = pd.concat([sov_partials, sov_aggregates(new, ["query","platform"])], ignore_index=True)
+        sov_partials = sov_partials.groupby(["query","platform","brand"], as_index=False, sort=False, observed=True).sum()
+        sent_partials = pd.concat([sent_partials, sentiment_counts(new)], ignore_index=True)
+        sent_partials = sent_partials.groupby(["query","sentiment_label"], as_index=False, observed=True).sum()
+
+        manifest = keys[is_new] if seen is None else pd.concat([seen, keys[is_new]], ignore_index=True)
+        parts = pd.concat([parts, pd.DataFrame(written)], ignore_index=True)
+        _commit_state(stamp, manifest, sov_partials, sent_partials, parts)
+        print(f"Appended {len(new)} rows to {PROCESSED_DATASET_DIR}")
+
+    if parts is not None:
+        # Rebuilt on every run, so a crash between the commit and the cube update is made good.
+        latest = parts[parts["generation"] == parts["generation"].max()]
+        _rebuild_cube_slices(set(zip(latest["date"], latest["platform"])))
+
+    if sov_partials is None:
+        print("Error: No processed data yet.")
+        return
 
-    print("Data processing and analysis complete.")
-    print(f"Saved: \n  {RESULTS_DIR/'sov_by_query.csv'}\n  {RESULTS_DIR/'sov_by_query_platform.csv'}\n  {RESULTS_DIR/'sentiment_distribution.csv'}")
+    print("Computing SoV tables from stored aggregates...")
+    _write_results(*_tables_from_aggregates(sov_partials), sent_partials)
+    if cache is not None:
+        print(f"Sentiment cache: {cache.hits} hits, {cache.misses} misses ({SENTIMENT_CACHE_PATH})")
+
+def _rebuild_cube_slices(slices):
+    """Recomputes the cube's (date, platform) `slices` from the dataset, replacing them as a full run does."""
+    frames = []
+    for date, platform in sorted(slices):
+        aggregates, _ = scan_sov_aggregates(PROCESSED_DATASET_DIR, ["query","platform"], platforms=[platform],
+                                            since=date, until=date)
+        if aggregates is not None:
+            frames.append(aggregates.assign(date=date))
+    if frames:
+        update_cube(pd.concat(frames, ignore_index=True))
+
+def _tables_from_aggregates(aggregates: pd.DataFrame):
+    """(sov_by_query, sov_by_query_platform) from per-(query, platform, brand) aggregates."""
+    by_query = aggregates.groupby(["query","brand"], as_index=False, sort=False, observed=True)[
+        ["mentions","engagement","positive_mentions"]].sum()
+    sov_by_query = sov_shares(by_query, ["query"]).sort_values(["query","brand"])
+    sov_by_query_platform = sov_shares(aggregates, ["query","platform"]).sort_values(["query","platform","brand"])
+    return sov_by_query, sov_by_query_platform
+
+def _fold(total: pd.DataFrame, part: pd.DataFrame, keys) -> pd.DataFrame:
+    part = part.astype({k: str for k in keys})
+    if total is None:
+        return part
+    return pd.concat([total, part], ignore_index=True).groupby(keys, as_index=False, sort=False).sum()
+
+def scan_sov_aggregates(dataset_dir=PROCESSED_DATASET_DIR, level_cols=("query","platform"),
+                        batch_size: int = 262_144, **filters):
+    """
+    Out-of-core (`sov_aggregates`, `sentiment_counts`) over the partitioned dataset, folded one
+    record batch at a time; `filters` as in sov_dataset.py. Both None when no row matches.
+    """
+    level_cols = list(level_cols)
+    columns = level_cols + ["query", "engagement_score", "sentiment_label", MENTIONS_COL] + MENTION_COLS \
+        + BRAND_SENTIMENT_COLS
+    aggregates = counts = None
+    rows = 0
+    with metrics.timer("process.scan_dataset"):
+        for frame in scan_frames(dataset_dir, columns, batch_size=batch_size, **filters):
+            rows += len(frame)
+            aggregates = _fold(aggregates, sov_aggregates(frame, level_cols), level_cols + ["brand"])
+            counts = _fold(counts, sentiment_counts(frame), ["query","sentiment_label"])
+    metrics.count("process.scanned_rows", rows)
+    if counts is not None:
+        counts = counts.sort_values(["query","sentiment_label"]).reset_index(drop=True)
+    return aggregates, counts
+
+def analyze_dataset(queries=None, platforms=None, since=None, until=None, batch_size: int = 262_144,
+                    out_dir=RESULTS_DIR):
+    """Result tables from a scan of the partitioned dataset; filtered scans must not write to `RESULTS_DIR`."""
+    out_dir = Path(out_dir)
+    filtered = any(f is not None for f in (queries, platforms, since, until))
+    if filtered and out_dir.resolve() == RESULTS_DIR.resolve():
+        print(f"Error: a filtered scan would overwrite the full results in {RESULTS_DIR}; pass --out <dir>.")
+        return
+    print(f"Scanning {PROCESSED_DATASET_DIR}...")
+    aggregates, counts = scan_sov_aggregates(PROCESSED_DATASET_DIR, ["query","platform"], batch_size,
+                                             queries=queries, platforms=platforms, since=since, until=until)
+    if aggregates is None:
+        print("Error: No processed rows match; run with --incremental first.")
+        return
+    _write_results(*_tables_from_aggregates(aggregates), counts, out_dir=out_dir)
 
 if __name__ == "__main__":
-    process_and_analyze()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=1, help="processes for sentiment scoring")
+    ap.add_argument("--chunk-size", type=int, default=2000, help="texts per sentiment scoring task")
+    ap.add_argument("--no-sentiment-cache", action="store_true")
+    ap.add_argument("--sentiment-backend", choices=SENTIMENT_BACKENDS, default="vader",
+                    help="vader: NLTK per text; batch: vectorized engine with the same scores (sentiment_batch.py)")
+    ap.add_argument("--sentiment-scope", choices=SENTIMENT_SCOPES, default="row",
+                    help="row: score whole title + description; brand: score only the sentences mentioning "
+                         "each brand, giving per-brand sentiment and SoPV")
+    ap.add_argument("--incremental", action="store_true",
+                    help="process only raw rows not yet in the manifest and update stored aggregates")
+    ap.add_argument("--out-of-core", action="store_true",
+                    help="only compute the result tables by scanning the partitioned dataset in batches")
+    ap.add_argument("--queries", default=None, help="comma-separated queries to include (out-of-core)")
+    ap.add_argument("--platforms", default=None, help="comma-separated platforms to include (out-of-core)")
+    ap.add_argument("--since", default=None, help="first collection date to include, YYYY-MM-DD (out-of-core)")
+    ap.add_argument("--until", default=None, help="last collection date to include, YYYY-MM-DD (out-of-core)")
+    ap.add_argument("--batch-size", type=int, default=262_144, help="rows per scanned record batch (out-of-core)")
+    ap.add_argument("--out", default=str(RESULTS_DIR),
+                    help="directory for the result tables (out-of-core; required with the filters above)")
+    ap.add_argument("--bootstrap", type=int, default=BOOTSTRAP_RESAMPLES,
+                    help="bootstrap resamples for the SoV / SoPV confidence intervals, 0 to skip (full mode)")
+    ap.add_argument("--ci-level", type=float, default=CI_LEVEL, help="confidence level of the intervals (full mode)")
+    ap.add_argument("--csv", action="store_true", help="also export combined_processed.csv (full mode)")
+    ap.add_argument("--date", default=None, help="collection date for the SoV cube and the dataset partitions "
+                                                     "(default: when the raw files were collected)")
+    metrics.add_arguments(ap)
+    args = ap.parse_args()
+    opts = dict(use_sentiment_cache=not args.no_sentiment_cache,
+                sentiment_workers=args.workers, sentiment_chunk_size=args.chunk_size, collection_date=args.date,
+                sentiment_backend=args.sentiment_backend, sentiment_scope=args.sentiment_scope)
+    with metrics.session_from_args(args):
+        if args.out_of_core:
+            analyze_dataset(queries=args.queries.split(",") if args.queries else None,
+                            platforms=args.platforms.split(",") if args.platforms else None,
+                            since=args.since, until=args.until, batch_size=args.batch_size, out_dir=args.out)
+        elif args.incremental:
+            process_incremental(**opts)
+        else:
+            process_and_analyze(write_csv=args.csv, bootstrap_resamples=args.bootstrap, ci_level=args.ci_level,
+                                **opts)
@@ -1,45 +1,160 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-import os
+
+import metrics
 
 RESULTS_DIR = "results"
 VISUALIZATIONS_DIR = os.path.join(RESULTS_DIR, "visualizations")
+MANIFEST_NAME = ".render_manifest.json"
 
-if not os.path.exists(VISUALIZATIONS_DIR):
-    os.makedirs(VISUALIZATIONS_DIR)
+# Bump when a chart's drawing code changes so every chart is redrawn once.
+RENDER_VERSION = 2
 
 
-sov_by_query = pd.read_csv(os.path.join(RESULTS_DIR, "sov_by_query.csv"))
-sov_by_query_platform = pd.read_csv(os.path.join(RESULTS_DIR, "sov_by_query_platform.csv"))
-sentiment_distribution = pd.read_csv(os.path.join(RESULTS_DIR, "sentiment_distribution.csv"))
+def _sov_bars(data, x):
+    """
+    Grouped SoV bars, with the bootstrap confidence intervals (`sov_mentions_pct_lo`/`_hi`)
+    as error bars when the table has them (full-mode tables do, incremental ones don't).
+    """
+    order = list(dict.fromkeys(data[x]))
+    hue_order = list(dict.fromkeys(data["brand"]))
+    ax = sns.barplot(x=x, y="sov_mentions_pct", hue="brand", data=data, order=order, hue_order=hue_order,
+                     errorbar=None)
+    if "sov_mentions_pct_lo" not in data.columns:
+        return
+    for bars, brand in zip(ax.containers, hue_order):
+        rows = data[data["brand"] == brand].set_index(x).reindex(order)
+        if len(bars) != len(rows):
+            continue
+        centers = [bar.get_x() + bar.get_width() / 2 for bar in bars]
+        pct = rows["sov_mentions_pct"].to_numpy()
+        err = [pct - rows["sov_mentions_pct_lo"].to_numpy(), rows["sov_mentions_pct_hi"].to_numpy() - pct]
+        ax.errorbar(centers, pct, yerr=err, fmt="none", ecolor="black", elinewidth=1, capsize=3)
 
-plt.figure(figsize=(12, 6))
-sns.barplot(x="query", y="sov_mentions_pct", hue="brand", data=sov_by_query)
-plt.title("Share of Voice by Query")
-plt.xlabel("Query")
-plt.ylabel("Share of Voice (%)")
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.savefig(os.path.join(VISUALIZATIONS_DIR, "sov_by_query.png"))
-plt.close()
+def _plot_sov_by_query(data, path):
+    plt.figure(figsize=(12, 6))
+    _sov_bars(data, "query")
+    plt.title("Share of Voice by Query")
+    plt.xlabel("Query")
+    plt.ylabel("Share of Voice (%)")
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
 
-for query in sov_by_query_platform["query"].unique():
+def _plot_sov_by_platform(data, path):
+    query = data["query"].iloc[0]
     plt.figure(figsize=(12, 6))
-    sns.barplot(x="platform", y="sov_mentions_pct", hue="brand", data=sov_by_query_platform[sov_by_query_platform["query"] == query])
+    _sov_bars(data, "platform")
     plt.title(f"Share of Voice for '{query}' by Platform")
     plt.xlabel("Platform")
     plt.ylabel("Share of Voice (%)")
     plt.tight_layout()
-    plt.savefig(os.path.join(VISUALIZATIONS_DIR, f"sov_by_platform_{query.replace(' ', '_')}.png"))
+    plt.savefig(path)
+    plt.close()
+
+def _plot_sentiment_distribution(data, path):
+    plt.figure(figsize=(8, 8))
+    data.groupby("sentiment_label")["count"].sum().plot(kind='pie', autopct='%1.1f%%', startangle=140)
+    plt.title("Sentiment Distribution of Brand Mentions")
+    plt.ylabel("")
+    plt.tight_layout()
+    plt.savefig(path)
     plt.close()
 
-plt.figure(figsize=(8, 8))
-sentiment_distribution.groupby("sentiment_label")["count"].sum().plot(kind='pie', autopct='%1.1f%%', startangle=140)
-plt.title("Sentiment Distribution of Brand Mentions")
-plt.ylabel("")
-plt.tight_layout()
-plt.savefig(os.path.join(VISUALIZATIONS_DIR, "sentiment_distribution.png"))
-plt.close()
+PLOTTERS = {
+    "sov_by_query": _plot_sov_by_query,
+    "sov_by_platform": _plot_sov_by_platform,
+    "sentiment_distribution": _plot_sentiment_distribution,
+}
+
+
+def chart_specs(results_dir=RESULTS_DIR):
+    """(file name, plotter kind, input slice) for every chart drawn from the result tables."""
+    sov_by_query = pd.read_csv(os.path.join(results_dir, "sov_by_query.csv"))
+    sov_by_query_platform = pd.read_csv(os.path.join(results_dir, "sov_by_query_platform.csv"))
+    sentiment_distribution = pd.read_csv(os.path.join(results_dir, "sentiment_distribution.csv"))
+
+    specs = [("sov_by_query.png", "sov_by_query", sov_by_query)]
+    for query in sov_by_query_platform["query"].unique():
+        specs.append((f"sov_by_platform_{query.replace(' ', '_')}.png", "sov_by_platform",
+                      sov_by_query_platform[sov_by_query_platform["query"] == query]))
+    specs.append(("sentiment_distribution.png", "sentiment_distribution", sentiment_distribution))
+    return specs
+
+def slice_hash(kind, data):
+    h = hashlib.sha1(f"{RENDER_VERSION}:{kind}:".encode())
+    h.update(data.to_csv(index=False).encode("utf-8"))
+    return h.hexdigest()
+
+def _render(kind, data, path):
+    t0 = time.perf_counter()
+    PLOTTERS[kind](data, path)
+    return time.perf_counter() - t0
+
+def render_all(results_dir=RESULTS_DIR, out_dir=None, workers=None, force=False):
+    """
+    Renders every chart whose input slice changed since the last run (per the manifest in
+    `out_dir`), in `workers` processes (default: one per CPU, capped by the number of charts).
+    Returns {file name: render seconds, or None when skipped}.
+    """
+    out_dir = out_dir or os.path.join(results_dir, "visualizations")
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    timings, todo = {}, []
+    for name, kind, data in chart_specs(results_dir):
+        h = slice_hash(kind, data)
+        path = os.path.join(out_dir, name)
+        if not force and manifest.get(name) == h and os.path.exists(path):
+            timings[name] = None
+        else:
+            todo.append((name, kind, data, path, h))
+
+    workers = min(workers or os.cpu_count() or 1, len(todo))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(name, h, pool.submit(_render, kind, data, path)) for name, kind, data, path, h in todo]
+            done = [(name, h, fut.result()) for name, h, fut in futures]
+    else:
+        done = [(name, h, _render(kind, data, path)) for name, kind, data, path, h in todo]
+
+    for name, h, seconds in done:
+        manifest[name] = h
+        timings[name] = seconds
+        metrics.observe("render.chart", seconds)
+        metrics.bytes_written("charts", os.path.join(out_dir, name))
+    metrics.count("render.charts", len(done))
+    metrics.count("render.skipped", len(timings) - len(done))
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return timings
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=None, help="render processes (default: CPU count)")
+    ap.add_argument("--force", action="store_true", help="redraw charts even if their inputs are unchanged")
+    metrics.add_arguments(ap)
+    args = ap.parse_args()
 
-print("Visualizations saved to results/visualizations directory.")
+    with metrics.session_from_args(args):
+        with metrics.timer("render.all"):
+            timings = render_all(workers=args.workers, force=args.force)
+    for name, seconds in timings.items():
+        print(f"  {name}: " + ("unchanged, skipped" if seconds is None else f"{seconds:.2f}s"))
+    print("Visualizations saved to results/visualizations directory.")
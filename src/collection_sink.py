@@ -0,0 +1,160 @@
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+
+import metrics
+from schema import ParquetAppender
+
+# Rows per row group of the compacted output; parts are far smaller than a useful row group.
+ROWS_PER_GROUP = 10_000
+
+
+class PageSink:
+    """
+    Streams collected pages to `<out_dir>/<out_name>_parts/part-NNNNNN.parquet` and keeps a
+    checkpoint of per-key (query) progress in `checkpoint.json`, written after each part.
+    With `resume=True` an existing checkpoint is picked up and parts written after it
+    (a crash between part and checkpoint) are discarded; otherwise any previous parts are
+    cleared. The checkpoint also records which key every part belongs to, so a key's parts
+    can be read on their own: `iter_parts()` and `write_output()` stream them back one
+    part at a time, key by key, and `values()` reads one column of one key.
+    """
+
+    def __init__(self, out_dir, out_name: str, resume: bool = False):
+        self.dir = Path(out_dir) / f"{out_name}_parts"
+        self.checkpoint_path = self.dir / "checkpoint.json"
+        self.lock = threading.Lock()
+
+        if not resume and self.dir.exists():
+            logging.info(f"Discarding previous partial collection in {self.dir}")
+            shutil.rmtree(self.dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+        self.ckpt = {"next_part": 0, "keys": {}, "part_keys": [], "started": pd.Timestamp.now(tz="UTC").isoformat()}
+        if resume and self.checkpoint_path.exists():
+            self.ckpt = json.loads(self.checkpoint_path.read_text())
+            if "part_keys" in self.ckpt:
+                del self.ckpt["part_keys"][self.ckpt["next_part"]:]
+            for p in self._parts():
+                if int(p.stem.split("-")[1]) >= self.ckpt["next_part"]:
+                    p.unlink()
+            self.ckpt.setdefault("started", pd.Timestamp(self.checkpoint_path.stat().st_mtime, unit="s", tz="UTC").isoformat())
+            done = sum(1 for s in self.ckpt["keys"].values() if s.get("done"))
+            logging.info(f"Resuming from {self.checkpoint_path}: {self.ckpt['next_part']} parts, {done} keys done")
+
+    def _parts(self) -> List[Path]:
+        return sorted(self.dir.glob("part-*.parquet"))
+
+    @property
+    def started(self) -> pd.Timestamp:
+        """When the collection first started; kept in the checkpoint across resumes."""
+        return pd.Timestamp(self.ckpt["started"])
+
+    def state(self, key: str) -> Dict:
+        with self.lock:
+            return dict(self.ckpt["keys"].get(key, {}))
+
+    def write_page(self, rows: List[Dict], key: str, state: Dict):
+        """Appends `rows` as one part (if any) and records `state` as the checkpoint for `key`."""
+        with self.lock:
+            if rows:
+                n = self.ckpt["next_part"]
+                part = self.dir / f"part-{n:06d}.parquet"
+                pd.DataFrame(rows).to_parquet(part, index=False)
+                metrics.bytes_written("sink_parts", part)
+                self.ckpt["next_part"] = n + 1
+                if "part_keys" in self.ckpt:
+                    self.ckpt["part_keys"].append(key)
+            self.ckpt["keys"][key] = state
+            tmp = self.checkpoint_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.ckpt))
+            os.replace(tmp, self.checkpoint_path)
+
+    def iter_parts(self, keys: Optional[Iterable[str]] = None, columns: List[str] = None) -> Iterator[pd.DataFrame]:
+        """
+        The parts one at a time (only `columns`, if given): in write order, or those of each of
+        `keys` in turn, pages in order within a key. Checkpoints from before parts were
+        tagged with their key fall back to filtering every part on its `query` column.
+        """
+        with self.lock:
+            parts = self._parts()
+            part_keys = self.ckpt.get("part_keys")
+        if keys is None:
+            for p in parts:
+                yield pd.read_parquet(p, columns=columns)
+            return
+        for key in keys:
+            if part_keys is not None:
+                for p in parts:
+                    n = int(p.stem.split("-")[1])
+                    if n < len(part_keys) and part_keys[n] == key:
+                        yield pd.read_parquet(p, columns=columns)
+                continue
+            read = None if columns is None else list(dict.fromkeys(columns + ["query"]))
+            for p in parts:
+                df = pd.read_parquet(p, columns=read)
+                df = df[df["query"] == key].reset_index(drop=True)
+                if len(df):
+                    yield df if columns is None else df[columns]
+
+    def values(self, column: str, key: str) -> Set:
+        """Distinct values of one column over the parts of `key`."""
+        out = set()
+        for df in self.iter_parts([key], columns=[column]):
+            out.update(df[column])
+        return out
+
+    def write_output(self, frames: Iterable[pd.DataFrame], out_dir, out_name: str, dedup: List[str],
+                     write_csv: bool = False) -> Tuple[List[Path], int]:
+        """
+        Streams `frames` (e.g. from `iter_parts`) into `<out_name>.parquet` (and `.csv`),
+        dropping rows whose `dedup` columns repeat an earlier row; only the set of seen keys
+        is kept in memory. The parquet file is stamped with the collection time (see
+        schema.COLLECTED_AT_KEY): when the collection, resumed or not, first started.
+        Returns (paths written, rows written); no paths if there were no rows.
+        """
+        parquet_path = Path(out_dir) / f"{out_name}.parquet"
+        csv_path = Path(out_dir) / f"{out_name}.csv"
+        appender = ParquetAppender(parquet_path, collected_at=self.started)
+        seen = set()
+        csv_tmp = csv_path.with_name(csv_path.name + ".tmp")
+        for df in rebatch(frames, ROWS_PER_GROUP):
+            keep = []
+            for k in zip(*(df[c] for c in dedup)):
+                keep.append(k not in seen)
+                seen.add(k)
+            df = df[keep]
+            if df.empty:
+                continue
+            if write_csv:
+                df.to_csv(csv_tmp, mode="a" if appender.rows else "w", header=not appender.rows, index=False)
+            appender.write(df)
+        if not appender.close():
+            return [], 0
+        saved = [parquet_path]
+        if write_csv:
+            os.replace(csv_tmp, csv_path)
+            saved.append(csv_path)
+        return saved, appender.rows
+
+    def cleanup(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def rebatch(frames: Iterable[pd.DataFrame], rows: int) -> Iterator[pd.DataFrame]:
+    """Concatenates consecutive frames into batches of at least `rows` rows (the last may be short)."""
+    batch, n = [], 0
+    for df in frames:
+        batch.append(df)
+        n += len(df)
+        if n >= rows:
+            yield pd.concat(batch, ignore_index=True)
+            batch, n = [], 0
+    if batch:
+        yield pd.concat(batch, ignore_index=True)
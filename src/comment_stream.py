@@ -0,0 +1,129 @@
+"""
+Streaming ingestion of YouTube comments (commentThreads.list) for collected videos.
+
+The path is a chain of generators, so at most one batch of comments is held in memory
+whatever the comment volume:
+
+    video ids -> comment thread pages (paginated per video) -> comment rows
+              -> `batch_size` batches -> brand flags + sentiment -> one parquet part each
+
+Parts go to a hive-partitioned dataset, `<dataset_dir>/date=<collection date>/part-NNNNNN.parquet`
+(compact schema, see schema.py). A run writes its parts to a hidden `.date=<date>.inprogress`
+directory and swaps it in when done, so a rerun on the same day replaces that day's
+partition instead of duplicating it, and readers never see a half-written day.
+"""
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+import metrics
+from schema import write_parquet
+from utils import brand_flag_frame, sentiment_labels_and_scores
+
+COMMENT_COLUMNS = ["video_id", "comment_id", "text", "like_count", "reply_count", "published_at"]
+MAX_RESULTS = 100   # commentThreads.list page size limit
+
+# fetch_page(video_id, page_token) -> commentThreads.list response, or None to stop that video.
+FetchPage = Callable[[str, Optional[str]], Optional[Dict]]
+
+
+def _to_int(x) -> int:
+    try:
+        return int(x)
+    except (TypeError, ValueError):
+        return 0
+
+def comment_row(video_id: str, thread: Dict) -> Dict:
+    """One row per comment thread, from its top-level comment."""
+    top = thread.get("snippet", {}).get("topLevelComment", {}) or {}
+    sn = top.get("snippet", {}) or {}
+    return {
+        "video_id": video_id,
+        "comment_id": top.get("id") or thread.get("id", ""),
+        "text": sn.get("textOriginal") or sn.get("textDisplay", ""),
+        "like_count": _to_int(sn.get("likeCount")),
+        "reply_count": _to_int(thread.get("snippet", {}).get("totalReplyCount")),
+        "published_at": sn.get("publishedAt", ""),
+    }
+
+def iter_comments(video_ids: Iterable[str], fetch_page: FetchPage, max_pages: int = None) -> Iterator[Dict]:
+    """Comment rows of every video in turn, following nextPageToken (up to `max_pages` pages per video)."""
+    for vid in video_ids:
+        page_token, pages = None, 0
+        while True:
+            resp = fetch_page(vid, page_token)
+            if resp is None:
+                break
+            pages += 1
+            for thread in resp.get("items", []):
+                yield comment_row(vid, thread)
+            page_token = resp.get("nextPageToken")
+            if not page_token or (max_pages and pages >= max_pages):
+                break
+        metrics.count("comments.videos")
+        metrics.count("comments.pages", pages)
+
+def batched(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def enrich_batch(rows: List[Dict], backend: str = "batch") -> pd.DataFrame:
+    """Brand flags (`mention_*`) and sentiment for one batch of comment rows."""
+    df = pd.DataFrame(rows, columns=COMMENT_COLUMNS)
+    with metrics.timer("comments.brand_flags", rows=len(df)):
+        flags = brand_flag_frame(df["text"])
+    with metrics.timer("comments.sentiment", rows=len(df)):
+        labels, scores = sentiment_labels_and_scores(df["text"], backend=backend)
+    df["platform"] = "youtube_comment"
+    df["sentiment_label"] = labels
+    df["sentiment_score"] = scores
+    return pd.concat([df, flags], axis=1)
+
+def write_partition(frames: Iterable[pd.DataFrame], dataset_dir, collection_date=None) -> Dict:
+    """
+    Writes every frame as one part of the `date=` partition for `collection_date` (default:
+    today, UTC), replacing that partition once all frames are written. Returns run totals.
+    """
+    date = pd.Timestamp(collection_date if collection_date is not None else pd.Timestamp.now(tz="UTC").date())
+    dataset_dir = Path(dataset_dir)
+    final = dataset_dir / f"date={date:%Y-%m-%d}"
+    staging = dataset_dir / f".date={date:%Y-%m-%d}.inprogress"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    stats = {"comments": 0, "parts": 0, "with_brand": 0}
+    for df in frames:
+        part = staging / f"part-{stats['parts']:06d}.parquet"
+        with metrics.timer("comments.write_parquet", rows=len(df)):
+            write_parquet(df, part)
+        metrics.bytes_written("comments", part)
+        stats["comments"] += len(df)
+        stats["parts"] += 1
+        stats["with_brand"] += int(df.filter(like="mention_").to_numpy().any(axis=1).sum())
+        logging.info(f"[comments] part {stats['parts']}: {stats['comments']} comments so far")
+
+    if final.exists():
+        shutil.rmtree(final)
+    os.replace(staging, final)
+    metrics.count("comments.rows", stats["comments"])
+    return {**stats, "path": str(final)}
+
+def stream_comments(video_ids: Iterable[str], fetch_page: FetchPage, dataset_dir, batch_size: int = 5000,
+                    max_pages: int = None, backend: str = "batch", collection_date=None) -> Dict:
+    """
+    Runs the whole path lazily: paginates `video_ids` through `fetch_page`, enriches
+    `batch_size` comments at a time and writes each batch as a part before fetching more.
+    """
+    rows = iter_comments(video_ids, fetch_page, max_pages)
+    frames = (enrich_batch(batch, backend) for batch in batched(rows, batch_size))
+    return write_partition(frames, dataset_dir, collection_date)
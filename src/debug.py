@@ -1,5 +1,5 @@
 import pandas as pd
-from utils import brand_flags
+from utils import brand_flag_frame
 
 PROCESSED_DIR = "data/processed"
 
@@ -9,7 +9,7 @@ youtube_df = df[df["platform"] == "youtube"].copy()
 
 youtube_df["text"] = youtube_df["title"].fillna("") + " " + youtube_df["description"].fillna("")
 
-flags_df = youtube_df["text"].apply(brand_flags).apply(pd.Series)
+flags_df = brand_flag_frame(youtube_df["text"])
 
 print("YouTube Brand Flags:")
 print(flags_df.head())
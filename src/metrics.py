@@ -0,0 +1,182 @@
+"""
+Lightweight run instrumentation: stage timers (with rows/s), counters, latency histograms,
+sleep time, bytes written and peak RSS, dumped as one JSON file per run, plus an optional
+cProfile dump.
+
+Everything is off until `enable()` (or a script's `--metrics` / `--profile` flag via
+`session_from_args`); while off, `timer()` hands back a shared no-op context manager and
+the other calls return after one flag check, so instrumented hot paths cost next to nothing.
+"""
+import contextlib
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Optional
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_enabled = False
+_lock = threading.Lock()
+_timers: Dict[str, Dict[str, float]] = {}
+_counters: Dict[str, float] = {}
+_histograms: Dict[str, list] = {}
+_started = time.time()
+
+
+def enabled() -> bool:
+    return _enabled
+
+def enable():
+    global _enabled, _started
+    _enabled = True
+    _started = time.time()
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+        _histograms.clear()
+
+
+def count(name: str, n: float = 1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+def bytes_written(name: str, path):
+    """Counts the size of a file just written under `bytes_written.<name>`."""
+    if not _enabled:
+        return
+    try:
+        count(f"bytes_written.{name}", os.path.getsize(path))
+    except OSError:
+        pass
+
+def observe(name: str, seconds: float):
+    """Records one latency sample in the `name` histogram."""
+    if not _enabled:
+        return
+    with _lock:
+        h = _histograms.get(name)
+        if h is None:
+            h = _histograms[name] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0, 0.0]
+        h[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        h[-2] += seconds
+        h[-1] = max(h[-1], seconds)
+
+def sleep(seconds: float, name: str = "sleep"):
+    """`time.sleep` that adds the time slept to the `<name>_seconds` counter."""
+    time.sleep(seconds)
+    count(f"{name}_seconds", seconds)
+
+
+class _Timer:
+    __slots__ = ("name", "rows", "latency", "t0")
+
+    def __init__(self, name, rows, latency):
+        self.name, self.rows, self.latency = name, rows, latency
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        dt = time.perf_counter() - self.t0
+        with _lock:
+            t = _timers.setdefault(self.name, {"calls": 0, "seconds": 0.0, "rows": 0})
+            t["calls"] += 1
+            t["seconds"] += dt
+            t["rows"] += self.rows or 0
+        if self.latency:
+            observe(self.name, dt)
+        return False
+
+_NOOP = contextlib.nullcontext()
+
+def timer(name: str, rows: Optional[int] = None, latency: bool = False):
+    """
+    Context manager adding the block's wall time (and `rows`, for rows/s) to the `name`
+    stage timer; `latency=True` also records each call in the `name` histogram.
+    """
+    return _Timer(name, rows, latency) if _enabled else _NOOP
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Peak resident set size of the process so far, from `resource` (POSIX) or psutil's
+    `peak_wset` (Windows); None when neither is available.
+    """
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 2**20
+        except (ImportError, AttributeError):
+            return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 2**10
+
+def snapshot() -> Dict:
+    with _lock:
+        timers = {k: dict(v, rows_per_s=(v["rows"] / v["seconds"] if v["rows"] and v["seconds"] else None))
+                  for k, v in _timers.items()}
+        hists = {}
+        for k, h in _histograms.items():
+            n = sum(h[:-2])
+            hists[k] = {"count": n, "mean_s": h[-2] / n if n else 0.0, "max_s": h[-1],
+                        "buckets": [[b, c] for b, c in zip(LATENCY_BUCKETS + ("+Inf",), h[:-2])]}
+        return {
+            "argv": sys.argv,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(_started)),
+            "wall_seconds": time.time() - _started,
+            "peak_rss_mb": peak_rss_mb(),
+            "timers": timers,
+            "counters": dict(_counters),
+            "histograms": hists,
+        }
+
+def write(path):
+    path = os.fspath(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(snapshot(), f, indent=2, sort_keys=True)
+
+
+def add_arguments(ap):
+    ap.add_argument("--metrics", default=None, metavar="PATH", help="write run metrics (timers, counters, latency histograms) as JSON")
+    ap.add_argument("--profile", default=None, metavar="PATH", help="write a cProfile dump of the run")
+
+@contextlib.contextmanager
+def session(metrics_path=None, profile_path=None):
+    """Collects metrics (and optionally a cProfile) for the enclosed run and writes them on exit."""
+    if not metrics_path and not profile_path:
+        yield
+        return
+    reset()
+    enable()
+    prof = cProfile.Profile() if profile_path else None
+    if prof:
+        prof.enable()
+    try:
+        yield
+    finally:
+        if prof:
+            prof.disable()
+            prof.dump_stats(profile_path)
+        if metrics_path:
+            write(metrics_path)
+        disable()
+
+def session_from_args(args):
+    return session(args.metrics, args.profile)
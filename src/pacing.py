@@ -0,0 +1,111 @@
+"""
+Adaptive pacing of Google result-page requests (additive increase, multiplicative decrease).
+
+One `AdaptivePacer` is shared by every collector thread and spaces their page loads by a
+single inter-request delay. Each clean page adds `increase` pages/s to the request rate (so
+the delay shrinks slowly towards `min_delay`); a block signal (CAPTCHA interstitial, consent
+loop, missing `#search`) multiplies the delay by `backoff` (up to `max_delay`). The delay the
+first block happened at, times `margin`, becomes a learned floor: once pages come back clean
+the delay halves per page back down to it, and the floor itself decays by `decay` per clean
+page, so the pacer settles just under the rate that got blocked and only re-probes it slowly.
+Every decision is logged, and appended as a JSON line to `log_path` when given.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import metrics
+
+BLOCK_SIGNALS = ("captcha", "consent", "no_search")
+
+
+class AdaptivePacer:
+    """Shared inter-request delay for page loads, adapted to the block signals pages come back with."""
+
+    def __init__(self, min_delay: float = 2.0, max_delay: float = 120.0, start_delay: float = 5.0,
+                 increase: float = 0.01, backoff: float = 4.0, margin: float = 2.0,
+                 decay: float = 0.002, jitter: float = 0.3, block_retries: int = 3, log_path=None,
+                 clock=time.monotonic, sleep=None):
+        if not 0 <= min_delay <= max_delay:
+            raise ValueError(f"Need 0 <= min_delay <= max_delay, got {min_delay}, {max_delay}")
+        self.min_delay, self.max_delay = min_delay, max_delay
+        self.delay = min(max(start_delay, min_delay), max_delay)
+        self.increase, self.backoff, self.jitter = increase, backoff, jitter
+        self.margin, self.decay = margin, decay
+        self.block_retries = block_retries
+        self.log_path = Path(log_path) if log_path else None
+        self.clock = clock
+        self.sleep = sleep or (lambda s: metrics.sleep(s, "google.sleep"))
+        self.lock = threading.Lock()
+        self.next_at = None         # clock time of the next free request slot
+        self.backing_off = False    # blocked since the last clean page
+        self.recovering = False     # clean again, halving the delay back down to the floor
+        self.learned = 0.0          # delay floor learned from blocks (decaying)
+        self.pages = self.blocks = 0
+        if self.log_path:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def wait(self):
+        """Blocks until this thread's request slot; slots are `delay` (with jitter) apart across threads."""
+        with self.lock:
+            now = self.clock()
+            slot = now if self.next_at is None else max(now, self.next_at)
+            self.next_at = slot + self.delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+        if slot > now:
+            self.sleep(slot - now)
+
+    def record(self, query: str, start: int, signal: Optional[str] = None):
+        """Feeds back one page load: `signal` is None for a clean page, else one of BLOCK_SIGNALS."""
+        with self.lock:
+            before = self.delay
+            self.pages += 1
+            if signal is None:
+                self.backing_off = False
+                self.learned *= 1.0 - self.decay
+                floor = max(self.min_delay, self.learned)
+                if self.recovering:
+                    self.delay = max(floor, self.delay / 2)
+                    self.recovering = self.delay > floor
+                    action = "recover"
+                else:
+                    if self.delay > 0:
+                        self.delay = max(floor, 1.0 / (1.0 / self.delay + self.increase))
+                    action = "increase"
+            else:
+                self.blocks += 1
+                if not self.backing_off:
+                    # Only the first block marks the rate limit; blocks of the retries after it don't.
+                    self.learned = min(self.max_delay, before * self.margin)
+                    self.backing_off = True
+                self.recovering = True
+                # Backs off from at least 1s, so a zero floor still slows down on blocks.
+                self.delay = min(self.max_delay, max(self.delay, self.min_delay, 1.0) * self.backoff)
+                # The back-off applies from now, not after slots already handed out.
+                self.next_at = max(self.next_at or 0.0, self.clock() + self.delay)
+                action = "backoff"
+            decision = {"t": time.time(), "query": query, "start": start, "signal": signal,
+                        "action": action, "delay_before": round(before, 3), "delay": round(self.delay, 3)}
+            if self.log_path:
+                with open(self.log_path, "a") as f:
+                    f.write(json.dumps(decision) + "\n")
+
+        if signal is None:
+            logging.debug(f"[pacing] {action}: delay {before:.2f}s -> {self.delay:.2f}s")
+        else:
+            metrics.count(f"google.blocks.{signal}")
+            logging.warning(f"[pacing] [{query}] start={start}: {signal}; backing off, "
+                            f"delay {before:.2f}s -> {self.delay:.2f}s")
+        return decision
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {"pages": self.pages, "blocks": self.blocks, "delay": self.delay, "learned": self.learned}
+
+
+def fixed(delay: float = 0.0) -> AdaptivePacer:
+    """A pacer that always waits `delay` (no jitter, no back-off); for benchmarks and fixtures."""
+    return AdaptivePacer(min_delay=delay, max_delay=delay, start_delay=delay, jitter=0.0, block_retries=0)
@@ -0,0 +1,224 @@
+"""
+Runs the numbered stage scripts as a dependency graph: each stage declares the files it
+reads and writes, stages whose dependencies are done run concurrently (the Google and
+YouTube collectors in parallel), and a stage is skipped when the fingerprints of its
+inputs (data and code) match its last successful run and its outputs are still as that run left
+them. The collectors read the live sites rather than files, so their fingerprint also
+covers the run date (UTC): they run once per day. `--force` reruns chosen stages regardless.
+
+Usage (from the repo root):
+    python src/pipeline.py                        # everything that is out of date
+    python src/pipeline.py --stages process,visualize
+    python src/pipeline.py --force process        # or --force all
+    python src/pipeline.py --dry-run
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List
+
+STATE_PATH = Path("data/.pipeline_state.json")
+
+
+class Stage:
+    """
+    A script run as `python <script> <args>`, with the file patterns it reads and writes.
+    A `daily` stage also counts the UTC run date as an input, so it is out of date once a day.
+    """
+
+    def __init__(self, name: str, script: str, inputs: List[str], outputs: List[str],
+                 after: List[str] = (), args: List[str] = (), daily: bool = False):
+        self.name = name
+        self.script = script
+        self.inputs = [script] + list(inputs)
+        self.outputs = list(outputs)
+        self.after = list(after)
+        self.args = list(args)
+        self.daily = daily
+
+    def command(self) -> List[str]:
+        return [sys.executable, self.script] + self.args
+
+    def key(self) -> str:
+        """Non-file part of the input fingerprint: the arguments, and the run date of daily stages."""
+        key = " ".join(self.args)
+        if self.daily:
+            key += f" date={time.strftime('%Y-%m-%d', time.gmtime())}"
+        return key
+
+
+STAGES = [
+    Stage("collect_google", "src/01_collect_google_data.py",
+          inputs=["src/collection_sink.py", "src/schema.py", "src/serp_archive.py", "src/pacing.py",
+                  "src/metrics.py"],
+          outputs=["data/raw/google_sov_india.parquet"], daily=True),
+    Stage("collect_youtube", "src/02_collect_youtube_data.py",
+          inputs=["src/collection_sink.py", "src/schema.py", "src/video_store.py", "src/comment_stream.py",
+                  "src/utils.py", "src/sentiment_batch.py", "src/metrics.py"],
+          outputs=["data/raw/youtube_sov_india.parquet"], daily=True),
+    Stage("process", "src/03_process_and_analyze.py",
+          inputs=["data/raw/google_sov_india.*", "data/raw/youtube_sov_india.*",
+                  "src/utils.py", "src/schema.py", "src/sentiment_cache.py", "src/sov_cube.py",
+                  "src/near_dup.py", "src/sentiment_batch.py", "src/sov_dataset.py",
+                  "src/sov_bootstrap.py", "src/metrics.py"],
+          outputs=["data/processed/combined_processed.parquet", "data/processed/sov_cube.parquet",
+                   "results/sov_by_query.csv", "results/sov_by_query_platform.csv",
+                   "results/sentiment_distribution.csv", "results/sov_by_query_unique.csv"],
+          after=["collect_google", "collect_youtube"]),
+    Stage("visualize", "src/04_visualize_results.py",
+          inputs=["results/sov_by_query.csv", "results/sov_by_query_platform.csv",
+                  "results/sentiment_distribution.csv", "src/metrics.py"],
+          outputs=["results/visualizations/*.png"],
+          after=["process"]),
+]
+
+
+class Fingerprinter:
+    """
+    Content hashes of files matched by glob patterns. Hashes are remembered per
+    (path, size, mtime) in the state file, so unchanged files are not read again.
+    """
+
+    def __init__(self, known: Dict[str, list] = None):
+        self.known = dict(known or {})
+
+    def file(self, path: str) -> str:
+        st = os.stat(path)
+        entry = self.known.get(path)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        self.known[path] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+        return h.hexdigest()
+
+    def patterns(self, patterns: List[str], extra: str = "") -> str:
+        """One hash over every matched file (path and content); patterns matching nothing count too."""
+        h = hashlib.sha1(extra.encode())
+        for pattern in patterns:
+            matches = sorted(glob.glob(pattern))
+            h.update(f"{pattern}:{len(matches)}\0".encode())
+            for path in matches:
+                h.update(f"{path}={self.file(path)}\0".encode())
+        return h.hexdigest()
+
+
+def _load_state() -> Dict:
+    if STATE_PATH.exists():
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    return {"stages": {}, "files": {}}
+
+def _save_state(state: Dict):
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_PATH.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, STATE_PATH)
+
+def _up_to_date(stage: Stage, fp: Fingerprinter, last: Dict) -> bool:
+    if not last or last.get("inputs") != fp.patterns(stage.inputs, stage.key()):
+        return False
+    if not all(glob.glob(p) for p in stage.outputs):
+        return False
+    return last.get("outputs") == fp.patterns(stage.outputs)
+
+def run(stages: List[Stage] = STAGES, selected: List[str] = None, force: List[str] = (), dry_run: bool = False) -> bool:
+    """
+    Runs the selected stages (default: all) in dependency order, concurrently where the
+    graph allows. Dependencies outside the selection are treated as done. Returns False
+    if any stage failed (its dependents are not run). A dry run reports every stage
+    downstream of one that would run as would-run too, since its inputs would change.
+    """
+    by_name = {s.name: s for s in stages}
+    selected = set(selected or by_name)
+    force = set(by_name) if "all" in force else set(force)
+    unknown = (selected | force | {d for s in stages for d in s.after}) - set(by_name)
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+
+    state = _load_state()
+    fp = Fingerprinter(state.get("files"))
+    pending = [s for s in stages if s.name in selected]
+    finished, failed, would_run = set(by_name) - selected, set(), set()
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, len(pending))) as pool:
+        while pending or running:
+            for stage in list(pending):
+                if any(d in failed for d in stage.after):
+                    pending.remove(stage)
+                    failed.add(stage.name)
+                    _log(f"{stage.name}: not run (a dependency failed)")
+                    continue
+                if not all(d in finished for d in stage.after):
+                    continue
+                pending.remove(stage)
+                last = state["stages"].get(stage.name)
+                upstream = [d for d in stage.after if d in would_run]
+                if stage.name not in force and not upstream and _up_to_date(stage, fp, last):
+                    _log(f"{stage.name}: up to date, skipped")
+                    finished.add(stage.name)
+                elif dry_run:
+                    reason = f" (after {', '.join(upstream)})" if upstream else ""
+                    _log(f"{stage.name}: would run{reason}: {' '.join(stage.command())}")
+                    would_run.add(stage.name)
+                    finished.add(stage.name)
+                else:
+                    _log(f"{stage.name}: running {' '.join(stage.command())}")
+                    inputs = fp.patterns(stage.inputs, stage.key())
+                    running[pool.submit(_run_stage, stage)] = (stage, inputs)
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                stage, inputs = running.pop(fut)
+                code, seconds = fut.result()
+                if code == 0:
+                    state["stages"][stage.name] = {"inputs": inputs, "outputs": fp.patterns(stage.outputs),
+                                                   "finished": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                                                   "seconds": round(seconds, 3)}
+                    finished.add(stage.name)
+                    _log(f"{stage.name}: done in {seconds:.1f}s")
+                else:
+                    failed.add(stage.name)
+                    _log(f"{stage.name}: FAILED (exit {code}) after {seconds:.1f}s")
+                state["files"] = fp.known
+                _save_state(state)
+
+    if not dry_run:
+        state["files"] = fp.known
+        _save_state(state)
+    return not failed
+
+def _log(msg: str):
+    # Flushed so the lines stay in order with the stage scripts' own output.
+    print(f"[pipeline] {msg}", flush=True)
+
+def _run_stage(stage: Stage):
+    t0 = time.perf_counter()
+    code = subprocess.call(stage.command())
+    return code, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    names = [s.name for s in STAGES]
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stages", default=None, help=f"comma-separated subset of: {', '.join(names)}")
+    ap.add_argument("--force", default="", help="comma-separated stages to rerun even if up to date, or 'all'")
+    ap.add_argument("--dry-run", action="store_true", help="only report which stages would run")
+    args = ap.parse_args()
+
+    ok = run(selected=args.stages.split(",") if args.stages else None,
+             force=[f for f in args.force.split(",") if f], dry_run=args.dry_run)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,170 @@
+"""
+Storage schema for raw and processed datasets.
+
+Dimensions are stored dictionary-encoded (pandas categoricals), small integers and scores
+in compact dtypes, and the per-brand mention flags as one packed bitmask column
+(`mentions`, bit i = BRAND_ORDER[i]). Files written with `write_parquet` carry
+`SCHEMA_VERSION` in their parquet metadata; files without it (older runs) still load,
+with their `mention_*` bool columns used as-is.
+"""
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+SCHEMA_VERSION = 1
+SCHEMA_VERSION_KEY = b"sov_schema_version"
+# When the collectors fetched a raw file's rows (ISO 8601, UTC).
+COLLECTED_AT_KEY = b"sov_collected_at"
+
+BRAND_ORDER = ["atomberg", "orient", "havells", "crompton", "polycab"]
+MENTION_COLS = [f"mention_{b}" for b in BRAND_ORDER]
+MENTIONS_COL = "mentions"
+# Per-brand compound scores of the brand-scoped sentiment mode (NaN where the brand isn't mentioned).
+BRAND_SENTIMENT_COLS = [f"sentiment_score_{b}" for b in BRAND_ORDER]
+
+DIMENSIONS = ["query", "platform", "sentiment_label", "result_type", "channel_title"]
+COMPACT_DTYPES = {
+    "page": "Int16",
+    "rank_page": "Int16",
+    "rank_abs": "Int32",
+    "sentiment_score": "float32",
+    **{c: "float32" for c in BRAND_SENTIMENT_COLS},
+}
+
+_MASK_DTYPE = np.uint8 if len(BRAND_ORDER) <= 8 else np.uint16
+
+
+def pack_mentions(df: pd.DataFrame) -> pd.DataFrame:
+    """Replaces the `mention_*` bool columns with the packed `mentions` bitmask."""
+    present = [c for c in MENTION_COLS if c in df.columns]
+    if not present:
+        return df
+    flags = df.reindex(columns=MENTION_COLS, fill_value=False).fillna(False).to_numpy(dtype=bool)
+    weights = (1 << np.arange(len(BRAND_ORDER))).astype(_MASK_DTYPE)
+    mask = (flags * weights).sum(axis=1).astype(_MASK_DTYPE)
+    return df.drop(columns=present).assign(**{MENTIONS_COL: mask})
+
+
+def mention_matrix(df: pd.DataFrame) -> np.ndarray:
+    """
+    (rows x brands) bool matrix in BRAND_ORDER, from the bitmask and/or `mention_*` columns.
+    A frame read from files of both schemas has both, null where a file lacked them; a row's
+    flags are then whichever it has.
+    """
+    has_cols = any(c in df.columns for c in MENTION_COLS)
+    if MENTIONS_COL in df.columns:
+        mask = df[MENTIONS_COL].fillna(0).to_numpy().astype(np.int64)
+        flags = (mask[:, None] >> np.arange(len(BRAND_ORDER))) & 1 == 1
+        if not has_cols:
+            return flags
+    else:
+        flags = False
+    return flags | df.reindex(columns=MENTION_COLS, fill_value=False).fillna(False).to_numpy(dtype=bool)
+
+
+def unpack_mentions(df: pd.DataFrame) -> pd.DataFrame:
+    """Inverse of `pack_mentions`: restores one bool column per brand."""
+    if MENTIONS_COL not in df.columns:
+        return df
+    flags = mention_matrix(df)
+    out = df.drop(columns=[MENTIONS_COL])
+    for i, c in enumerate(MENTION_COLS):
+        out[c] = flags[:, i]
+    return out
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """Categorical dimensions, compact numeric dtypes and packed mention flags."""
+    df = pack_mentions(df)
+    casts = {c: "category" for c in DIMENSIONS if c in df.columns and df[c].dtype != "category"}
+    for c, dtype in COMPACT_DTYPES.items():
+        if c in df.columns:
+            casts[c] = dtype
+    return df.astype(casts)
+
+
+def _file_metadata(schema: pa.Schema, collected_at=None) -> dict:
+    meta = dict(schema.metadata or {})
+    meta[SCHEMA_VERSION_KEY] = str(SCHEMA_VERSION).encode()
+    if collected_at is not None:
+        meta[COLLECTED_AT_KEY] = pd.Timestamp(collected_at).isoformat().encode()
+    return meta
+
+def write_parquet(df: pd.DataFrame, path, compacted: bool = False, collected_at=None):
+    """Writes `df` in the compact schema, tagged with SCHEMA_VERSION (and `collected_at`, for raw files)."""
+    table = pa.Table.from_pandas(df if compacted else compact(df), preserve_index=False)
+    meta = _file_metadata(table.schema, collected_at)
+    pq.write_table(table.replace_schema_metadata(meta), str(path))
+
+
+class ParquetAppender:
+    """
+    Writes frames one at a time into a single parquet file in the compact schema, for outputs
+    too large to assemble in memory. The file's schema comes from the first frame, with
+    dictionary indices widened to int32 (later frames may have more categories) and all-null
+    columns typed as strings. The file appears at `path` only on `close()`.
+    """
+
+    def __init__(self, path, collected_at=None):
+        self.path = Path(path)
+        self.collected_at = collected_at
+        self.tmp = self.path.with_name(self.path.name + ".tmp")
+        self.writer = None
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame, compacted: bool = False):
+        table = pa.Table.from_pandas(df if compacted else compact(df), preserve_index=False)
+        if self.writer is None:
+            fields = [pa.field(f.name, pa.dictionary(pa.int32(), f.type.value_type)) if pa.types.is_dictionary(f.type)
+                      else pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+                      for f in table.schema]
+            self.schema = pa.schema(fields, metadata=_file_metadata(table.schema, self.collected_at))
+            self.writer = pq.ParquetWriter(str(self.tmp), self.schema)
+        self.writer.write_table(table.select(self.schema.names).cast(self.schema))
+        self.rows += len(df)
+
+    def close(self):
+        """Finishes the file and moves it into place; returns False if nothing was written."""
+        if self.writer is None:
+            return False
+        self.writer.close()
+        self.tmp.replace(self.path)
+        return True
+
+
+def schema_version(path) -> Optional[int]:
+    meta = pq.read_schema(str(path)).metadata or {}
+    v = meta.get(SCHEMA_VERSION_KEY)
+    return int(v) if v is not None else None
+
+
+def collected_at(path) -> Optional[pd.Timestamp]:
+    """The `collected_at` stamp of a raw parquet file, None if it has none."""
+    meta = pq.read_schema(str(path)).metadata or {}
+    v = meta.get(COLLECTED_AT_KEY)
+    return pd.Timestamp(v.decode()) if v is not None else None
+
+
+def read_columns(path, columns: Iterable[str]) -> pd.DataFrame:
+    """
+    Reads only the wanted columns that exist in a parquet or CSV file. Asking for any
+    `mention_*` column also reads the packed bitmask when the file has one.
+    """
+    path = Path(path)
+    columns = list(columns)
+    if path.suffix == ".parquet":
+        names = pq.read_schema(str(path)).names
+        if MENTIONS_COL in names and any(c in MENTION_COLS for c in columns):
+            columns = [c for c in columns if c not in MENTION_COLS] + [MENTIONS_COL]
+        return pd.read_parquet(path, columns=[c for c in columns if c in names])
+    return pd.read_csv(path, usecols=lambda c: c in columns)
+
+
+def read_processed(path, columns: Optional[List[str]] = None, expand_mentions: bool = True) -> pd.DataFrame:
+    """Loads a processed dataset (optionally a column subset); `expand_mentions` restores `mention_*`."""
+    df = pd.read_parquet(path) if columns is None else read_columns(path, columns)
+    return unpack_mentions(df) if expand_mentions else df
@@ -0,0 +1,236 @@
+"""
+Batch VADER: the compound score of NLTK's `SentimentIntensityAnalyzer.polarity_scores`
+computed for a whole column at once instead of one string per call.
+
+The column is split into tokens in one Arrow pass and every distinct token is resolved
+once into a vocabulary of features (lexicon valence, booster value, negation, ALL CAPS,
+the words the heuristics look for). The heuristics then run as array operations over all
+tokens: caps emphasis, the three-word booster and negation window ("never so/this"
+included), "least", the idiom table, the "but" shift, punctuation emphasis and compound
+normalization. NLTK quirks are kept on purpose so scores agree with stock VADER, e.g. a
+repeated word is scored with the context of its first occurrence (`list.index`), and
+`never`/`so`/`this` and the idioms are matched case-sensitively.
+"""
+import string
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from utils import _lexicon_snapshot, sentiment_labels
+
+# Texts scored per block; bounds the per-token arrays.
+BLOCK = 200_000
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def _map_token(tok: str, punc_list: List[str], punct: frozenset) -> str:
+    """
+    `SentiText._words_and_emoticons` for one token: a PUNC_LIST item before or after a
+    punctuation-free word of 2+ characters is dropped (the trailing form wins, as in NLTK).
+    """
+    for p in punc_list:
+        if tok.endswith(p):
+            w = tok[:-len(p)]
+            if len(w) > 1 and not punct.intersection(w):
+                return w
+    for p in punc_list:
+        if tok.startswith(p):
+            w = tok[len(p):]
+            if len(w) > 1 and not punct.intersection(w):
+                return w
+    return tok
+
+
+class BatchVader:
+    """Vectorized VADER compound scores for a lexicon (word -> valence)."""
+
+    def __init__(self, lexicon: Dict[str, float]):
+        from nltk.sentiment.vader import VaderConstants
+        self.c = VaderConstants()
+        self.lexicon = lexicon
+        self.punct = frozenset(string.punctuation)
+
+    @classmethod
+    def from_file(cls, path) -> "BatchVader":
+        lexicon = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f.read().split("\n"):
+                if line.strip():
+                    word, measure = line.strip().split("\t")[0:2]
+                    lexicon[word] = float(measure)
+        return cls(lexicon)
+
+    def _vocabulary(self, raw: List[str]):
+        """
+        Maps distinct raw tokens to distinct VADER words and the per-word feature arrays;
+        every array has one extra trailing entry, a neutral stand-in for "no word here".
+        """
+        c = self.c
+        words, word_id, raw_to_word = [], {}, np.empty(len(raw), dtype=np.int64)
+        for j, tok in enumerate(raw):
+            if len(tok) <= 1:
+                raw_to_word[j] = -1
+                continue
+            w = _map_token(tok, c.PUNC_LIST, self.punct)
+            k = word_id.get(w)
+            if k is None:
+                k = word_id[w] = len(words)
+                words.append(w)
+            raw_to_word[j] = k
+
+        lower = [w.lower() for w in words] + [""]
+        words = words + [""]
+        f = {
+            "valence": np.array([self.lexicon.get(l, np.nan) for l in lower]),
+            "booster": np.array([c.BOOSTER_DICT.get(l, 0.0) for l in lower]),
+            "upper": np.array([w.isupper() for w in words]),
+            "negated": np.array([l in c.NEGATE or "n't" in l for l in lower]),
+            "kind": np.array([l == "kind" for l in lower]),
+            "of": np.array([l == "of" for l in lower]),
+            "least": np.array([l == "least" for l in lower]),
+            "at_very": np.array([l in ("at", "very") for l in lower]),
+            "but": np.array([l == "but" for l in lower]),
+            "never": np.array([w == "never" for w in words]),
+            "so_this": np.array([w in ("so", "this") for w in words]),
+        }
+        f["in_lex"] = ~np.isnan(f["valence"])
+        f["is_booster"] = np.array([l in c.BOOSTER_DICT for l in lower])
+        return words, word_id, raw_to_word, f
+
+    def _phrase_value(self, seqs, word_id, phrases: Dict[str, float]) -> np.ndarray:
+        """Value of the first phrase (in `phrases`) each token's word sequence spells, NaN if none."""
+        out = np.full(len(seqs[0]), np.nan)
+        for phrase, value in phrases.items():
+            parts = phrase.split(" ")
+            if len(parts) != len(seqs):
+                continue
+            ids = [word_id.get(p) for p in parts]
+            if None in ids:
+                continue
+            hit = np.logical_and.reduce([s == k for s, k in zip(seqs, ids)])
+            out = np.where(np.isnan(out) & hit, value, out)
+        return out
+
+    def compound(self, texts) -> np.ndarray:
+        """Compound score per text (rounded to 4 places like `polarity_scores`); non-strings score 0."""
+        texts = [t if isinstance(t, str) else "" for t in texts]
+        return np.concatenate([self._compound_block(texts[i:i + BLOCK]) for i in range(0, len(texts), BLOCK)]
+                              or [np.empty(0)])
+
+    def _compound_block(self, texts: List[str]) -> np.ndarray:
+        c = self.c
+        n = len(texts)
+        arr = pa.array(texts, type=pa.string())
+        split = pc.utf8_split_whitespace(arr)
+        counts = pc.list_value_length(split).to_numpy(zero_copy_only=False).astype(np.int64)
+        encoded = pc.dictionary_encode(pc.list_flatten(split))
+        raw_ids = encoded.indices.to_numpy(zero_copy_only=False)
+        words, word_id, raw_to_word, f = self._vocabulary(encoded.dictionary.to_pylist())
+        none = len(words) - 1
+
+        # Tokens VADER keeps (2+ characters), with their text and position.
+        wid = raw_to_word[raw_ids]
+        keep = wid >= 0
+        doc = np.repeat(np.arange(n), counts)[keep]
+        wid = wid[keep]
+        length = np.bincount(doc, minlength=n)
+        pos = np.arange(len(wid)) - (np.cumsum(length) - length)[doc]
+
+        # Every occurrence of a word is scored at the position of its first occurrence.
+        key = doc * (len(words) + 1) + wid
+        order = np.argsort(key, kind="stable")
+        first = np.r_[True, key[order][1:] != key[order][:-1]]
+        g = np.empty_like(order)
+        g[order] = order[first][np.cumsum(first) - 1]
+        i = pos[g]
+        doc_len = length[doc]
+
+        def back(k):
+            return np.where(i >= k, wid[np.maximum(g - k, 0)], none)
+
+        def ahead(k):
+            return np.where(i + k < doc_len, wid[np.minimum(g + k, len(wid) - 1)], none)
+
+        p1, p2, p3, n1, n2 = back(1), back(2), back(3), ahead(1), ahead(2)
+        n_upper = np.bincount(doc, weights=f["upper"][wid], minlength=n)
+        cap_diff = ((n_upper > 0) & (n_upper < length))[doc]
+
+        in_lex = f["in_lex"][wid]
+        v = np.where(in_lex, f["valence"][wid], 0.0)
+        v = np.where(in_lex & f["upper"][wid] & cap_diff, np.where(v > 0, v + c.C_INCR, v - c.C_INCR), v)
+
+        for s, prev in enumerate((p1, p2, p3)):
+            applies = in_lex & (i > s) & ~f["in_lex"][prev]
+            boost = f["booster"][prev]
+            scalar = np.where(v < 0, -boost, boost)
+            emphasis = f["is_booster"][prev] & f["upper"][prev] & cap_diff
+            scalar = np.where(emphasis, np.where(v > 0, scalar + c.C_INCR, scalar - c.C_INCR), scalar)
+            scalar = scalar * (1.0, 0.95, 0.9)[s]
+            v = np.where(applies, v + scalar, v)
+
+            if s == 0:
+                mult = np.where(f["negated"][p1], c.N_SCALAR, 1.0)
+            elif s == 1:
+                mult = np.where(f["never"][p2] & f["so_this"][p1], 1.5,
+                                np.where(f["negated"][p2], c.N_SCALAR, 1.0))
+            else:
+                emph = (f["never"][p3] & f["so_this"][p2]) | f["so_this"][p1]
+                mult = np.where(emph, 1.25, np.where(f["negated"][p3], c.N_SCALAR, 1.0))
+            v = np.where(applies, v * mult, v)
+
+            if s == 2:
+                idiom = np.full(len(v), np.nan)
+                for seq in ((p1, wid), (p2, p1, wid), (p2, p1), (p3, p2, p1), (p3, p2)):
+                    idiom = np.where(np.isnan(idiom), self._phrase_value(seq, word_id, c.SPECIAL_CASE_IDIOMS), idiom)
+                for seq, valid in (((wid, n1), i + 1 < doc_len), ((wid, n1, n2), i + 2 < doc_len)):
+                    later = np.where(valid, self._phrase_value(seq, word_id, c.SPECIAL_CASE_IDIOMS), np.nan)
+                    idiom = np.where(np.isnan(later), idiom, later)
+                v = np.where(applies & ~np.isnan(idiom), idiom, v)
+                multi_booster = (~np.isnan(self._phrase_value((p3, p2), word_id, c.BOOSTER_DICT))
+                                 | ~np.isnan(self._phrase_value((p2, p1), word_id, c.BOOSTER_DICT)))
+                v = np.where(applies & multi_booster, v + c.B_DECR, v)
+
+        prev_least = in_lex & (i > 0) & ~f["in_lex"][p1] & f["least"][p1]
+        v = np.where(prev_least & ((i == 1) | ~f["at_very"][p2]), v * c.N_SCALAR, v)
+
+        skip = f["is_booster"][wid] | (f["kind"][wid] & f["of"][n1])
+        v = np.where(skip, 0.0, v)
+
+        # "but": halves what comes before the first one and raises what follows by half.
+        but_pos = np.full(n, np.iinfo(np.int64).max)
+        is_but = f["but"][wid]
+        np.minimum.at(but_pos, doc[is_but], pos[is_but])
+        bi = but_pos[doc]
+        has_but = bi != np.iinfo(np.int64).max
+        v = np.where(has_but & (pos < bi), v * 0.5, np.where(has_but & (pos > bi), v * 1.5, v))
+
+        total = np.bincount(doc, weights=v, minlength=n)
+        ep = np.minimum(pc.count_substring(arr, "!").to_numpy(zero_copy_only=False), 4) * 0.292
+        qm = pc.count_substring(arr, "?").to_numpy(zero_copy_only=False)
+        qm = np.where(qm > 1, np.where(qm <= 3, qm * 0.18, 0.96), 0.0)
+        total = np.where(total > 0, total + ep + qm, np.where(total < 0, total - ep - qm, total))
+        compound = total / np.sqrt(total * total + 15)
+        return np.where(length > 0, np.round(compound, 4), 0.0)
+
+
+def get_engine() -> BatchVader:
+    """The process-wide batch engine, built on first use from the lexicon snapshot."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = BatchVader.from_file(_lexicon_snapshot())
+    return _engine
+
+def batch_labels_and_scores(texts) -> Tuple[np.ndarray, np.ndarray]:
+    """Same (labels, scores) contract as `utils.sentiment_labels_and_scores`, from the batch engine."""
+    texts = list(texts)
+    scores = get_engine().compound(texts)
+    blank = np.array([not isinstance(t, str) or not t.strip() for t in texts], dtype=bool)
+    scores = np.where(blank, 0.0, scores)
+    return sentiment_labels(scores), scores.astype(float)
@@ -0,0 +1,140 @@
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from utils import sentiment_fingerprint, sentiment_labels_and_scores
+
+DEFAULT_CACHE_PATH = Path("data/processed/sentiment_cache.sqlite")
+
+_BATCH = 500
+
+
+def normalize_text(text) -> str:
+    # VADER tokenizes on whitespace, so collapsing runs of whitespace never changes a score.
+    if not isinstance(text, str):
+        return ""
+    return " ".join(text.split())
+
+
+def text_key(norm_text: str) -> str:
+    return hashlib.sha1(norm_text.encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    """
+    On-disk (SQLite) cache of (label, compound score) keyed by the SHA-1 of the
+    normalized text. The whole cache is dropped when `sentiment_fingerprint()` changes
+    (NLTK version, lexicon or thresholds). `evict()` removes entries not used for
+    `max_age_days` and then the least recently used ones above `max_entries`. Both sentiment
+    backends produce the same scores, so they share one cache.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries: int = 2_000_000, max_age_days: float = 180):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sentiment ("
+            " key TEXT PRIMARY KEY, label TEXT NOT NULL, score REAL NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS sentiment_last_used ON sentiment(last_used)")
+        self._check_fingerprint()
+
+    def _check_fingerprint(self):
+        fp = sentiment_fingerprint()
+        row = self.conn.execute("SELECT v FROM meta WHERE k = 'fingerprint'").fetchone()
+        if row is None or row[0] != fp:
+            with self.conn:
+                self.conn.execute("DELETE FROM sentiment")
+                self.conn.execute("INSERT OR REPLACE INTO meta (k, v) VALUES ('fingerprint', ?)", (fp,))
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Tuple[str, float]]:
+        keys = list(keys)
+        found = {}
+        for i in range(0, len(keys), _BATCH):
+            chunk = keys[i:i + _BATCH]
+            q = f"SELECT key, label, score FROM sentiment WHERE key IN ({','.join('?' * len(chunk))})"
+            for k, label, score in self.conn.execute(q, chunk):
+                found[k] = (label, score)
+        if found:
+            now = int(time.time())
+            with self.conn:
+                self.conn.executemany("UPDATE sentiment SET last_used = ? WHERE key = ?",
+                                      [(now, k) for k in found])
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, str, float]]):
+        now = int(time.time())
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sentiment (key, label, score, last_used) VALUES (?, ?, ?, ?)",
+                [(k, label, float(score), now) for k, label, score in items],
+            )
+
+    def evict(self) -> int:
+        before = self.conn.total_changes
+        with self.conn:
+            if self.max_age_days is not None:
+                cutoff = int(time.time() - self.max_age_days * 86400)
+                self.conn.execute("DELETE FROM sentiment WHERE last_used < ?", (cutoff,))
+            if self.max_entries is not None:
+                self.conn.execute(
+                    "DELETE FROM sentiment WHERE key IN ("
+                    " SELECT key FROM sentiment ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        return self.conn.total_changes - before
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM sentiment").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+def score_texts(texts, cache: SentimentCache = None, scorer=None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Labels and compound scores for `texts` as two arrays. Each distinct normalized text is
+    scored once; with a cache, only texts missing from it are scored and then stored.
+    `scorer` maps a list of texts to (labels, scores) arrays (serial VADER by default).
+    """
+    if scorer is None:
+        scorer = sentiment_labels_and_scores
+
+    norm = pd.Series([normalize_text(t) for t in texts], dtype=object)
+    codes, uniques = pd.factorize(norm)
+    uniques = list(uniques)
+    keys = [text_key(t) for t in uniques]
+
+    known = cache.get_many(keys) if cache is not None else {}
+    todo = [i for i, k in enumerate(keys) if k not in known]
+    with metrics.timer("sentiment.vader", rows=len(todo)):
+        scored = list(zip(*scorer([uniques[i] for i in todo]))) if todo else []
+    metrics.count("sentiment.texts", len(codes))
+    metrics.count("sentiment.unique_texts", len(uniques))
+    metrics.count("sentiment.cache_hits", len(known))
+    if cache is not None and todo:
+        cache.put_many((keys[i], label, score) for i, (label, score) in zip(todo, scored))
+
+    labels: List[str] = [None] * len(uniques)
+    scores = np.zeros(len(uniques), dtype=float)
+    for i, k in enumerate(keys):
+        if k in known:
+            labels[i], scores[i] = known[k]
+    for i, (label, score) in zip(todo, scored):
+        labels[i], scores[i] = label, score
+
+    return np.asarray(labels, dtype=object)[codes], scores[codes]
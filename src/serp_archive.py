@@ -0,0 +1,262 @@
+"""
+Archive of fetched Google result pages (zlib-compressed HTML in SQLite, keyed by query,
+start offset and fetch time, tagged with the collection run) and an offline card extractor over archived HTML that
+mirrors the collector's live DOM extraction (`_EXTRACT_CARDS_JS`), so selector fixes can
+be replayed without re-scraping.
+"""
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from html import unescape
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import urljoin
+
+DEFAULT_ARCHIVE_PATH = Path("data/raw/serp_archive.sqlite")
+
+CARD_CLASS = "MjjYud"
+DESCRIPTION_CLASSES = ("VwiC3b", "yXK7lf")
+
+
+class SerpArchive:
+    """
+    SQLite archive of result pages; safe to share between collector threads. Pages are
+    tagged with `run` (the collection's start time, kept across resumes) and `finish()`
+    records a query's run as complete.
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH, level: int = 6, run: float = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.level = level
+        self.run = run
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " query TEXT NOT NULL, start INTEGER NOT NULL, fetched_at REAL NOT NULL,"
+            " url TEXT NOT NULL, html BLOB NOT NULL, run REAL, PRIMARY KEY (query, start, fetched_at))"
+        )
+        if "run" not in [c[1] for c in self.conn.execute("PRAGMA table_info(pages)")]:
+            self.conn.execute("ALTER TABLE pages ADD COLUMN run REAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " query TEXT NOT NULL, run REAL NOT NULL, finished_at REAL NOT NULL, PRIMARY KEY (query, run))"
+        )
+
+    def put(self, query: str, start: int, url: str, html: str, fetched_at: float = None):
+        blob = zlib.compress(html.encode("utf-8"), self.level)
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO pages (query, start, fetched_at, url, html, run) "
+                              "VALUES (?, ?, ?, ?, ?, ?)",
+                              (query, start, fetched_at if fetched_at is not None else time.time(), url, blob,
+                               self.run))
+
+    def finish(self, query: str, finished_at: float = None):
+        """Records that every page of `query` in this run has been fetched."""
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO runs (query, run, finished_at) VALUES (?, ?, ?)",
+                              (query, self.run, finished_at if finished_at is not None else time.time()))
+
+    def latest(self, queries: List[str] = None,
+               as_of: float = None) -> Dict[Tuple[str, int], Tuple[str, bytes, float]]:
+        """
+        {(query, start): (url, compressed html, fetched_at)} of every query's newest complete
+        run, optionally finished by `as_of`, so a query's pages never mix runs. Queries without
+        a complete run (archived before runs were recorded) get the newest fetch of each page.
+        """
+        as_of = as_of if as_of is not None else float("inf")
+        wanted = set(queries) if queries is not None else None
+        with self.lock:
+            runs = dict(self.conn.execute("SELECT query, MAX(run) FROM runs WHERE finished_at <= ? GROUP BY query",
+                                          (as_of,)))
+            newest = {}
+            for q, s, t, run in self.conn.execute("SELECT query, start, fetched_at, run FROM pages WHERE fetched_at <= ?",
+                                                  (as_of,)):
+                if (wanted is not None and q not in wanted) or (q in runs and run != runs[q]):
+                    continue
+                if t > newest.get((q, s), float("-inf")):
+                    newest[(q, s)] = t
+            out = {}
+            for (q, s), t in newest.items():
+                url, blob = self.conn.execute("SELECT url, html FROM pages WHERE query = ? AND start = ? AND fetched_at = ?",
+                                              (q, s, t)).fetchone()
+                out[(q, s)] = (url, blob, t)
+        return out
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+# Elements without end tags.
+_VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param",
+         "source", "track", "wbr"}
+# Elements whose boundaries innerText renders as line breaks.
+_BLOCK = {"div", "p", "li", "ul", "ol", "section", "article", "header", "footer", "table", "tr",
+          "h1", "h2", "h3", "h4", "h5", "h6", "br"}
+_SEARCH_RE = re.compile(r"""<[a-zA-Z][^>]*?\sid\s*=\s*["']?search(?=["'\s/>])""")
+_NEXT_RE = re.compile(r"""id\s*=\s*["']?pnnext(?=["'\s/>])""")
+# One markup token: comment, tag (name + raw attributes) or other declaration.
+_TOKEN_RE = re.compile(r"""<!--.*?-->|<(/?)([a-zA-Z][^\s/>]*)((?:[^>"']|"[^"]*"|'[^']*')*)>|<[!?][^>]*>""", re.S)
+_RAW_END = {t: re.compile(rf"</{t}\s*>", re.I) for t in ("script", "style", "textarea", "title")}
+_ATTR_RE = {a: re.compile(rf"""(?:^|\s){a}\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.I) for a in ("class", "href")}
+
+
+def _attr(raw: str, name: str):
+    m = _ATTR_RE[name].search(raw)
+    if m is None:
+        return None
+    return unescape(next(g for g in m.groups() if g is not None))
+
+class _Capture:
+    __slots__ = ("depth", "parts")
+
+    def __init__(self, depth):
+        self.depth, self.parts = depth, []
+
+    def text(self) -> str:
+        # Approximates innerText: whitespace collapsed within lines, block boundaries as newlines.
+        lines = (" ".join(line.split()) for line in unescape("".join(self.parts)).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+class _Card:
+    __slots__ = ("depth", "position", "h3", "h3_href", "first_href", "desc")
+
+    def __init__(self, depth, position):
+        self.depth, self.position = depth, position
+        self.h3 = None            # _Capture of the first h3
+        self.h3_href = False      # href of the h3's closest anchor (None: anchor without href)
+        self.first_href = False   # href of the card's first anchor
+        self.desc = {}            # description class -> _Capture of its first element
+
+def _scan_cards(html: str, pos: int) -> List[_Card]:
+    """
+    Walks the markup from the `#search` start tag at `pos` to its end tag, keeping the stack
+    of open elements (an end tag closes everything opened after its start tag, as browsers
+    recover from unclosed elements) and collecting every card's fields on the way.
+    """
+    stack = []              # (tag, href) with href False for non-anchors
+    cards, open_cards, captures = [], [], []
+
+    def text(data):
+        for c in captures:
+            c.parts.append(data)
+
+    while True:
+        m = _TOKEN_RE.search(html, pos)
+        if m is None:
+            break
+        if captures and m.start() > pos:
+            text(html[pos:m.start()])
+        pos = m.end()
+        closing, tag, raw = m.groups()
+        if tag is None:
+            continue
+        tag = tag.lower()
+
+        if closing:
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i][0] == tag:
+                    break
+            else:
+                continue
+            if tag in _BLOCK:
+                text("\n")
+            del stack[i:]
+            captures = [c for c in captures if c.depth < i]
+            open_cards = [c for c in open_cards if c.depth < i]
+            if not stack:
+                break
+            continue
+
+        if tag in _VOID:
+            if tag == "br":
+                text("\n")
+            continue
+        if tag in _RAW_END:
+            # Raw text up to the matching end tag; markup-like text inside is not parsed.
+            end = _RAW_END[tag].search(html, pos)
+            if end is None:
+                break
+            if tag in ("textarea", "title"):
+                text(html[pos:end.start()])
+            pos = end.end()
+            continue
+
+        depth = len(stack)
+        href = (_attr(raw, "href") or None) if tag == "a" else False
+        if not raw.endswith("/"):   # self-closing foreign elements (<path/> in inline SVG)
+            stack.append((tag, href))
+        if tag in _BLOCK:
+            text("\n")
+        if tag == "a":
+            for card in open_cards:
+                if card.first_href is False:
+                    card.first_href = href
+        elif tag == "h3":
+            anchor = next((h for t, h in reversed(stack) if t == "a"), False)
+            for card in open_cards:
+                if card.h3 is None:
+                    card.h3 = _Capture(depth)
+                    card.h3_href = anchor
+                    captures.append(card.h3)
+        elif tag == "div":
+            classes = (_attr(raw, "class") or "").split()
+            for cls in DESCRIPTION_CLASSES:
+                if cls in classes:
+                    for card in open_cards:
+                        if cls not in card.desc:
+                            card.desc[cls] = _Capture(depth)
+                            captures.append(card.desc[cls])
+            if CARD_CLASS in classes and depth > 0:
+                card = _Card(depth, len(cards))
+                cards.append(card)
+                open_cards.append(card)
+    return cards
+
+
+def _find_search(html: str):
+    """Offset of the `#search` start tag, skipping look-alikes inside inline scripts."""
+    for m in _SEARCH_RE.finditer(html):
+        if html.rfind("<script", 0, m.start()) <= html.rfind("</script", 0, m.start()):
+            return m.start()
+    return None
+
+def parse_serp(html: str, page_url: str) -> Tuple[List[Dict], bool]:
+    """
+    Cards ({title, href, description, position}, as `_EXTRACT_CARDS_JS` returns them) and
+    whether the page has a next-page link. Only the `#search` element is parsed; relative
+    hrefs are resolved against `page_url` like `a.href` in the browser.
+    """
+    has_next = _NEXT_RE.search(html) is not None
+    start = _find_search(html)
+    if start is None:
+        return [], has_next
+
+    cards = []
+    for card in _scan_cards(html, start):
+        if card.h3 is None:
+            continue
+        href = card.h3_href if card.h3_href is not False else card.first_href
+        if href is False:
+            continue
+        desc = ""
+        for cls in DESCRIPTION_CLASSES:
+            if cls in card.desc:
+                desc = card.desc[cls].text()
+                if desc:
+                    break
+        cards.append({"title": card.h3.text(), "href": urljoin(page_url, href) if href else None,
+                      "description": desc, "position": card.position})
+    return cards, has_next
+
+def parse_archived(item: Tuple[str, bytes, float]) -> Tuple[List[Dict], bool]:
+    """`parse_serp` over one `SerpArchive.latest()` value (url, compressed html, fetched_at)."""
+    url, blob = item[:2]
+    return parse_serp(zlib.decompress(blob).decode("utf-8"), url)
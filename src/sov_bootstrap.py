@@ -0,0 +1,81 @@
+"""
+Bootstrap confidence intervals for the brand shares behind the SoV tables (SoV by
+mentions, SoPV): every group's rows are resampled with replacement `resamples` times and
+the shares recomputed on each resample, the interval being the central `level` quantiles.
+
+Resampling rows only matters through the flags each row carries, so a group's rows are
+first collapsed into counts of their distinct flag patterns (a few dozen at most with five
+brands). Drawing n rows with replacement from a group is then one multinomial draw of n
+over its pattern frequencies, and a resample's per-brand totals are the drawn counts times
+the pattern matrix. A block of groups and a block of resamples are drawn in one
+`multinomial` call, so the cost grows with resamples x groups x patterns and not with the
+number of rows. The quantiles are taken one block of groups at a time, so memory stays
+bounded by BLOCK however many groups there are.
+"""
+from typing import Tuple
+
+import numpy as np
+
+RESAMPLES = 2000
+LEVEL = 0.95
+# Upper bound on the (resamples x groups x patterns) draws, and on the
+# (resamples x groups x metrics x brands) shares, held at once.
+BLOCK = 4_000_000
+
+
+def pattern_counts(flags: np.ndarray, group: np.ndarray, n_groups: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (counts, patterns) for a (rows x k) bool matrix and each row's group (-1: no group):
+    `patterns` holds the P distinct rows of `flags` (P x k), most frequent first, `counts`
+    how often each occurs in every group (n_groups x P). The order matters for speed:
+    `multinomial` stops drawing a group once all its rows are assigned.
+    """
+    keep = group >= 0
+    codes = flags[keep].astype(np.int64) @ (1 << np.arange(flags.shape[1], dtype=np.int64))
+    uniq, inverse, freq = np.unique(codes, return_inverse=True, return_counts=True)
+    rank = np.empty(len(uniq), dtype=np.int64)
+    rank[np.argsort(-freq, kind="stable")] = np.arange(len(uniq))
+    uniq = uniq[np.argsort(rank)]
+    patterns = (uniq[:, None] >> np.arange(flags.shape[1])) & 1 == 1
+    counts = np.bincount(group[keep] * len(uniq) + rank[inverse], minlength=n_groups * len(uniq))
+    return counts.reshape(n_groups, len(uniq)), patterns
+
+def bootstrap_totals(counts: np.ndarray, patterns: np.ndarray, resamples: int,
+                     rng: np.random.Generator):
+    """Yields (resamples in block x groups x k) per-group totals of resampled rows, block by block."""
+    n_groups, n_patterns = counts.shape
+    sizes = counts.sum(axis=1)
+    pvals = counts / np.maximum(sizes, 1)[:, None]
+    step = max(1, BLOCK // max(n_groups * n_patterns, 1))
+    # float64 so the product runs through BLAS; the totals stay exact integers.
+    patterns = patterns.astype(np.float64)
+    for lo in range(0, resamples, step):
+        draws = rng.multinomial(sizes, pvals, size=(min(step, resamples - lo), n_groups))
+        yield draws.astype(np.float64) @ patterns
+
+def share_intervals(flags: np.ndarray, group: np.ndarray, n_groups: int, resamples: int = RESAMPLES,
+                    level: float = LEVEL, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (low, high) percentage bounds, each (n_groups x metrics x brands), of every brand's share
+    of its metric within its group, for a (rows x metrics x brands) bool `flags` array (e.g.
+    mentions and positive mentions). A resample without any flag of a metric gives every
+    brand a 0% share, as `sov_shares` does. Fixed `seed`, same intervals.
+    """
+    rows, n_metrics, nb = flags.shape
+    counts, patterns = pattern_counts(flags.reshape(rows, -1), group, n_groups)
+    rng = np.random.default_rng(seed)
+    low = np.empty((n_groups, n_metrics, nb))
+    high = np.empty((n_groups, n_metrics, nb))
+    step = max(1, BLOCK // max(resamples * n_metrics * nb, 1))
+    for g0 in range(0, n_groups, step):
+        g1 = min(g0 + step, n_groups)
+        shares = np.empty((resamples, g1 - g0, n_metrics, nb))
+        done = 0
+        for totals in bootstrap_totals(counts[g0:g1], patterns, resamples, rng):
+            totals = totals.reshape(len(totals), g1 - g0, n_metrics, nb)
+            denom = totals.sum(axis=3, keepdims=True)
+            denom[denom == 0] = 1
+            shares[done:done + len(totals)] = 100.0 * totals / denom
+            done += len(totals)
+        low[g0:g1], high[g0:g1] = np.quantile(shares, [(1 - level) / 2, (1 + level) / 2], axis=0)
+    return low, high
@@ -0,0 +1,131 @@
+"""
+Persistent SoV cube: summed `mentions`, `engagement` and `positive_mentions` per
+(collection date, query, platform, brand), updated at the end of every processing run.
+Trend queries (rolling-window SoV, week-over-week deltas) read only the cube, which stays
+at a few thousand rows per year of daily runs however large the processed data gets.
+
+Usage (from the repo root):
+    python src/sov_cube.py --window 7 --level query
+"""
+import argparse
+import os
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+
+DEFAULT_CUBE_PATH = Path("data/processed/sov_cube.parquet")
+KEY = ["date", "query", "platform", "brand"]
+MEASURES = ["mentions", "engagement", "positive_mentions"]
+
+
+def load_cube(path=DEFAULT_CUBE_PATH) -> pd.DataFrame:
+    if not Path(path).exists():
+        return pd.DataFrame({c: pd.Series(dtype="datetime64[ns]" if c == "date" else object) for c in KEY + MEASURES})
+    return pd.read_parquet(path)
+
+def update_cube(aggregates: pd.DataFrame, date=None, path=DEFAULT_CUBE_PATH) -> pd.DataFrame:
+    """
+    Stores per-(query, platform, brand) aggregates (`sov_aggregates` output) in the cube,
+    dated by their `date` column, or by `date` (default: today, UTC) if they have none.
+    They replace the cube's slices for the (date, platform) pairs they cover, so processing
+    the same collection again doesn't double count. Returns the updated cube.
+    """
+    path = Path(path)
+    if "date" not in aggregates.columns:
+        aggregates = aggregates.assign(date=date if date is not None else pd.Timestamp.now(tz="UTC").date())
+    day = aggregates[KEY + MEASURES].astype({"query": str, "platform": str, "brand": str})
+    day["date"] = pd.to_datetime(day["date"]).dt.normalize()
+
+    cube = load_cube(path)
+    if len(cube):
+        cube = cube.astype({"query": str, "platform": str, "brand": str})
+        covered = pd.MultiIndex.from_frame(day[["date", "platform"]])
+        cube = cube[~pd.MultiIndex.from_frame(cube[["date", "platform"]]).isin(covered)]
+    cube = pd.concat([cube, day], ignore_index=True) if len(cube) else day
+    cube = cube.sort_values(KEY, kind="stable").reset_index(drop=True)
+    cube = cube.astype({"query": "category", "platform": "category", "brand": "category"})
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    cube.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return cube
+
+
+def _with_shares(df: pd.DataFrame, group_cols: List[str]) -> pd.DataFrame:
+    """Adds the three SoV percentages, each brand's share of its (group_cols) total."""
+    out = df.copy()
+    for measure, pct in (("mentions", "sov_mentions_pct"), ("engagement", "sov_engagement_pct"),
+                         ("positive_mentions", "sopv_pct")):
+        total = out.groupby(group_cols, observed=True)[measure].transform("sum")
+        out[pct] = 100.0 * out[measure] / total.where(total != 0, 1)
+    return out
+
+def rolling_sov(cube: pd.DataFrame, window_days: int = 7, level_cols=("query",)) -> pd.DataFrame:
+    """
+    SoV over a trailing `window_days` window ending at every date in the cube: measures are
+    summed over the dates in (date - window, date] and over any key not in `level_cols`
+    (e.g. platforms), then turned into shares per (date, level_cols).
+    """
+    level_cols = list(level_cols)
+    series_cols = level_cols + ["brand"]
+    daily = (cube.groupby(["date"] + series_cols, observed=True)[MEASURES].sum()
+                 .unstack(series_cols, fill_value=0))
+    if daily.empty:
+        return pd.DataFrame(columns=["date"] + series_cols + MEASURES)
+    days = pd.date_range(daily.index.min(), daily.index.max(), freq="D")
+    rolled = daily.reindex(days, fill_value=0).rolling(window_days, min_periods=1).sum()
+    rolled = rolled.loc[rolled.index.isin(daily.index)]
+    rolled.index.name = "date"
+
+    out = rolled.stack(series_cols, future_stack=True).reset_index()
+    out = out.astype({"mentions": "int64", "positive_mentions": "int64"})
+    out = out.sort_values(["date"] + series_cols, kind="stable").reset_index(drop=True)
+    return _with_shares(out, ["date"] + level_cols)
+
+def period_deltas(cube: pd.DataFrame, days: int = 7, level_cols=("query",), end=None) -> pd.DataFrame:
+    """
+    SoV over the `days` ending at `end` (default: the latest date in the cube) next to the
+    `days` before them, with the change in percentage points (`*_delta`).
+    """
+    level_cols = list(level_cols)
+    if cube.empty:
+        return pd.DataFrame(columns=level_cols + ["brand"])
+    end = pd.Timestamp(end).normalize() if end is not None else cube["date"].max()
+    periods = {"current": (end - pd.Timedelta(days=days), end),
+               "previous": (end - pd.Timedelta(days=2 * days), end - pd.Timedelta(days=days))}
+
+    frames = []
+    for name, (lo, hi) in periods.items():
+        part = cube[(cube["date"] > lo) & (cube["date"] <= hi)]
+        sums = part.groupby(level_cols + ["brand"], observed=True)[MEASURES].sum().reset_index()
+        frames.append(_with_shares(sums, level_cols).set_index(level_cols + ["brand"]).add_suffix(f"_{name}"))
+    out = frames[0].join(frames[1], how="outer").fillna(0)
+    for pct in ("sov_mentions_pct", "sov_engagement_pct", "sopv_pct"):
+        out[f"{pct}_delta"] = out[f"{pct}_current"] - out[f"{pct}_previous"]
+    return out.reset_index()
+
+def week_over_week(cube: pd.DataFrame, level_cols=("query",), end=None) -> pd.DataFrame:
+    return period_deltas(cube, 7, level_cols, end)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cube", default=str(DEFAULT_CUBE_PATH))
+    ap.add_argument("--window", type=int, default=7, help="rolling window in days")
+    ap.add_argument("--level", default="query", help="comma-separated level columns, e.g. query,platform")
+    args = ap.parse_args()
+
+    cube = load_cube(args.cube)
+    if cube.empty:
+        print(f"No cube at {args.cube}; run the processing stage first.")
+    else:
+        level = args.level.split(",")
+        latest = rolling_sov(cube, args.window, level).loc[lambda d: d["date"] == d["date"].max()]
+        cols = level + ["brand", "mentions", "sov_mentions_pct", "sov_engagement_pct", "sopv_pct"]
+        print(f"SoV over the {args.window} days to {cube['date'].max().date()}:")
+        print(latest[cols].to_string(index=False))
+        wow = week_over_week(cube, level)
+        print("\nWeek over week (percentage points):")
+        print(wow[level + ["brand", "sov_mentions_pct_current", "sov_mentions_pct_delta"]].to_string(index=False))
@@ -0,0 +1,76 @@
+"""
+Out-of-core reads of the partitioned processed dataset that `03_process_and_analyze.py
+--incremental` appends to (`data/processed/combined/date=<collection date>/batch=<raw batch>/`).
+
+The dataset is scanned as an Arrow dataset in record batches: only the requested columns
+are read, query/platform filters are pushed down to the parquet scan (row groups whose
+statistics rule them out are skipped) and date filters prune whole partitions, so the
+memory a scan needs depends on the batch size, not on how many rows the dataset holds.
+Parts written under older layouts (`batch=` only, `mention_*` columns instead of the
+bitmask) are read alongside newer ones; their missing columns and partition keys are null.
+"""
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string()), ("batch", pa.string())]), flavor="hive")
+
+
+def dataset_schema(dataset: ds.Dataset) -> pa.Schema:
+    """
+    Every column of every part (from the parquet footers). Parts disagree on dictionary
+    index widths, so dictionary columns get int32 indices; a column that is dictionary
+    encoded in some parts only is read as its plain value type.
+    """
+    types, encoded = {}, {}
+    for fragment in dataset.get_fragments():
+        for field in fragment.physical_schema:
+            is_dict = pa.types.is_dictionary(field.type)
+            types.setdefault(field.name, field.type.value_type if is_dict else field.type)
+            encoded[field.name] = encoded.get(field.name, True) and is_dict
+    fields = [pa.field(name, pa.dictionary(pa.int32(), t) if encoded[name] else t) for name, t in types.items()]
+    fields += [field for field in PARTITIONING.schema if field.name not in types]
+    return pa.schema(fields)
+
+def open_dataset(path) -> ds.Dataset:
+    dataset = ds.dataset(str(path), format="parquet", partitioning=PARTITIONING)
+    return ds.dataset(str(path), format="parquet", partitioning=PARTITIONING, schema=dataset_schema(dataset))
+
+def filter_expression(queries: Iterable[str] = None, platforms: Iterable[str] = None,
+                      since: str = None, until: str = None) -> Optional[ds.Expression]:
+    """Row filter for the scan; `since`/`until` are inclusive YYYY-MM-DD collection dates."""
+    terms = []
+    if queries:
+        terms.append(ds.field("query").isin(list(queries)))
+    if platforms:
+        terms.append(ds.field("platform").isin(list(platforms)))
+    if since:
+        terms.append(ds.field("date") >= str(pd.Timestamp(since).date()))
+    if until:
+        terms.append(ds.field("date") <= str(pd.Timestamp(until).date()))
+    expr = None
+    for term in terms:
+        expr = term if expr is None else expr & term
+    return expr
+
+def scan_frames(path, columns: Iterable[str], batch_size: int = 262_144, **filters) -> Iterator[pd.DataFrame]:
+    """
+    The filtered rows of the dataset at `path` as pandas frames of at most `batch_size`
+    rows, holding only those of `columns` that exist in the dataset. Parts are scanned one
+    at a time without read-ahead: the dataset-wide scanner reads several parts ahead of
+    the consumer, which costs memory in proportion to the part size times the read-ahead.
+    """
+    if not Path(path).exists():
+        return
+    dataset = open_dataset(path)
+    columns = [c for c in dict.fromkeys(columns) if c in dataset.schema.names]
+    expr = filter_expression(**filters)
+    for fragment in dataset.get_fragments(filter=expr):
+        batches = fragment.to_batches(schema=dataset.schema, columns=columns, filter=expr, batch_size=batch_size,
+                                      batch_readahead=0, fragment_readahead=0)
+        for batch in batches:
+            if batch.num_rows:
+                yield batch.to_pandas()
@@ -1,14 +1,60 @@
+import hashlib
+import os
 import re
-from typing import Dict, List, Tuple
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-import nltk
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Tuple
 
-try:
-    _ = nltk.data.find('sentiment/vader_lexicon.zip')
-except LookupError:
-    nltk.download('vader_lexicon')
+import numpy as np
 
-sia = SentimentIntensityAnalyzer()
+if TYPE_CHECKING:
+    import pandas as pd
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+# Plain-text copy of NLTK's VADER lexicon, written on first use so later processes neither
+# look up nltk_data, download, nor unzip the lexicon again.
+LEXICON_SNAPSHOT = Path(__file__).resolve().parent.parent / "data" / "cache" / "vader_lexicon.txt"
+_NLTK_LEXICON = "sentiment/vader_lexicon.zip/vader_lexicon/vader_lexicon.txt"
+
+_sia = None
+_sia_lock = threading.Lock()
+
+def _lexicon_snapshot() -> Path:
+    if not LEXICON_SNAPSHOT.exists():
+        import nltk
+        try:
+            _ = nltk.data.find('sentiment/vader_lexicon.zip')
+        except LookupError:
+            nltk.download('vader_lexicon')
+        text = nltk.data.load(_NLTK_LEXICON, format="text")
+        LEXICON_SNAPSHOT.parent.mkdir(parents=True, exist_ok=True)
+        tmp = LEXICON_SNAPSHOT.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        os.replace(tmp, LEXICON_SNAPSHOT)
+    return LEXICON_SNAPSHOT
+
+def get_analyzer() -> "SentimentIntensityAnalyzer":
+    """The process-wide VADER analyzer, built on first use from the local lexicon snapshot."""
+    global _sia
+    if _sia is None:
+        with _sia_lock:
+            if _sia is None:
+                from nltk.sentiment.vader import SentimentIntensityAnalyzer
+                _sia = SentimentIntensityAnalyzer(lexicon_file=_lexicon_snapshot().as_uri())
+    return _sia
+
+def __getattr__(name):
+    # `utils.sia` is still available, but only builds the analyzer when first accessed.
+    if name == "sia":
+        return get_analyzer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+POSITIVE_THRESHOLD = 0.5
+NEGATIVE_THRESHOLD = -0.5
+
+# "vader": NLTK's analyzer one text at a time; "batch": sentiment_batch.BatchVader.
+SENTIMENT_BACKENDS = ("vader", "batch")
 
 BRAND_ALIASES: Dict[str, List[str]] = {
     "Atomberg":   [r"atomberg"],
@@ -22,6 +68,16 @@ BRAND_PATTERNS: Dict[str, re.Pattern] = {
     b: re.compile(r"(?i)\b(" + r"|".join(aliases) + r")\b") for b, aliases in BRAND_ALIASES.items()
 }
 
+# First letters of every alias; used as a cheap lookahead so the combined scan
+# only tries the alternation at plausible positions.
+_ALIAS_HEADS = sorted({re.sub(r"^(\\b)+", "", a)[0].lower() for aliases in BRAND_ALIASES.values() for a in aliases})
+
+BRAND_REGEX: re.Pattern = re.compile(
+    r"(?i)(?=[" + "".join(_ALIAS_HEADS) + r"])\b(?:" + r"|".join(
+        f"(?P<{b}>" + r"|".join(aliases) + r")" for b, aliases in BRAND_ALIASES.items()
+    ) + r")\b"
+)
+
 def extract_brands(text: str) -> List[str]:
 
     if not isinstance(text, str) or not text:
@@ -38,15 +94,165 @@ def brand_flags(text: str) -> Dict[str, bool]:
     mentions = set(extract_brands(text))
     return {f"mention_{b.lower()}": (b in mentions) for b in BRAND_ALIASES.keys()}
 
+def brand_flag_matrix(texts) -> np.ndarray:
+    """
+    Boolean (n_rows, n_brands) matrix of brand mentions, columns in BRAND_ALIASES order.
+    All texts are joined with a non-word separator and scanned once with BRAND_REGEX;
+    match offsets are mapped back to rows, so the result matches `brand_flags` row by row.
+    Accepts a pandas Series, a pyarrow (Chunked)Array or any iterable of strings.
+    """
+    if hasattr(texts, "to_pylist"):
+        texts = texts.to_pylist()
+    elif hasattr(texts, "tolist"):
+        texts = texts.tolist()
+    texts = [t if isinstance(t, str) else "" for t in texts]
+
+    brands = list(BRAND_ALIASES.keys())
+    out = np.zeros((len(texts), len(brands)), dtype=bool)
+    if not texts:
+        return out
+
+    lengths = np.fromiter((len(t) + 1 for t in texts), dtype=np.int64, count=len(texts))
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    col_of = {b: i for i, b in enumerate(brands)}
+
+    pos, cols = [], []
+    for m in BRAND_REGEX.finditer("\n".join(texts)):
+        pos.append(m.start())
+        cols.append(col_of[m.lastgroup])
+    if pos:
+        rows = np.searchsorted(starts, np.asarray(pos, dtype=np.int64), side="right") - 1
+        out[rows, np.asarray(cols, dtype=np.int64)] = True
+    return out
+
+# Sentence ends for `brand_snippets`: . ! ? or a " | " separator followed by whitespace.
+# The lookahead lets the scan skip straight to candidate characters.
+SENTENCE_END: re.Pattern = re.compile(r"(?=[.!?|])[.!?|](?=\s)")
+
+def brand_snippets(texts, window: int = 200) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    (rows, brand columns, snippets) for every (row, brand) pair with a mention: the
+    sentences of the row that mention the brand, joined in order, each cut to `window`
+    characters before the brand's first match and after its last (at word boundaries).
+    Uses the same single BRAND_REGEX scan over the joined texts as `brand_flag_matrix`, so
+    the pairs are exactly its True cells; sentence ends are only searched for in rows with
+    a mention, and rows without one produce nothing.
+    """
+    if hasattr(texts, "to_pylist"):
+        texts = texts.to_pylist()
+    elif hasattr(texts, "tolist"):
+        texts = texts.tolist()
+    texts = [t if isinstance(t, str) else "" for t in texts]
+    joined = "\n".join(texts)
+
+    col_of = {b: i for i, b in enumerate(BRAND_ALIASES.keys())}
+    found = [(m.start(), m.end(), col_of[m.lastgroup]) for m in BRAND_REGEX.finditer(joined)]
+    if not found:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), []
+    start, end, cols = (np.asarray(x, dtype=np.int64) for x in zip(*found))
+
+    lengths = np.fromiter((len(t) + 1 for t in texts), dtype=np.int64, count=len(texts))
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    rows = np.searchsorted(starts, start, side="right") - 1
+
+    # Sentence bounds: every row start and end, plus the sentence ends inside rows with a mention.
+    hit = np.unique(rows)
+    ends = [m.end() for r in hit for m in SENTENCE_END.finditer(joined, starts[r], starts[r] + lengths[r] - 1)]
+    bounds = np.unique(np.concatenate((starts, starts + lengths - 1, np.asarray(ends, dtype=np.int64))))
+    sentence = np.searchsorted(bounds, start, side="right")
+    lo = np.maximum(bounds[sentence - 1], start - window)
+    hi = np.minimum(bounds[sentence], end + window)
+
+    # Matches of one brand in one sentence share a snippet.
+    key = (rows * len(col_of) + cols) * len(bounds) + sentence
+    order = np.argsort(key, kind="stable")
+    first = np.r_[True, key[order][1:] != key[order][:-1]]
+    group = np.cumsum(first) - 1
+    g_lo = np.full(group[-1] + 1, len(joined), dtype=np.int64)
+    g_hi = np.zeros(group[-1] + 1, dtype=np.int64)
+    np.minimum.at(g_lo, group, lo[order])
+    np.maximum.at(g_hi, group, hi[order])
+    g_rows, g_cols, g_sentence = rows[order][first], cols[order][first], sentence[order][first]
+
+    out_rows, out_cols, snippets = [], [], []
+    for r, c, s, a, b in zip(g_rows, g_cols, g_sentence, g_lo, g_hi):
+        if a > bounds[s - 1]:
+            a = joined.find(" ", a, b) + 1 or a
+        if b < bounds[s]:
+            cut = joined.rfind(" ", a, b)
+            b = cut if cut > a else b
+        piece = joined[a:b].strip()
+        if out_rows and out_rows[-1] == r and out_cols[-1] == c:
+            snippets[-1] += " " + piece
+        else:
+            out_rows.append(r)
+            out_cols.append(c)
+            snippets.append(piece)
+    return np.asarray(out_rows, dtype=np.int64), np.asarray(out_cols, dtype=np.int64), snippets
+
+def brand_flag_frame(texts: "pd.Series") -> "pd.DataFrame":
+    """Vectorized equivalent of `texts.apply(brand_flags).apply(pd.Series)`."""
+    import pandas as pd
+    cols = [f"mention_{b.lower()}" for b in BRAND_ALIASES.keys()]
+    index = texts.index if isinstance(texts, pd.Series) else None
+    return pd.DataFrame(brand_flag_matrix(texts), columns=cols, index=index)
+
 def sentiment_label_and_score(text: str) -> Tuple[str, float]:
 
     if not isinstance(text, str) or not text.strip():
         return ("neutral", 0.0)
-    s = sia.polarity_scores(text)
+    s = get_analyzer().polarity_scores(text)
     c = s.get("compound", 0.0)
-    if c > 0.5:
+    if c > POSITIVE_THRESHOLD:
         return ("positive", c)
-    elif c < -0.5:
+    elif c < NEGATIVE_THRESHOLD:
         return ("negative", c)
     else:
         return ("neutral", c)
+
+def sentiment_labels(scores: np.ndarray) -> np.ndarray:
+    """Vectorized label thresholds of `sentiment_label_and_score` (object array)."""
+    scores = np.asarray(scores, dtype=float)
+    return np.where(scores > POSITIVE_THRESHOLD, "positive",
+                    np.where(scores < NEGATIVE_THRESHOLD, "negative", "neutral")).astype(object)
+
+def _score_chunk(texts: List[str]) -> Tuple[List[str], List[float]]:
+    labels, scores = [], []
+    for t in texts:
+        label, score = sentiment_label_and_score(t)
+        labels.append(label)
+        scores.append(score)
+    return labels, scores
+
+def sentiment_labels_and_scores(texts, workers: int = 1, chunk_size: int = 2000,
+                                backend: str = "vader") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Scores `texts` and returns (labels, scores) as arrays rather than tuples. With
+    workers > 1 the texts are split into `chunk_size` chunks and scored on a process pool;
+    each worker process lazily builds its own SentimentIntensityAnalyzer (`get_analyzer`).
+    Results are identical to the serial path. backend="batch" scores the whole list at once
+    with the vectorized engine in sentiment_batch.py (same scores, no workers needed).
+    """
+    if backend not in SENTIMENT_BACKENDS:
+        raise ValueError(f"Unknown sentiment backend {backend!r}; expected one of {SENTIMENT_BACKENDS}")
+    texts = list(texts)
+    if backend == "batch":
+        from sentiment_batch import batch_labels_and_scores
+        return batch_labels_and_scores(texts)
+    if workers <= 1 or len(texts) <= chunk_size:
+        labels, scores = _score_chunk(texts)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        labels, scores = [], []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for lab, sc in pool.map(_score_chunk, chunks):
+                labels.extend(lab)
+                scores.extend(sc)
+    return np.asarray(labels, dtype=object), np.asarray(scores, dtype=float)
+
+def sentiment_fingerprint() -> str:
+    """Identifies the analyzer (NLTK version, lexicon contents) and label thresholds."""
+    from importlib.metadata import version
+    lexicon = hashlib.sha1(_lexicon_snapshot().read_bytes()).hexdigest()[:16]
+    return f"nltk={version('nltk')};lexicon={lexicon};pos={POSITIVE_THRESHOLD};neg={NEGATIVE_THRESHOLD}"
@@ -0,0 +1,99 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+DEFAULT_STORE_PATH = Path("data/raw/video_store.sqlite")
+
+MAX_IDS_PER_CALL = 50
+
+
+class VideoStore:
+    """
+    SQLite store of YouTube video resources keyed by `video_id`, shared across queries and
+    runs. Snippets (title, tags, description) and statistics are timestamped separately:
+    statistics go stale after `stats_ttl_hours`, snippets after `snippet_ttl_days`.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH, stats_ttl_hours: float = 24, snippet_ttl_days: float = 30):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.stats_ttl = stats_ttl_hours * 3600
+        self.snippet_ttl = snippet_ttl_days * 86400
+        self.fetched = 0
+        self.reused = 0
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS videos ("
+            " video_id TEXT PRIMARY KEY, snippet TEXT, statistics TEXT,"
+            " snippet_at REAL, stats_at REAL)"
+        )
+
+    def _rows(self, ids: List[str]) -> Dict[str, tuple]:
+        out = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            q = ("SELECT video_id, snippet, statistics, snippet_at, stats_at FROM videos "
+                 f"WHERE video_id IN ({','.join('?' * len(chunk))})")
+            for r in self.conn.execute(q, chunk):
+                out[r[0]] = r[1:]
+        return out
+
+    def stale(self, ids: Iterable[str]) -> Dict[str, List[str]]:
+        """Splits `ids` into those needing `snippet,statistics` and those needing only `statistics`."""
+        ids = list(dict.fromkeys(ids))
+        now = time.time()
+        rows = self._rows(ids)
+        full, stats_only = [], []
+        for vid in ids:
+            r = rows.get(vid)
+            if r is None or r[0] is None or now - r[2] > self.snippet_ttl:
+                full.append(vid)
+            elif r[1] is None or now - r[3] > self.stats_ttl:
+                stats_only.append(vid)
+        return {"snippet,statistics": full, "statistics": stats_only}
+
+    def put_many(self, items: Iterable[Dict], part: str):
+        now = time.time()
+        with self.conn:
+            for v in items:
+                vid = v["id"]
+                stats = json.dumps(v.get("statistics", {}) or {})
+                if "snippet" in part:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO videos (video_id, snippet, statistics, snippet_at, stats_at)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        (vid, json.dumps(v.get("snippet", {}) or {}), stats, now, now),
+                    )
+                else:
+                    self.conn.execute(
+                        "UPDATE videos SET statistics = ?, stats_at = ? WHERE video_id = ?", (stats, now, vid)
+                    )
+
+    def refresh(self, ids: Iterable[str], fetch: Callable[[List[str], str], List[Dict]], map_fn=map):
+        """
+        Fetches every stale or unknown id in full 50-id batches via `fetch(ids, part)`, which
+        returns videos.list items. `map_fn` can be an executor's `map` to run batches concurrently.
+        """
+        ids = list(dict.fromkeys(ids))
+        stale = self.stale(ids)
+        batches = [(part, todo[i:i + MAX_IDS_PER_CALL])
+                   for part, todo in stale.items() for i in range(0, len(todo), MAX_IDS_PER_CALL)]
+        n_stale = sum(len(b) for _, b in batches)
+        self.reused += len(ids) - n_stale
+        self.fetched += n_stale
+        for (part, _), items in zip(batches, map_fn(lambda b: fetch(b[1], b[0]), batches)):
+            self.put_many(items, part)
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, Dict]:
+        """videos.list-shaped resources ({"id", "snippet", "statistics"}) for the known ids."""
+        out = {}
+        for vid, (snippet, stats, _, _) in self._rows(list(dict.fromkeys(ids))).items():
+            if snippet is None:
+                continue
+            out[vid] = {"id": vid, "snippet": json.loads(snippet), "statistics": json.loads(stats or "{}")}
+        return out
+
+    def close(self):
+        self.conn.close()